@@ -0,0 +1,292 @@
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from src.events import EventType
+from src.game_types import Party, Policy, Role
+from src.store import EventStore
+
+MAX_SEATS = 10
+
+ROLES = [Role.liberal, Role.fascist, Role.hitler]
+PARTIES = [Party.liberal, Party.fascist]
+POLICIES = [Policy.liberal, Policy.fascist]
+POWERS = [
+    EventType.loyalty_investigated,
+    EventType.player_executed,
+    EventType.policy_peek,
+    EventType.special_election,
+]
+
+VOTES = {EventType.vote_in_favour.name: 1, EventType.vote_against.name: 0}
+ENACTED = {
+    EventType.liberal_policy_enacted.name: POLICIES.index(Policy.liberal),
+    EventType.fascist_policy_enacted.name: POLICIES.index(Policy.fascist),
+}
+
+# Column name -> dtype for every exported table:
+SCHEMA = {
+    "games": {
+        "game_id": "<U32",
+        "n_players": np.int8,
+        "winner": np.int8,
+        "win_reason": "<U64",
+        "rounds": np.int16,
+        "liberal_enacted": np.int8,
+        "fascist_enacted": np.int8,
+    },
+    "players": {
+        "game": np.int32,
+        "seat": np.int8,
+        "name": "<U32",
+        "role": np.int8,
+        "alive": np.bool_,
+    },
+    "rounds": {
+        "game": np.int32,
+        "round": np.int16,
+        "failed_elections": np.int8,
+        "liberal_enacted": np.int8,
+        "fascist_enacted": np.int8,
+    },
+    "governments": {
+        "game": np.int32,
+        "round": np.int16,
+        "president": np.int8,
+        "chancellor": np.int8,
+        "elected": np.bool_,
+        "policy": np.int8,
+        "fascist_before": np.int8,
+    },
+    "votes": {
+        "game": np.int32,
+        "government": np.int32,
+        "seat": np.int8,
+        "vote": np.int8,
+    },
+    "powers": {
+        "game": np.int32,
+        "round": np.int16,
+        "president": np.int8,
+        "power": np.int8,
+        "target": np.int8,
+    },
+}
+
+Tables = Dict[str, Dict[str, np.ndarray]]
+
+
+def export_archive(store: EventStore, path: str, game_ids: Iterable[str] = None) -> Tables:
+    columns = {table: defaultdict(list) for table in SCHEMA}
+    for game, game_id in enumerate(game_ids or store.games()):
+        export_game(columns, game, game_id, store.load(game_id))
+
+    tables = {
+        table: {
+            name: np.asarray(columns[table][name], dtype=dtype) for name, dtype in schema.items()
+        }
+        for table, schema in SCHEMA.items()
+    }
+
+    # One .npy file per column so each can be memory-mapped on its own:
+    for table, arrays in tables.items():
+        os.makedirs(os.path.join(path, table), exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(path, table, f"{name}.npy"), array)
+
+    return tables
+
+
+def export_game(columns, game: int, game_id: str, records) -> None:
+    seats: Dict[str, int] = {}
+    last_state = None
+    rounds: Dict[int, dict] = {}
+    government = None
+    nominated: Tuple[int, int] = None
+
+    def seat(name: str | None) -> int:
+        return seats.get(name, -1)
+
+    for kind, data in records:
+        if kind == "game_started":
+            for i, info in enumerate(data["players"]):
+                seats[info["name"]] = i
+                columns["players"]["game"].append(game)
+                columns["players"]["seat"].append(i)
+                columns["players"]["name"].append(info["name"])
+                columns["players"]["role"].append(ROLES.index(info["role"]))
+
+        elif kind == "event" and data["event_type"] == EventType.chancellor_nominated.name:
+            nominated = (seat(data["actor"]), seat(data["recipient"]))
+            government = len(columns["governments"]["game"])
+            fascist_before = last_state["enacted_policies"][Policy.fascist] if last_state else 0
+            for name, value in (
+                ("game", game),
+                ("round", last_state["round_num"] if last_state else 0),
+                ("president", nominated[0]),
+                ("chancellor", nominated[1]),
+                ("elected", False),
+                ("policy", -1),
+                ("fascist_before", fascist_before),
+            ):
+                columns["governments"][name].append(value)
+
+        elif kind == "event" and data["event_type"] in VOTES and government is not None:
+            columns["votes"]["game"].append(game)
+            columns["votes"]["government"].append(government)
+            columns["votes"]["seat"].append(seat(data["actor"]))
+            columns["votes"]["vote"].append(VOTES[data["event_type"]])
+
+        elif kind == "event" and data["event_type"] in ENACTED and government is not None:
+            columns["governments"]["policy"][government] = ENACTED[data["event_type"]]
+
+        elif kind == "event":
+            event_type = EventType[data["event_type"]]
+            if event_type in POWERS:
+                columns["powers"]["game"].append(game)
+                columns["powers"]["round"].append(last_state["round_num"] if last_state else 0)
+                columns["powers"]["president"].append(seat(data["actor"]))
+                columns["powers"]["power"].append(POWERS.index(event_type))
+                columns["powers"]["target"].append(seat(data["recipient"]))
+
+        elif kind == "state":
+            # The first state change after a nomination settles the election:
+            if nominated is not None:
+                elected = (seat(data["president"]), seat(data["chancellor"])) == nominated
+                columns["governments"]["elected"][government] = elected
+                nominated = None
+
+            rounds[data["round_num"]] = data
+            last_state = data
+
+    for round_num, data in sorted(rounds.items()):
+        columns["rounds"]["game"].append(game)
+        columns["rounds"]["round"].append(round_num)
+        columns["rounds"]["failed_elections"].append(data["failed_elections"])
+        columns["rounds"]["liberal_enacted"].append(data["enacted_policies"][Policy.liberal])
+        columns["rounds"]["fascist_enacted"].append(data["enacted_policies"][Policy.fascist])
+
+    dead = set(last_state["dead"]) if last_state else set()
+    for name in seats:
+        columns["players"]["alive"].append(name not in dead)
+
+    winner = last_state.get("winner") if last_state else None
+    columns["games"]["game_id"].append(game_id)
+    columns["games"]["n_players"].append(len(seats))
+    columns["games"]["winner"].append(PARTIES.index(winner) if winner else -1)
+    columns["games"]["win_reason"].append((last_state or {}).get("win_reason") or "")
+    columns["games"]["rounds"].append(max(rounds, default=0))
+    columns["games"]["liberal_enacted"].append(
+        last_state["enacted_policies"][Policy.liberal] if last_state else 0
+    )
+    columns["games"]["fascist_enacted"].append(
+        last_state["enacted_policies"][Policy.fascist] if last_state else 0
+    )
+
+
+class GameArchive:
+    def __init__(self, tables: Tables) -> None:
+        self.tables = tables
+        self.games = tables["games"]
+        self.players = tables["players"]
+        self.governments = tables["governments"]
+        self.votes = tables["votes"]
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "GameArchive":
+        mmap_mode = "r" if mmap else None
+        tables = {
+            table: {
+                name: np.load(os.path.join(path, table, f"{name}.npy"), mmap_mode=mmap_mode)
+                for name in schema
+            }
+            for table, schema in SCHEMA.items()
+        }
+        return cls(tables)
+
+    def seat_roles(self) -> np.ndarray:
+        roles = np.full((len(self.games["game_id"]), MAX_SEATS), -1, dtype=np.int8)
+        roles[self.players["game"], self.players["seat"]] = self.players["role"]
+        return roles
+
+    def player_won(self) -> Tuple[np.ndarray, np.ndarray]:
+        winner = self.games["winner"][self.players["game"]]
+        party = (self.players["role"] != ROLES.index(Role.liberal)).astype(np.int8)
+        return winner >= 0, party == winner
+
+    def win_rate_by_role(self) -> Dict[str, float]:
+        finished, won = self.player_won()
+        rates = {}
+        for code, role in enumerate(ROLES):
+            mask = finished & (self.players["role"] == code)
+            rates[role] = float(won[mask].mean()) if mask.any() else float("nan")
+
+        return rates
+
+    def win_rate_by_seat(self) -> np.ndarray:
+        finished, won = self.player_won()
+        seats = self.players["seat"][finished]
+        totals = np.bincount(seats, minlength=MAX_SEATS)
+        wins = np.bincount(seats, weights=won[finished], minlength=MAX_SEATS)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return wins / totals
+
+    def vote_matrix(self) -> np.ndarray:
+        # One row per government, one column per seat, -1 where the seat did not vote:
+        matrix = np.full((len(self.governments["game"]), MAX_SEATS), -1, dtype=np.int8)
+        matrix[self.votes["government"], self.votes["seat"]] = self.votes["vote"]
+        return matrix
+
+    def vote_alignment(self, by: str = "role") -> Dict[Tuple[str, str], float]:
+        matrix = self.vote_matrix()
+        if by == "role":
+            labels: List[str] = list(ROLES)
+            codes = self.seat_roles()[self.governments["game"]]
+        else:
+            labels, inverse = np.unique(self.players["name"], return_inverse=True)
+            seat_names = np.full((len(self.games["game_id"]), MAX_SEATS), -1, dtype=np.int64)
+            seat_names[self.players["game"], self.players["seat"]] = inverse
+            codes = seat_names[self.governments["game"]]
+
+        n = len(labels)
+        agreed = np.zeros(n * n)
+        shared = np.zeros(n * n)
+        for a in range(MAX_SEATS):
+            for b in range(a + 1, MAX_SEATS):
+                both = (matrix[:, a] >= 0) & (matrix[:, b] >= 0)
+                low = np.minimum(codes[both, a], codes[both, b])
+                high = np.maximum(codes[both, a], codes[both, b])
+                keys = low.astype(np.int64) * n + high
+                shared += np.bincount(keys, minlength=n * n)
+                agreed += np.bincount(
+                    keys, weights=matrix[both, a] == matrix[both, b], minlength=n * n
+                )
+
+        return {
+            (str(labels[key // n]), str(labels[key % n])): float(agreed[key] / shared[key])
+            for key in np.flatnonzero(shared)
+        }
+
+    def fascist_policy_blame(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        roles = self.seat_roles()
+        enacted = self.governments["policy"] >= 0
+        games = self.governments["game"][enacted]
+        keys = (
+            roles[games, self.governments["president"][enacted]].astype(np.int64) * len(ROLES)
+            + roles[games, self.governments["chancellor"][enacted]]
+        )
+        fascist = self.governments["policy"][enacted] == POLICIES.index(Policy.fascist)
+
+        size = len(ROLES) ** 2
+        totals = np.bincount(keys, minlength=size)
+        fascist_totals = np.bincount(keys, weights=fascist, minlength=size)
+        return {
+            (ROLES[key // len(ROLES)], ROLES[key % len(ROLES)]): {
+                "enacted": int(totals[key]),
+                "fascist": int(fascist_totals[key]),
+                "fascist_rate": float(fascist_totals[key] / totals[key]),
+            }
+            for key in np.flatnonzero(totals)
+        }
@@ -0,0 +1,251 @@
+import argparse
+import contextlib
+import datetime as dt
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+from src.events import Event, EventType
+from src.game import Game
+from src.game_state import GameState
+from src.game_types import Message, Policy
+from src.llm import FakeBackend, LLMRequest, using_backend
+from src.players import GeminiPlayer, Player, TerminalPlayer
+from src.players.base import POLICY_MAPPING, VOTE_MAPPING
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+REGRESSION_THRESHOLD = 0.25
+# Timings of microseconds vary by more than the prompt threshold between runs on one machine:
+TIMING_THRESHOLD = 1.0
+SIZE_METRICS = ("prompt_chars.",)
+
+HISTORY_SIZES = [10, 100, 1000, 5000]
+QUICK_HISTORY_SIZES = [10, 100]
+PLAYER_NAMES = [f"Player{i}" for i in range(7)]
+PROMPT_ROUNDS = 6
+
+# Every result is a cost, so a larger number than the baseline is always worse.
+Results = Dict[str, float]
+
+
+class PromptRecorder(FakeBackend):
+    def __init__(self, seed: int = None) -> None:
+        super().__init__(seed=seed)
+        self.prompt_chars: Dict[str, List[int]] = defaultdict(list)
+
+    def generate(self, request: LLMRequest) -> str:
+        self.prompt_chars[request.decision].append(len(request.prompt))
+        return super().generate(request)
+
+
+def best_of(function: Callable[[], None], number: int = 1, repeat: int = 5) -> float:
+    # Best mean time per call, which is the least noisy estimate on a shared machine:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    return best
+
+
+def quiet_game(**kwargs) -> Game:
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = Game([], list(PLAYER_NAMES), **kwargs)
+        game.play_game()
+
+    return game
+
+
+def bench_games(games: int) -> Results:
+    rng = random.Random(0)
+    with using_backend(FakeBackend(seed=0)):
+        start = time.perf_counter()
+        rounds = 0
+        for _ in range(games):
+            rounds += quiet_game(rng=rng).state.round_num
+
+    elapsed = time.perf_counter() - start
+    return {"game.seconds": elapsed / games, "game.round_seconds": elapsed / max(rounds, 1)}
+
+
+def decision_state() -> GameState:
+    # The same few rounds of nominations, chat, votes and policies every time, so prompt sizes
+    # only change when prompt building does, not when the rules take a game somewhere else:
+    game = Game([], list(PLAYER_NAMES), rng=random.Random(0))
+    state = game.state
+    players = game.players
+    start = dt.datetime(2024, 1, 1)
+    when = (start + dt.timedelta(milliseconds=i) for i in itertools.count())
+    for round_num in range(1, PROMPT_ROUNDS + 1):
+        state.round_num = round_num
+        president = players[round_num % len(players)]
+        chancellor = players[(round_num + 1) % len(players)]
+        state.record(
+            Event(
+                time=next(when),
+                event_type=EventType.chancellor_nominated,
+                actor=president,
+                recipient=chancellor,
+            )
+        )
+        for player in players:
+            content = f"{player.name} thinks {chancellor.name} is a fine chancellor."
+            state.record(Message(time=next(when), author=player, content=content))
+        for i, player in enumerate(players):
+            event_type = VOTE_MAPPING[i % 3 != 0]
+            state.record(Event(time=next(when), event_type=event_type, actor=player))
+        policy = Policy.liberal if round_num % 2 else Policy.fascist
+        state.record(Event(time=next(when), event_type=POLICY_MAPPING[policy], actor=chancellor))
+
+    return state
+
+
+# Every prompted decision, each made once by the first seat of a fresh decision_state():
+PROMPT_DECISIONS: List[Callable[[GameState, GeminiPlayer, List[Player]], Any]] = [
+    lambda state, player, others: player.nominate_chancellor(state, others),
+    lambda state, player, others: player.vote_on_government(state, others[0], others[1]),
+    lambda state, player, others: player.propose_policies(
+        state, [Policy.liberal, Policy.fascist, Policy.fascist]
+    ),
+    lambda state, player, others: player.enact_policy(state, [Policy.liberal, Policy.fascist]),
+    lambda state, player, others: player.action_investigate_loyalty(state, others),
+    lambda state, player, others: player.action_execution(state, others),
+    lambda state, player, others: player.action_special_election(state, others),
+    lambda state, player, others: player.discuss(state, ""),
+]
+
+
+def bench_prompt_sizes() -> Results:
+    with using_backend(PromptRecorder(seed=0)) as backend:
+        for decide in PROMPT_DECISIONS:
+            state = decision_state()
+            player, *others = state.players
+            with contextlib.redirect_stdout(io.StringIO()):
+                decide(state, player, others)
+
+    return {
+        f"prompt_chars.{decision}": sum(sizes) / len(sizes)
+        for decision, sizes in sorted(backend.prompt_chars.items())
+    }
+
+
+def filled_state(size: int) -> GameState:
+    game = Game([], list(PLAYER_NAMES))
+    players = game.players
+    start = dt.datetime.now()
+    for i in range(size):
+        actor = players[i % len(players)]
+        when = start + dt.timedelta(milliseconds=i)
+        if i % 2:
+            game.state.record(Event(time=when, event_type=EventType.vote_in_favour, actor=actor))
+        else:
+            game.state.record(Message(time=when, author=actor, content=f"Message {i}"))
+
+    return game.state
+
+
+def bench_history(sizes: List[int]) -> Results:
+    results = {}
+    for size in sizes:
+        state = filled_state(size)
+        player = next(p for p in state.players if isinstance(p, GeminiPlayer))
+        results[f"build_game_log.{size}"] = best_of(
+            lambda: player.build_game_log(state), number=100
+        )
+
+        # The terminal buffer drains on read, so every sample needs a fresh backlog:
+        reader = TerminalPlayer(name="Reader", party=player.party, role=player.role)
+        best = float("inf")
+        for _ in range(5):
+            reader._unseen = list(state.event_history) + list(state.public_chat)
+            start = time.perf_counter()
+            reader.build_latest_chat(state)
+            best = min(best, time.perf_counter() - start)
+        results[f"build_latest_chat.{size}"] = best
+
+    return results
+
+
+def bench_records(count: int) -> Results:
+    actor = GeminiPlayer(name="Actor", party="Liberal", role="Liberal")
+    events = []
+    messages = []
+
+    def create() -> None:
+        events[:] = [Event(event_type=EventType.vote_in_favour, actor=actor) for _ in range(count)]
+        messages[:] = [Message(author=actor, content="Hello") for _ in range(count)]
+
+    def hash_all() -> None:
+        set(events)
+        set(messages)
+
+    return {
+        "records.create_seconds": best_of(create, repeat=3) / count,
+        "records.hash_seconds": best_of(hash_all, repeat=3) / count,
+    }
+
+
+def run_benchmarks(quick: bool = False) -> Results:
+    results = {}
+    results.update(bench_games(games=1 if quick else 5))
+    results.update(bench_prompt_sizes())
+    results.update(bench_history(QUICK_HISTORY_SIZES if quick else HISTORY_SIZES))
+    results.update(bench_records(count=1_000 if quick else 10_000))
+
+    return results
+
+
+def compare(
+    results: Results,
+    baseline: Results,
+    threshold: float = REGRESSION_THRESHOLD,
+    timing_threshold: float = TIMING_THRESHOLD,
+) -> List[str]:
+    regressions = []
+    for name, value in results.items():
+        previous = baseline.get(name)
+        allowed = threshold if name.startswith(SIZE_METRICS) else timing_threshold
+        if previous and value > previous * (1 + allowed):
+            regressions.append(f"{name}: {value:.6g} vs baseline {previous:.6g}")
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the game engine and prompt building.")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Store the results as the baseline.")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions.")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--timing-threshold", type=float, default=TIMING_THRESHOLD)
+    parser.add_argument("--quick", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmarks(quick=args.quick)
+    for name, value in results.items():
+        print(f"{name:<45} {value:.6g}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+    if args.check:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.threshold, args.timing_threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
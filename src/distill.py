@@ -0,0 +1,88 @@
+import argparse
+from collections import defaultdict
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+from src.players.distilled import Examples, GameView, LinearPolicy
+from src.store import EventStore
+
+EPOCHS = 500
+LEARNING_RATE = 0.5
+L2 = 1e-3
+
+
+def load_examples(store: EventStore, player_types: Iterable[str] = ("GeminiPlayer",)) -> Examples:
+    player_types = set(player_types)
+    examples: Examples = defaultdict(list)
+    for game_id in store.games():
+        view = None
+        for kind, data in store.load(game_id):
+            if kind == "game_started":
+                view = GameView(data)
+            elif kind == "decision":
+                if view.types[data["actor"]] in player_types:
+                    features = view.features(data["decision"], data["actor"], data["options"])
+                    examples[data["decision"]].append(
+                        (features, data["options"].index(data["choice"]))
+                    )
+            else:
+                view.update(kind, data)
+
+    return examples
+
+
+def fit(
+    rows: List[Tuple[np.ndarray, int]],
+    epochs: int = EPOCHS,
+    learning_rate: float = LEARNING_RATE,
+    l2: float = L2,
+) -> np.ndarray:
+    # Options are padded to the widest decision and masked out of the softmax:
+    width = max(len(x) for x, _ in rows)
+    dims = rows[0][0].shape[1]
+    features = np.zeros((len(rows), width, dims))
+    mask = np.zeros((len(rows), width), dtype=np.bool_)
+    targets = np.zeros((len(rows), width))
+    for i, (x, y) in enumerate(rows):
+        features[i, : len(x)] = x
+        mask[i, : len(x)] = True
+        targets[i, y] = 1
+
+    weights = np.zeros(dims)
+    for _ in range(epochs):
+        scores = np.where(mask, features @ weights, -np.inf)
+        probabilities = np.exp(scores - scores.max(axis=1, keepdims=True))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        gradient = np.einsum("nk,nkd->d", probabilities - targets, features) / len(rows)
+        weights -= learning_rate * (gradient + l2 * weights)
+
+    return weights
+
+
+def train(examples: Examples, **kwargs) -> LinearPolicy:
+    return LinearPolicy(
+        {decision: fit(rows, **kwargs) for decision, rows in examples.items() if rows}
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Distil logged LLM decisions into a policy.")
+    parser.add_argument("store", help="SQLite event store with logged games.")
+    parser.add_argument("output", help="Where to write the policy weights (.npz).")
+    parser.add_argument("--player-type", action="append", default=None)
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    args = parser.parse_args()
+
+    store = EventStore(args.store)
+    examples = load_examples(store, args.player_type or ["GeminiPlayer"])
+    store.close()
+
+    policy = train(examples, epochs=args.epochs)
+    policy.save(args.output)
+    for decision, accuracy in policy.accuracy(examples).items():
+        print(f"{decision:<30} {len(examples[decision]):>6} decisions, {accuracy:.1%} agreement")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+import random
+from enum import IntEnum
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.analytics import MAX_SEATS, POLICIES, ROLES
+from src.game import FAILED_ELECTIONS_LIMIT, Game
+from src.game_types import Party, Policy, Power, Role
+from src.players import AgentPlayer, Player
+
+GOVERNMENT_HISTORY = 10
+NUM_ACTIONS = MAX_SEATS
+HAND_SIZE = 3
+
+
+class Phase(IntEnum):
+    nominate = 0
+    vote = 1
+    propose = 2
+    enact = 3
+    investigate = 4
+    execute = 5
+    special_election = 6
+
+
+# Per seat, the number of values in each block of the observation:
+GOVERNMENT_SIZE = 2 * MAX_SEATS + 1 + len(POLICIES)
+BLOCKS = {
+    "phase": len(Phase),
+    "seat": MAX_SEATS,
+    "role": len(ROLES),
+    "alive": MAX_SEATS,
+    "president": MAX_SEATS,
+    "chancellor": MAX_SEATS,
+    "nominee": MAX_SEATS,
+    "enacted": len(POLICIES),
+    "failed_elections": 1,
+    "known": MAX_SEATS * len(ROLES),
+    "hand": HAND_SIZE * len(POLICIES),
+    "peek": HAND_SIZE * len(POLICIES),
+    "government_age": GOVERNMENT_HISTORY,
+    "governments": GOVERNMENT_HISTORY * GOVERNMENT_SIZE,
+    "votes": GOVERNMENT_HISTORY * MAX_SEATS,
+}
+
+OBS_SLICES: Dict[str, slice] = {}
+_offset = 0
+for _name, _size in BLOCKS.items():
+    OBS_SLICES[_name] = slice(_offset, _offset + _size)
+    _offset += _size
+OBS_SIZE = _offset
+
+PARTY_ROLE = {Party.liberal: Role.liberal, Party.fascist: Role.fascist}
+
+# Powers which need a target seat from the president:
+TARGETED_POWERS = {
+    Power.investigate_loyalty: Phase.investigate,
+    Power.execution: Phase.execute,
+    Power.special_election: Phase.special_election,
+}
+
+
+class VectorEnv:
+    # Runs N games in lockstep for training agents, one row of observations and actions per seat.
+    #
+    # Every step takes an action for each seat of each game, but only seats whose action mask
+    # has a legal entry are acting: the president while nominating, proposing or using a power,
+    # the chancellor while enacting and every voter during a vote. The action is a seat index
+    # for targeted decisions, 0/1 for a vote and a card index for legislation. Illegal actions
+    # fall back to the first legal one, as for remote players.
+    #
+    # Observation, mask, reward and done arrays are allocated once and updated in place as the
+    # games move on, so callers must copy them if they keep them across steps.
+    def __init__(self, num_envs: int, num_players: int = 7) -> None:
+        if not 5 <= num_players <= MAX_SEATS:
+            raise ValueError(f"Games need between 5 and {MAX_SEATS} players.")
+
+        self.num_envs = num_envs
+        self.num_players = num_players
+        self.observations = np.zeros((num_envs, MAX_SEATS, OBS_SIZE), dtype=np.float32)
+        self.masks = np.zeros((num_envs, MAX_SEATS, NUM_ACTIONS), dtype=np.bool_)
+        self.rewards = np.zeros((num_envs, MAX_SEATS), dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=np.bool_)
+        self.illegal_actions = 0
+        self.random = random.Random()
+
+        self.games: List[Game] = [None] * num_envs
+        self.seats: List[Dict[str, int]] = [None] * num_envs
+        self.phase = [Phase.nominate] * num_envs
+        self.turn = [0] * num_envs
+        self.special: List[Player | None] = [None] * num_envs
+        self.nominee: List[Player] = [None] * num_envs
+        self.hand: List[List[Policy]] = [None] * num_envs
+        self.governments = [0] * num_envs
+        self.winners: List[Tuple[Party, str] | None] = [None] * num_envs
+
+    def reset(self, seed: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        if seed is not None:
+            self.random = random.Random(seed)
+
+        for i in range(self.num_envs):
+            self.reset_env(i)
+
+        return self.observations, self.masks
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        self.rewards.fill(0)
+        self.dones.fill(False)
+        for i in range(self.num_envs):
+            winner = self.step_env(i, actions[i])
+            if winner is not None:
+                # Finished games report their reward and restart straight away:
+                self.winners[i] = winner
+                self.finish_env(i, winner[0])
+                self.reset_env(i)
+
+        return self.observations, self.masks, self.rewards, self.dones
+
+    def reset_env(self, i: int) -> None:
+        game = Game(
+            [f"Seat{k}" for k in range(self.num_players)],
+            [],
+            human_class=AgentPlayer,
+            rng=self.random,
+        )
+        self.games[i] = game
+        self.seats[i] = {p.name: k for k, p in enumerate(game.players)}
+        self.turn[i] = 0
+        self.special[i] = None
+        self.nominee[i] = None
+        self.hand[i] = None
+        self.governments[i] = 0
+
+        obs = self.observations[i]
+        obs.fill(0)
+        for k, player in enumerate(game.players):
+            obs[k, OBS_SLICES["seat"].start + k] = 1
+            obs[k, OBS_SLICES["role"].start + ROLES.index(player.role)] = 1
+            self.reveal(i, k, k, player.role)
+            for ally in player.known_allies(game.players):
+                self.reveal(i, k, self.seats[i][ally.name], ally.role)
+        obs[: self.num_players, OBS_SLICES["alive"]][:, : self.num_players] = 1
+
+        self.start_nomination(i)
+
+    def finish_env(self, i: int, winner: Party) -> None:
+        self.dones[i] = True
+        for k, player in enumerate(self.games[i].players):
+            self.rewards[i, k] = 1 if player.party == winner else -1
+
+    def set_seat(self, i: int, block: str, seat: int | None) -> None:
+        # One-hot seat block shared by every observer in the game:
+        block_slice = OBS_SLICES[block]
+        self.observations[i, :, block_slice] = 0
+        if seat is not None:
+            self.observations[i, :, block_slice.start + seat] = 1
+
+    def set_phase(self, i: int, phase: Phase) -> None:
+        self.phase[i] = phase
+        self.set_seat(i, "phase", phase)
+        self.masks[i] = False
+
+    def set_cards(self, i: int, seat: int, block: str, cards: List[Policy]) -> None:
+        start = OBS_SLICES[block].start
+        self.observations[i, seat, OBS_SLICES[block]] = 0
+        for j, card in enumerate(cards[:HAND_SIZE]):
+            self.observations[i, seat, start + j * len(POLICIES) + POLICIES.index(card)] = 1
+
+    def reveal(self, i: int, observer: int, seat: int, role: Role) -> None:
+        start = OBS_SLICES["known"].start + seat * len(ROLES)
+        self.observations[i, observer, start : start + len(ROLES)] = 0
+        self.observations[i, observer, start + ROLES.index(role)] = 1
+
+    def update_counts(self, i: int) -> None:
+        state = self.games[i].state
+        enacted = OBS_SLICES["enacted"].start
+        for j, policy in enumerate(POLICIES):
+            self.observations[i, :, enacted + j] = state.enacted_policies[policy]
+        self.observations[i, :, OBS_SLICES["failed_elections"]] = state.failed_elections
+
+    def seat_of(self, i: int, player: Player) -> int:
+        return self.seats[i][player.name]
+
+    def legal(self, i: int, seat: int, actions: List[int]) -> None:
+        self.masks[i, seat, actions] = True
+
+    def choose(self, i: int, seat: int, action: int) -> int:
+        if not self.masks[i, seat, action]:
+            self.illegal_actions += 1
+            action = int(np.argmax(self.masks[i, seat]))
+
+        return int(action)
+
+    def president(self, i: int) -> Player:
+        if self.special[i] is not None:
+            return self.special[i]
+
+        game = self.games[i]
+        while not game.valid_president(game.players[self.turn[i] % len(game.players)]):
+            self.turn[i] += 1
+
+        return game.players[self.turn[i] % len(game.players)]
+
+    def start_nomination(self, i: int) -> None:
+        game = self.games[i]
+        game.state.start_round()
+        president = self.president(i)
+        self.nominee[i] = None
+        self.set_seat(i, "nominee", None)
+        self.update_counts(i)
+
+        self.set_phase(i, Phase.nominate)
+        candidates = game.valid_chancellors(president, game.state.president, game.state.chancellor)
+        self.legal(i, self.seat_of(i, president), [self.seat_of(i, p) for p in candidates])
+
+    def next_round(self, i: int) -> None:
+        # The order carries on from the seat after the president who called a special election:
+        if self.special[i] is not None:
+            self.special[i] = None
+        else:
+            self.turn[i] += 1
+        self.start_nomination(i)
+
+    def step_env(self, i: int, actions: np.ndarray) -> Tuple[Party, str] | None:
+        game = self.games[i]
+        president = self.president(i)
+        president_seat = self.seat_of(i, president)
+        phase = self.phase[i]
+
+        if phase == Phase.nominate:
+            president.act(game.players[self.choose(i, president_seat, actions[president_seat])])
+            candidates = game.valid_chancellors(
+                president, game.state.president, game.state.chancellor
+            )
+            chancellor = president.nominate_chancellor(game.state, candidates)
+            self.nominee[i] = chancellor
+            self.set_seat(i, "nominee", self.seat_of(i, chancellor))
+            self.set_phase(i, Phase.vote)
+            for voter in game.valid_voters(president, chancellor):
+                self.legal(i, self.seat_of(i, voter), [0, 1])
+            return None
+
+        if phase == Phase.vote:
+            return self.resolve_vote(i, president, actions)
+
+        if phase == Phase.propose:
+            president.act(self.choose(i, president_seat, actions[president_seat]))
+            proposal = president.propose_policies(game.state, self.hand[i])
+            game.discard_deck.extend(proposal.discarded)
+            hand = self.hand[i] = proposal.selected
+            chancellor_seat = self.seat_of(i, game.state.chancellor)
+            self.set_cards(i, president_seat, "hand", [])
+            self.set_cards(i, chancellor_seat, "hand", hand)
+            self.set_phase(i, Phase.enact)
+            self.legal(i, chancellor_seat, list(range(len(hand))))
+            return None
+
+        if phase == Phase.enact:
+            return self.resolve_enact(i, actions)
+
+        president.act(game.players[self.choose(i, president_seat, actions[president_seat])])
+        targets = game.valid_players(president)
+        if phase == Phase.investigate:
+            target = president.action_investigate_loyalty(game.state, targets)
+            self.reveal(i, president_seat, self.seat_of(i, target), PARTY_ROLE[target.party])
+        elif phase == Phase.special_election:
+            target = president.action_special_election(game.state, targets)
+            self.turn[i] += 1
+            self.special[i] = target
+            self.start_nomination(i)
+            return None
+        else:
+            target = president.action_execution(game.state, targets)
+            target.alive = False
+            self.observations[i, :, OBS_SLICES["alive"].start + self.seat_of(i, target)] = 0
+            game.state.record_state()
+            if (win := game.check_win()) is not None:
+                return win
+
+        self.next_round(i)
+        return None
+
+    def resolve_vote(
+        self, i: int, president: Player, actions: np.ndarray
+    ) -> Tuple[Party, str] | None:
+        game = self.games[i]
+        chancellor = self.nominee[i]
+        voters = game.valid_voters(president, chancellor)
+        for voter in voters:
+            seat = self.seat_of(i, voter)
+            voter.act(bool(self.choose(i, seat, actions[seat])))
+        votes = [voter.vote_on_government(game.state, president, chancellor) for voter in voters]
+        elected = sum(votes) > len(votes) // 2
+
+        # Government history is a ring buffer, with the age of each slot alongside it:
+        slot = self.governments[i] % GOVERNMENT_HISTORY
+        self.governments[i] += 1
+        obs = self.observations[i]
+        age = OBS_SLICES["government_age"]
+        obs[:, age] += 1 / GOVERNMENT_HISTORY
+        obs[:, age.start + slot] = 1 / GOVERNMENT_HISTORY
+
+        start = OBS_SLICES["governments"].start + slot * GOVERNMENT_SIZE
+        obs[:, start : start + GOVERNMENT_SIZE] = 0
+        obs[:, start + self.seat_of(i, president)] = 1
+        obs[:, start + MAX_SEATS + self.seat_of(i, chancellor)] = 1
+        obs[:, start + 2 * MAX_SEATS] = elected
+
+        votes_start = OBS_SLICES["votes"].start + slot * MAX_SEATS
+        obs[:, votes_start : votes_start + MAX_SEATS] = 0
+        for voter, vote in zip(voters, votes):
+            obs[:, votes_start + self.seat_of(i, voter)] = 1 if vote else -1
+
+        if elected:
+            game.state.elect_government(chancellor=chancellor, president=president)
+            self.set_seat(i, "president", self.seat_of(i, president))
+            self.set_seat(i, "chancellor", self.seat_of(i, chancellor))
+            if (win := game.check_win(election=True)) is not None:
+                return win
+
+            self.hand[i] = game.draw_policies(HAND_SIZE)
+            self.set_cards(i, self.seat_of(i, president), "hand", self.hand[i])
+            self.set_phase(i, Phase.propose)
+            self.legal(i, self.seat_of(i, president), list(range(HAND_SIZE)))
+            return None
+
+        game.state.failed_elections += 1
+        if game.state.failed_elections == FAILED_ELECTIONS_LIMIT:
+            game.state.failed_elections = 0
+            game.state.enacted_policies[game.draw_policies(amount=1)[0]] += 1
+            game.state.forget_government()
+            game.state.record_state()
+            if (win := game.check_win()) is not None:
+                return win
+
+        self.next_round(i)
+        return None
+
+    def resolve_enact(self, i: int, actions: np.ndarray) -> Tuple[Party, str] | None:
+        game = self.games[i]
+        president_seat = self.seat_of(i, game.state.president)
+        chancellor_seat = self.seat_of(i, game.state.chancellor)
+        chancellor = game.state.chancellor
+        chancellor.act(self.choose(i, chancellor_seat, actions[chancellor_seat]))
+        selection = chancellor.enact_policy(game.state, self.hand[i])
+        policy = selection.selected[0]
+        game.discard_deck.extend(selection.discarded)
+        self.hand[i] = None
+        self.set_cards(i, chancellor_seat, "hand", [])
+
+        game.state.enacted_policies[policy] += 1
+        game.state.failed_elections = 0
+        game.state.record_state()
+        self.update_counts(i)
+        if (win := game.check_win()) is not None:
+            return win
+
+        power = None
+        if policy == Policy.fascist:
+            power = game.powers.get(game.state.enacted_policies[Policy.fascist])
+        if power in TARGETED_POWERS:
+            president = game.state.president
+            self.set_phase(i, TARGETED_POWERS[power])
+            self.legal(
+                i, president_seat, [self.seat_of(i, p) for p in game.valid_players(president)]
+            )
+            return None
+
+        if power == Power.policy_peek:
+            if len(game.policy_deck) < HAND_SIZE:
+                game.reshuffle_deck()
+            self.set_cards(i, president_seat, "peek", game.policy_deck[-HAND_SIZE:][::-1])
+
+        self.next_round(i)
+        return None
@@ -0,0 +1,153 @@
+import asyncio
+import queue
+import threading
+from typing import Any, Callable, List
+
+SUBSCRIBER_QUEUE_SIZE = 10_000
+
+_STOP = object()
+
+
+class Subscription:
+    def __init__(self, handler: Callable[[Any], None]) -> None:
+        self.handler = handler
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def lag(self) -> int:
+        return 0
+
+    def offer(self, item: Any) -> None:
+        self.handler(item)
+        self.delivered += 1
+
+    def close(self) -> None:
+        pass
+
+
+class QueuedSubscription(Subscription):
+    # Delivers on its own thread, a full queue sheds its oldest item rather than stall the game.
+    def __init__(
+        self, handler: Callable[[Any], None], maxsize: int, max_block: float = 0.0
+    ) -> None:
+        super().__init__(handler)
+        self.max_block = max_block
+        self.errors = 0
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    @property
+    def lag(self) -> int:
+        return self.queue.qsize()
+
+    def offer(self, item: Any) -> None:
+        try:
+            if self.max_block:
+                self.queue.put(item, timeout=self.max_block)
+            else:
+                self.queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+
+        try:
+            self.queue.get_nowait()
+            self.dropped += 1
+        except queue.Empty:
+            pass
+
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self) -> None:
+        while (item := self.queue.get()) is not _STOP:
+            try:
+                self.handler(item)
+                self.delivered += 1
+            except Exception:
+                self.errors += 1
+
+    def join(self) -> None:
+        # Wait for the queue to drain, then stop the worker:
+        self.queue.put(_STOP)
+        self.worker.join()
+
+    def close(self) -> None:
+        # The worker or a publisher can change the queue between calls, so retry until it fits:
+        while True:
+            try:
+                self.queue.put_nowait(_STOP)
+                return
+            except queue.Full:
+                pass
+
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+
+class AsyncioSubscription(Subscription):
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int) -> None:
+        super().__init__(handler=None)
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    @property
+    def lag(self) -> int:
+        return self.queue.qsize()
+
+    def put(self, item: Any) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+        self.delivered += 1
+
+    def offer(self, item: Any) -> None:
+        self.loop.call_soon_threadsafe(self.put, item)
+
+
+class EventBus:
+    def __init__(self) -> None:
+        self.subscriptions: List[Subscription] = []
+        self.lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.subscriptions)
+
+    def add(self, subscription: Subscription) -> Subscription:
+        with self.lock:
+            self.subscriptions = self.subscriptions + [subscription]
+        return subscription
+
+    def subscribe(self, handler: Callable[[Any], None]) -> Subscription:
+        # Runs inline on the publishing thread, only for cheap handlers:
+        return self.add(Subscription(handler))
+
+    def subscribe_queued(
+        self,
+        handler: Callable[[Any], None],
+        maxsize: int = SUBSCRIBER_QUEUE_SIZE,
+        max_block: float = 0.0,
+    ) -> QueuedSubscription:
+        return self.add(QueuedSubscription(handler, maxsize, max_block))
+
+    def subscribe_asyncio(
+        self, loop: asyncio.AbstractEventLoop, maxsize: int = SUBSCRIBER_QUEUE_SIZE
+    ) -> AsyncioSubscription:
+        return self.add(AsyncioSubscription(loop, maxsize))
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self.lock:
+            self.subscriptions = [s for s in self.subscriptions if s is not subscription]
+        subscription.close()
+
+    def publish(self, item: Any) -> None:
+        for subscription in self.subscriptions:
+            subscription.offer(item)
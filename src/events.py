@@ -18,6 +18,7 @@ class EventType(StrEnum):
     vote_in_favour = "voted in favour of the new Government"
     vote_against = "voted against the new Government"
     player_executed = "executed"
+    special_election = "chosen as the next President"
     loyalty_investigated = "investigated"
     policy_peek = "top 3 policies peeked at"
 
@@ -0,0 +1,506 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List, Set, Tuple
+
+from pydantic import BaseModel, PrivateAttr
+
+from src.game import (
+    FAILED_ELECTIONS_LIMIT,
+    FASCIST_POLICIES_WIN,
+    FASCIST_POLICY_COUNT,
+    LIBERAL_POLICIES_WIN,
+    LIBERAL_POLICY_COUNT,
+    POLICIES_FOR_HITLER_CHANCELLOR,
+    TERM_LIMIT_PLAYERS,
+    Game,
+)
+from src.game_state import GameState, StateChange
+from src.game_types import Party, Policy, Power, Role, Selection
+from src.players import Player
+
+PLAYER_COUNTS = [5, 6, 7, 8, 9, 10]
+BATCH_SIZE = 200
+MAX_ROUNDS = 100
+HAND_SIZE = 3
+
+
+class Violation(Exception):
+    def __init__(self, invariant: str, message: str) -> None:
+        super().__init__(f"{invariant}: {message}")
+        self.invariant = invariant
+        self.message = message
+
+
+class Replay(BaseModel):
+    players: int
+    seed: int
+    choices: List[int]
+    invariant: str
+    message: str
+
+
+class ChoiceTape:
+    # Every decision in a fuzzed game is one entry, so a game replays from its seed and tape alone.
+    #
+    # Replayed tapes are read modulo the options on offer and run out into the first option,
+    # which lets the shrinker cut or lower entries freely.
+    def __init__(self, seed: int, choices: List[int] | None = None) -> None:
+        self.random = random.Random(seed)
+        self.replaying = choices is not None
+        self.choices = list(choices) if choices is not None else []
+        self.position = 0
+
+    def pick(self, options: int) -> int:
+        if not self.replaying:
+            self.choices.append(self.random.randrange(options))
+        elif self.position >= len(self.choices):
+            self.choices.append(0)
+
+        choice = self.choices[self.position] % options
+        self.position += 1
+        return choice
+
+    def used(self) -> List[int]:
+        return self.choices[: self.position]
+
+
+class Checker:
+    # Shadow model of the rules, checked whenever a seat is asked to act and on every state change.
+    def __init__(self, game: Game, tape: ChoiceTape) -> None:
+        self.game = game
+        self.tape = tape
+        self.hand: List[Policy] = []
+        self.enacted = {Policy.liberal: 0, Policy.fascist: 0}
+        self.executed: Set[str] = set()
+        self.failed = 0
+        self.next_seat = 0
+        self.special: Player | None = None
+        self.nomination: Tuple[Player, Player] | None = None
+        self.votes: List[bool] = []
+        self.government: Tuple[Player, Player] | None = None
+        self.elected_now = False
+        self.power: Power | None = None
+        self.steps = 0
+
+    def check(self, condition: bool, invariant: str, message: str) -> None:
+        if not condition:
+            raise Violation(invariant, message)
+
+    def alive(self) -> List[Player]:
+        return [p for p in self.game.players if p.name not in self.executed]
+
+    def check_cards(self) -> None:
+        game = self.game
+        cards = Counter(game.policy_deck) + Counter(game.discard_deck) + Counter(self.hand)
+        for policy, count in game.state.enacted_policies.items():
+            cards[policy] += count
+
+        expected = {Policy.liberal: LIBERAL_POLICY_COUNT, Policy.fascist: FASCIST_POLICY_COUNT}
+        self.check(cards == expected, "cards", f"{dict(cards)} across deck, discard and board")
+
+    def state_changed(self, item: object) -> None:
+        if not isinstance(item, StateChange):
+            return
+
+        self.steps += 1
+        self.check_cards()
+        self.check(item.round_num <= MAX_ROUNDS, "termination", f"{item.round_num} rounds")
+        self.check(
+            0 <= item.failed_elections < FAILED_ELECTIONS_LIMIT,
+            "election_tracker",
+            f"tracker at {item.failed_elections}",
+        )
+        enacted = item.enacted_policies
+        self.check(
+            enacted[Policy.liberal] <= LIBERAL_POLICIES_WIN
+            and enacted[Policy.fascist] <= FASCIST_POLICIES_WIN,
+            "board",
+            f"{enacted} enacted",
+        )
+        dead = {p.name for p in self.game.players if not p.alive}
+        self.check(dead == self.executed, "alive", f"{sorted(dead)} dead, expected {self.executed}")
+
+    def acting(self, player: Player) -> None:
+        # Nobody may be asked to act once the game is decided, or after being executed:
+        self.check(player.alive, "alive", f"{player.name} acted after being executed")
+        self.check(not self.wins(), "win", f"{player.name} asked to act after {self.wins()}")
+        self.check_cards()
+
+    def wins(self) -> List[Party]:
+        state = self.game.state
+        wins = []
+        if state.enacted_policies[Policy.liberal] >= LIBERAL_POLICIES_WIN:
+            wins.append(Party.liberal)
+        if any(p.role == Role.hitler for p in self.game.players if p.name in self.executed):
+            wins.append(Party.liberal)
+        if state.enacted_policies[Policy.fascist] >= FASCIST_POLICIES_WIN:
+            wins.append(Party.fascist)
+        if (
+            self.elected_now
+            and self.government[1].role == Role.hitler
+            and self.enacted[Policy.fascist] >= POLICIES_FOR_HITLER_CHANCELLOR
+        ):
+            wins.append(Party.fascist)
+
+        return wins
+
+    def settle_election(self) -> None:
+        # Votes are only known to have carried or failed once the game moves on:
+        self.elected_now = False
+        if self.nomination is None:
+            return
+
+        if sum(self.votes) > len(self.votes) // 2:
+            self.government = self.nomination
+            self.elected_now = True
+            self.nomination = None
+            return
+
+        self.nomination = None
+        self.failed += 1
+        chaos = self.failed == FAILED_ELECTIONS_LIMIT
+        if chaos:
+            self.failed = 0
+            self.government = None
+
+        enacted = self.game.state.enacted_policies
+        added = sum(enacted.values()) - sum(self.enacted.values())
+        self.check(added == chaos, "chaos", f"{added} policies enacted after a failed election")
+        self.enacted = dict(enacted)
+
+    def nominating(self, president: Player, candidates: List[Player]) -> None:
+        self.settle_election()
+        self.acting(president)
+        self.check(self.power is None, "powers", f"{self.power} was never used")
+        self.check(
+            self.game.state.failed_elections == self.failed,
+            "election_tracker",
+            f"tracker at {self.game.state.failed_elections}, expected {self.failed}",
+        )
+
+        # Presidency passes to the left, skipping the dead, apart from special elections:
+        if self.special is not None:
+            expected, self.special = self.special, None
+        else:
+            players = self.game.players
+            seats = [(self.next_seat + i) % len(players) for i in range(len(players))]
+            seat = next(s for s in seats if players[s].name not in self.executed)
+            expected = players[seat]
+            self.next_seat = seat + 1
+        self.check(president == expected, "rotation", f"{president} presides instead of {expected}")
+
+        alive = self.alive()
+        limited = {president.name}
+        if self.government is not None:
+            limited.add(self.government[1].name)
+            if len(alive) > TERM_LIMIT_PLAYERS:
+                limited.add(self.government[0].name)
+        expected = {p.name for p in alive} - limited
+        offered = {p.name for p in candidates}
+        self.check(offered == expected, "term_limits", f"{sorted(offered)} != {sorted(expected)}")
+
+    def nominated(self, president: Player, chancellor: Player) -> None:
+        self.nomination = (president, chancellor)
+        self.votes = []
+
+    def voting(self, voter: Player, president: Player, chancellor: Player) -> None:
+        self.acting(voter)
+        self.check(
+            self.nomination == (president, chancellor),
+            "nomination",
+            f"vote on {president}/{chancellor} instead of {self.nomination}",
+        )
+        self.check(voter not in self.nomination, "voters", f"{voter} votes on their own government")
+
+    def proposing(self, president: Player, cards: List[Policy]) -> None:
+        self.settle_election()
+        self.check(self.elected_now, "election", f"{president} legislates without being elected")
+        self.check(president == self.government[0], "election", f"{president} is not the president")
+        self.check(
+            len(self.votes) == len(self.alive()) - 2,
+            "voters",
+            f"{len(self.votes)} votes from {len(self.alive())} players",
+        )
+        self.hand = list(cards)
+        self.acting(president)
+        self.check(len(cards) == HAND_SIZE, "legislation", f"president drew {len(cards)}")
+
+    def enacting(self, chancellor: Player, cards: List[Policy]) -> None:
+        self.check(
+            chancellor == self.government[1], "election", f"{chancellor} is not the chancellor"
+        )
+        self.hand = list(cards)
+        self.acting(chancellor)
+        self.check(len(cards) == HAND_SIZE - 1, "legislation", f"chancellor got {len(cards)}")
+
+    def enacted_policy(self, policy: Policy) -> None:
+        self.hand = []
+        self.failed = 0
+        self.elected_now = False
+        self.enacted[policy] += 1
+        if policy == Policy.fascist:
+            self.power = self.game.powers.get(self.enacted[Policy.fascist])
+
+    def using_power(self, power: Power, president: Player, targets: List[Player] = None) -> None:
+        self.acting(president)
+        self.check(self.power == power, "powers", f"{power} used instead of {self.power}")
+        self.check(president == self.government[0], "powers", f"{president} is not the president")
+        self.power = None
+        if targets is not None:
+            expected = {p.name for p in self.alive()} - {president.name}
+            offered = {p.name for p in targets}
+            self.check(offered == expected, "targets", f"{sorted(offered)} != {sorted(expected)}")
+
+    def finished(self) -> None:
+        self.settle_election()
+        state = self.game.state
+        self.check(state.winner is not None, "win", "game ended without a winner")
+        self.check(
+            state.winner in self.wins(), "win", f"{state.winner} won, expected {self.wins()}"
+        )
+
+
+class FuzzPlayer(Player):
+    # Plays every decision from the game's choice tape and reports it to the checker first.
+    _checker: Checker = PrivateAttr(default=None)
+
+    def pick(self, options: List) -> int:
+        return self._checker.tape.pick(len(options))
+
+    def nominate_chancellor(self, game_state: GameState, players: List[Player]) -> Player:
+        self._checker.nominating(self, players)
+        chancellor = players[self.pick(players)]
+        self._checker.nominated(self, chancellor)
+        return chancellor
+
+    def vote_on_government(
+        self, game_state: GameState, president: Player, chancellor: Player
+    ) -> bool:
+        self._checker.voting(self, president, chancellor)
+        vote = self.pick([True, False]) == 0
+        self._checker.votes.append(vote)
+        return vote
+
+    def propose_policies(self, game_state: GameState, policy_cards: List[Policy]) -> Selection:
+        self._checker.proposing(self, policy_cards)
+        discarded = [policy_cards.pop(self.pick(policy_cards))]
+        return Selection(selected=policy_cards, discarded=discarded)
+
+    def enact_policy(self, game_state: GameState, policy_cards: List[Policy]) -> Selection:
+        self._checker.enacting(self, policy_cards)
+        selected = [policy_cards.pop(self.pick(policy_cards))]
+        self._checker.enacted_policy(selected[0])
+        return Selection(selected=selected, discarded=policy_cards)
+
+    def action_investigate_loyalty(self, game_state: GameState, players: List[Player]) -> None:
+        self._checker.using_power(Power.investigate_loyalty, self, players)
+        self.pick(players)
+
+    def action_special_election(self, game_state: GameState, players: List[Player]) -> Player:
+        self._checker.using_power(Power.special_election, self, players)
+        player = players[self.pick(players)]
+        self._checker.special = player
+        return player
+
+    def action_execution(self, game_state: GameState, players: List[Player]) -> Player:
+        self._checker.using_power(Power.execution, self, players)
+        player = players[self.pick(players)]
+        self._checker.executed.add(player.name)
+        return player
+
+    def action_policy_peek(self, game_state: GameState, policies: List[Policy]) -> None:
+        self._checker.using_power(Power.policy_peek, self)
+        self._checker.check(len(policies) >= HAND_SIZE, "cards", f"peek at {len(policies)} cards")
+
+    def discuss(self, game_state: GameState, prompt: str) -> None:
+        pass
+
+
+def play(
+    players: int, seed: int, choices: List[int] | None = None
+) -> Tuple[Checker, Violation | None]:
+    # The deal comes from a generator seeded like the tape, so the seed alone replays it:
+    tape = ChoiceTape(seed, choices)
+    game = Game(
+        [], [f"Player{i}" for i in range(players)], ai_class=FuzzPlayer, rng=random.Random(seed)
+    )
+    checker = Checker(game, tape)
+    for player in game.players:
+        player._checker = checker
+    game.state.bus.subscribe(checker.state_changed)
+
+    try:
+        game.play_game()
+        checker.finished()
+    except Violation as violation:
+        return checker, violation
+    except Exception as error:
+        return checker, Violation("crash", f"{type(error).__name__}: {error}")
+
+    return checker, None
+
+
+def shrink(players: int, seed: int, choices: List[int], invariant: str) -> List[int]:
+    # Delete runs of decisions, halving the run length, then lower what's left towards 0:
+    def fails(candidate: List[int]) -> bool:
+        _, violation = play(players, seed, candidate)
+        return violation is not None and violation.invariant == invariant
+
+    improved = True
+    while improved:
+        improved = False
+        size = max(len(choices) // 2, 1)
+        while size >= 1 and choices:
+            i = 0
+            while i + size <= len(choices):
+                candidate = choices[:i] + choices[i + size :]
+                if fails(candidate):
+                    choices = candidate
+                    improved = True
+                else:
+                    i += size
+            size //= 2
+
+        for i, value in enumerate(choices):
+            for lower in range(value):
+                candidate = choices[:i] + [lower] + choices[i + 1 :]
+                if fails(candidate):
+                    choices = candidate
+                    improved = True
+                    break
+
+    # Missing entries already default to the first option:
+    while choices and choices[-1] == 0:
+        choices.pop()
+
+    return choices
+
+
+def minimal_replay(players: int, seed: int, choices: List[int], violation: Violation) -> Replay:
+    choices = shrink(players, seed, choices, violation.invariant)
+    _, shrunk = play(players, seed, choices)
+    return Replay(
+        players=players,
+        seed=seed,
+        choices=choices,
+        invariant=shrunk.invariant,
+        message=shrunk.message,
+    )
+
+
+def fuzz_batch(start: int, count: int, player_counts: List[int]) -> Dict:
+    games = Counter()
+    steps = 0
+    failures = []
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for seed in range(start, start + count):
+            players = player_counts[seed % len(player_counts)]
+            checker, violation = play(players, seed)
+            games[players] += 1
+            steps += checker.steps
+            if violation is not None:
+                used = checker.tape.used()
+                failures.append(minimal_replay(players, seed, used, violation).model_dump())
+
+    return {"games": dict(games), "steps": steps, "failures": failures}
+
+
+def fuzz(
+    games: int | None = None,
+    seconds: float | None = None,
+    seed: int = 0,
+    workers: int = 1,
+    player_counts: List[int] = PLAYER_COUNTS,
+    on_batch: Callable[[Dict], None] = None,
+) -> Dict:
+    # Batches of consecutive seeds run until the game count or time budget is used up:
+    totals = {"games": Counter(), "steps": 0, "failures": []}
+    started = time.perf_counter()
+    next_seed = seed
+
+    def more() -> bool:
+        played = sum(totals["games"].values())
+        if games is not None and next_seed - seed >= games:
+            return False
+        if seconds is not None and time.perf_counter() - started >= seconds:
+            return False
+        return games is not None or seconds is not None or played == 0
+
+    def batch_size() -> int:
+        return BATCH_SIZE if games is None else min(BATCH_SIZE, seed + games - next_seed)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        while more() or pending:
+            while more() and len(pending) < 2 * workers:
+                size = batch_size()
+                pending.append(executor.submit(fuzz_batch, next_seed, size, player_counts))
+                next_seed += size
+
+            result = pending.pop(0).result()
+            totals["games"].update(result["games"])
+            totals["steps"] += result["steps"]
+            totals["failures"].extend(result["failures"])
+            if on_batch is not None:
+                on_batch(totals)
+
+    totals["seconds"] = time.perf_counter() - started
+    return totals
+
+
+def replay(path: str) -> Violation | None:
+    with open(path) as file:
+        recorded = Replay(**json.load(file))
+
+    _, violation = play(recorded.players, recorded.seed, recorded.choices)
+    return violation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fuzz the game rules with random play.")
+    parser.add_argument("--games", type=int, default=None)
+    parser.add_argument("--seconds", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--players", default=",".join(map(str, PLAYER_COUNTS)))
+    parser.add_argument("--output", default="fuzz_failures", help="Directory for minimal replays.")
+    parser.add_argument("--replay", help="Replay a recorded failure with the game log shown.")
+    args = parser.parse_args()
+
+    if args.replay:
+        violation = replay(args.replay)
+        print(f"\nViolation: {violation}" if violation else "\nNo violation, the bug is fixed.")
+        sys.exit(1 if violation else 0)
+
+    def report(totals: Dict) -> None:
+        played = sum(totals["games"].values())
+        print(f"{played} games, {len(totals['failures'])} failures", end="\r", flush=True)
+
+    player_counts = [int(count) for count in args.players.split(",")]
+    totals = fuzz(args.games, args.seconds, args.seed, args.workers, player_counts, report)
+
+    played = sum(totals["games"].values())
+    print(f"\n{played} games in {totals['seconds']:.1f}s", end=" ")
+    print(f"({played / totals['seconds'] * 3600:,.0f} per hour, {totals['steps']:,} steps checked)")
+    for count, number in sorted(totals["games"].items()):
+        print(f"{count:>4} players {number:>10}")
+
+    if totals["failures"]:
+        os.makedirs(args.output, exist_ok=True)
+        for failure in totals["failures"]:
+            path = os.path.join(args.output, f"{failure['players']}_{failure['seed']}.json")
+            with open(path, "w") as file:
+                json.dump(failure, file, indent=2)
+            print(f"{failure['invariant']}: {failure['message']} -> {path}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
-import datetime as dt
 import random
-from typing import List, Tuple, Union
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Type, Union
 
 from src.game_state import GameState
-from src.game_types import Message, Party, Policy, Role
-from src.players import GeminiPlayer, Player, TerminalPlayer
+from src.game_types import Party, Policy, Power, Role
+from src.memory import MemoryProfiler, RetentionPolicy
+from src.metrics import get_metrics
+from src.players import GeminiPlayer, Player, TerminalChatStream, TerminalPlayer
+from src.players.gemini import call_backend_batch
+from src.rate_limit import Priority
+from src.routing import DecisionType
+from src.speculation import Speculator
+from src.store import EventStore
+from src.transcript import TranscriptArchive, TranscriptWriter
 
 LIBERAL_POLICY_COUNT = 6
 FASCIST_POLICY_COUNT = 11
@@ -13,14 +22,66 @@ LIBERAL_POLICIES_WIN = 5
 FASCIST_POLICIES_WIN = 6
 
 POLICIES_FOR_HITLER_CHANCELLOR = 3
+FAILED_ELECTIONS_LIMIT = 3
+
+# The previous president is only term limited while more than this many players are alive:
+TERM_LIMIT_PLAYERS = 5
+
+# Presidential power granted by each fascist policy, by the number of players the game started with:
+SMALL_GAME_POWERS = {3: Power.policy_peek, 4: Power.execution, 5: Power.execution}
+MEDIUM_GAME_POWERS = {
+    2: Power.investigate_loyalty,
+    3: Power.special_election,
+    4: Power.execution,
+    5: Power.execution,
+}
+LARGE_GAME_POWERS = {1: Power.investigate_loyalty, **MEDIUM_GAME_POWERS}
+EXECUTIVE_POWERS = {
+    5: SMALL_GAME_POWERS,
+    6: SMALL_GAME_POWERS,
+    7: MEDIUM_GAME_POWERS,
+    8: MEDIUM_GAME_POWERS,
+    9: LARGE_GAME_POWERS,
+    10: LARGE_GAME_POWERS,
+}
+
+
+def executive_powers(player_count: int) -> Dict[int, Power]:
+    # Smaller test games use the five player table, larger ones the ten player table:
+    return EXECUTIVE_POWERS[min(max(player_count, min(EXECUTIVE_POWERS)), max(EXECUTIVE_POWERS))]
 
 
 class Game:
     def __init__(
-        self, human_players: List[str], ai_players: List[str], debug: bool = False
+        self,
+        human_players: List[str],
+        ai_players: List[str],
+        debug: bool = False,
+        batch_ai: bool = False,
+        stream_chat: bool = False,
+        async_humans: bool = False,
+        turn_timeout: float | None = None,
+        human_class: Type[Player] = TerminalPlayer,
+        ai_class: Type[Player] = GeminiPlayer,
+        store: EventStore | None = None,
+        game_id: str | None = None,
+        metrics_dir: str | None = None,
+        retention: RetentionPolicy | None = None,
+        memory_profiler: MemoryProfiler | None = None,
+        speculate: bool = False,
+        transcripts: TranscriptArchive | None = None,
+        rng: random.Random | None = None,
     ) -> None:
         self.state = GameState()
+        # Callers that need a replayable deal pass their own generator:
+        self.random = rng if rng is not None else random.Random()
         self.debug = debug
+        self.metrics_dir = metrics_dir
+        self.batch_ai = batch_ai
+        self.speculator = Speculator() if speculate and not debug else None
+        self.async_humans = async_humans
+        self.human_class = human_class
+        self.ai_class = ai_class
 
         # Validate and assign player roles
         self.human_set = set(human_players)
@@ -33,29 +94,50 @@ class Game:
         self.policy_deck = self.create_policy_deck()
         self.discard_deck = []
 
+        self.winner: Tuple[Party, str] | None = None
         self.players = self.assign_roles(all_players)
         self.state.players = self.players
-        self.last_logged_dt = dt.datetime.now()
+        self.powers = executive_powers(len(self.players))
+        self.special_president: Player | None = None
+        for player in self.players:
+            player.observe(self.state)
+        if stream_chat and self.human_set:
+            self.state.chat_streams.append(TerminalChatStream())
+
+        self.game_id = game_id or uuid.uuid4().hex
+        if store is not None:
+            store.attach(self.game_id, self.state)
+        if retention is not None:
+            retention.attach(self.game_id, self.state)
+        if memory_profiler is not None:
+            memory_profiler.attach(self.state)
+        self.transcript: TranscriptWriter | None = None
+        if transcripts is not None:
+            self.transcript = transcripts.attach(self.game_id, self.state)
+
+        for player in self.players:
+            if isinstance(player, TerminalPlayer) and turn_timeout is not None:
+                player.turn_timeout = turn_timeout
 
     def create_policy_deck(self) -> List[Policy]:
         policy_deck = []
         policy_deck.extend([Policy.liberal for _ in range(LIBERAL_POLICY_COUNT)])
         policy_deck.extend([Policy.fascist for _ in range(FASCIST_POLICY_COUNT)])
-        random.shuffle(policy_deck)
+        self.random.shuffle(policy_deck)
 
         return policy_deck
 
     def reshuffle_deck(self) -> None:
         self.policy_deck.extend(self.discard_deck)
         self.discard_deck = []
-        random.shuffle(self.policy_deck)
+        self.random.shuffle(self.policy_deck)
 
     def assign_roles(self, player_names: List[str]) -> List[Player]:
         player_count = len(player_names)
         num_liberals = (player_count // 2) + 1
 
         players = []
-        random.shuffle(player_names)
+        self.random.shuffle(player_names)
         for i, name in enumerate(player_names):
             if i < num_liberals:
                 party = Policy.liberal
@@ -68,17 +150,20 @@ class Game:
                 role = Role.fascist
 
             if name in self.human_set:
-                player_class = TerminalPlayer
+                player_class = self.human_class
             else:
-                player_class = GeminiPlayer
+                player_class = self.ai_class
 
             player = player_class(name=name, party=party, role=role)
+            if isinstance(player, GeminiPlayer) and self.human_set:
+                # Games with humans waiting at a prompt are served ahead of simulations:
+                player.priority = Priority.interactive
             if player.role == Role.hitler:
                 self.state.hitler = player
 
             players.append(player)
 
-        random.shuffle(players)
+        self.random.shuffle(players)
         return players
 
     def valid_president(self, player: Player) -> bool:
@@ -87,6 +172,15 @@ class Game:
 
         return True
 
+    def upcoming_president(self, turn_num: int) -> Player:
+        if self.special_president is not None:
+            return self.special_president
+
+        for offset in range(len(self.players)):
+            player = self.players[(turn_num + offset) % len(self.players)]
+            if self.valid_president(player):
+                return player
+
     def valid_players(self, exclude: Player | List[Player] = None) -> List[Player]:
         if exclude is None:
             exclude = []
@@ -102,7 +196,10 @@ class Game:
     def valid_chancellors(
         self, president: Player, previous_president: Player, previous_chancellor: Player
     ) -> List[Player]:
-        invalid_choices = [president, previous_president, previous_chancellor]
+        invalid_choices = [president, previous_chancellor]
+        if len(self.valid_players()) > TERM_LIMIT_PLAYERS:
+            invalid_choices.append(previous_president)
+
         return self.valid_players(exclude=invalid_choices)
 
     def draw_policies(self, amount: int = 3) -> List[Policy]:
@@ -116,19 +213,26 @@ class Game:
         return hand
 
     def take_action(self, player: Player) -> None:
-        fascist_count = self.state.enacted_policies[Policy.fascist]
-        match fascist_count:
-            case 3:
+        power = self.powers.get(self.state.enacted_policies[Policy.fascist])
+        match power:
+            case Power.investigate_loyalty:
                 player.action_investigate_loyalty(
                     self.state, players=self.valid_players(exclude=player)
                 )
-            case 4:
+            case Power.special_election:
+                self.special_president = player.action_special_election(
+                    self.state, players=self.valid_players(exclude=player)
+                )
+            case Power.policy_peek:
+                if len(self.policy_deck) < 3:
+                    self.reshuffle_deck()
+                player.action_policy_peek(self.state, self.policy_deck)
+            case Power.execution:
                 player = player.action_execution(
                     self.state, players=self.valid_players(exclude=player)
                 )
                 player.alive = False
-            case 5:
-                player.action_policy_peek(self.state, self.policy_deck)
+                self.state.record_state()
             case _:
                 return
 
@@ -141,45 +245,17 @@ class Game:
             f"\tFacist policies: {self.state.enacted_policies[Policy.fascist]} / Liberal policies: {self.state.enacted_policies[Policy.liberal]}"
         )
 
-        return
-
-        events = list(self.state.event_history)
-        events.extend(list(self.state.public_chat))
-        for player in self.players:
-            if player.name == "Adam":
-                main_player = player
-            events.extend(list(player.thoughts))
-
-        log = ""
-        events = sorted(events, key=lambda x: x.time)
-        for event in events:
-            if event.time <= self.last_logged_dt:
-                continue
-
-            if isinstance(event, Message):
-                chat_type = "INTERNAL THOUGHT" if event.internal else "PUBLIC CHAT"
-                if event.author == main_player:
-                    log += f"\n[{chat_type}][Myself]: {event.content}"
-                else:
-                    log += f"\n[{chat_type}][{event.author}]: {event.content}"
-
-            else:
-                log += f"\n[EVENT]: {event.description()}"
-
-        if events:
-            self.last_logged_dt = events[-1].time
-
-        print(log)
-
-    def check_win(self) -> Union[Tuple[Party, str], None]:
+    def check_win(self, election: bool = False) -> Union[Tuple[Party, str], None]:
         if self.state.enacted_policies[Policy.fascist] == FASCIST_POLICIES_WIN:
             return Party.fascist, f"{FASCIST_POLICIES_WIN} Fascist policies were enacted."
 
         if self.state.enacted_policies[Policy.liberal] == LIBERAL_POLICIES_WIN:
             return Party.liberal, f"{LIBERAL_POLICIES_WIN} Liberal policies were enacted."
 
+        # Hitler only wins as chancellor at the moment of being elected:
         if (
-            self.state.enacted_policies[Policy.fascist] >= POLICIES_FOR_HITLER_CHANCELLOR
+            election
+            and self.state.enacted_policies[Policy.fascist] >= POLICIES_FOR_HITLER_CHANCELLOR
             and self.state.chancellor.role == Role.hitler
         ):
             return Party.fascist, "Hitler was elected as Chancellor"
@@ -189,44 +265,176 @@ class Game:
 
         return None
 
+    def nomination_key(self, candidates: List[Player]) -> Tuple:
+        # Powers used after speculating change what the president knows, so events are counted too:
+        return tuple(p.name for p in candidates), len(self.state.event_history)
+
+    def vote_key(self, president: Player, chancellor: Player) -> Tuple:
+        # Anything said or done during the discussion could change a vote:
+        return (
+            president.name,
+            chancellor.name,
+            len(self.state.public_chat),
+            len(self.state.event_history),
+        )
+
+    def speculate_nomination(self, turn_num: int) -> None:
+        # Next round's president and their choices are known as soon as this round's government is:
+        if self.speculator is None:
+            return
+
+        president = self.upcoming_president(turn_num)
+        if isinstance(president, GeminiPlayer):
+            candidates = self.valid_chancellors(
+                president, self.state.president, self.state.chancellor
+            )
+            self.speculator.start(
+                DecisionType.nominate_chancellor,
+                president.name,
+                self.nomination_key(candidates),
+                president.prepare_nomination(self.state, candidates),
+            )
+
+    def speculate_votes(self, president: Player, chancellor: Player) -> None:
+        if self.speculator is None:
+            return
+
+        for voter in self.valid_voters(president, chancellor):
+            if isinstance(voter, GeminiPlayer):
+                self.speculator.start(
+                    DecisionType.vote_on_government,
+                    voter.name,
+                    self.vote_key(president, chancellor),
+                    voter.prepare_vote(self.state, president, chancellor),
+                )
+
+    def nominate(self, president: Player, candidates: List[Player]) -> Player:
+        if self.speculator is not None:
+            key = self.nomination_key(candidates)
+            hits = self.speculator.collect(DecisionType.nominate_chancellor, {president.name: key})
+            if hits:
+                return president.resolve_nomination(
+                    self.state, candidates, hits[president.name].result()
+                )
+
+        return president.nominate_chancellor(self.state, candidates)
+
     def discuss_game(self, prompt: str) -> None:
-        for player in self.players:
-            player.discuss(self.state, prompt)
+        with get_metrics().timer("phase_seconds", phase="discussion"):
+            self.run_discussion(prompt)
+
+    def run_discussion(self, prompt: str) -> None:
+        # Streamed chat is shown a token at a time, so those AI seats always speak one by one:
+        if not (self.batch_ai or self.async_humans) or self.state.chat_streams:
+            for player in self.players:
+                player.discuss(self.state, prompt)
+            return
+
+        # Consecutive AI seats are prompted together once everyone before them has spoken, so each
+        # sees what the humans said this round but not what the rest of its own run says:
+        speakers: List[GeminiPlayer] = []
+        for player in self.players + [None]:
+            if isinstance(player, GeminiPlayer):
+                speakers.append(player)
+                continue
+
+            if speakers:
+                requests = [p.prepare_discussion(self.state, prompt) for p in speakers]
+                for speaker, response in zip(speakers, call_backend_batch(requests)):
+                    speaker.resolve_discussion(self.state, response)
+                speakers = []
+            if player is not None:
+                player.discuss(self.state, prompt)
+
+    def collect_votes(
+        self, voters: List[Player], president: Player, chancellor: Player
+    ) -> List[bool]:
+        if self.debug:
+            return [True for _ in voters]
+
+        speculated = {}
+        if self.speculator is not None:
+            key = self.vote_key(president, chancellor)
+            speculated = self.speculator.collect(
+                DecisionType.vote_on_government, {p.name: key for p in voters}
+            )
+
+        if not (self.batch_ai or self.async_humans):
+            return [
+                (
+                    p.resolve_vote(self.state, speculated[p.name].result())
+                    if p.name in speculated
+                    else p.vote_on_government(self.state, president, chancellor)
+                )
+                for p in voters
+            ]
+
+        # Each AI request only carries that voter's own prompt, so private context stays private:
+        batched = [
+            p
+            for p in voters
+            if self.batch_ai and isinstance(p, GeminiPlayer) and p.name not in speculated
+        ]
+        requests = [p.prepare_vote(self.state, president, chancellor) for p in batched]
+        with ThreadPoolExecutor(max_workers=len(voters) + 1) as executor:
+            pending_batch = executor.submit(call_backend_batch, requests)
+
+            # Everyone else votes in parallel, so AI seats don't wait on humans:
+            pending = {
+                p.name: executor.submit(p.vote_on_government, self.state, president, chancellor)
+                for p in voters
+                if p not in batched and p.name not in speculated
+            }
+            responses = dict(zip([p.name for p in batched], pending_batch.result()))
+
+            votes = []
+            for player in voters:
+                if player.name in speculated:
+                    result = speculated[player.name].result()
+                    votes.append(player.resolve_vote(self.state, result))
+                elif player.name in responses:
+                    votes.append(player.resolve_vote(self.state, responses[player.name]))
+                else:
+                    votes.append(pending[player.name].result())
 
-    def play_game(self) -> None:
+        return votes
+
+    def play_game(self) -> Tuple[Party, str]:
+        metrics = get_metrics()
         turn_num = 0
         while True:
-            # Cycle president:
-            nominated_president = self.players[turn_num % len(self.players)]
-            if not self.valid_president(nominated_president):
+            # Cycle president, a special election interrupts the order without moving it on:
+            if self.special_president is not None:
+                nominated_president, self.special_president = self.special_president, None
+            else:
+                nominated_president = self.players[turn_num % len(self.players)]
                 turn_num += 1
-                continue
+                if not self.valid_president(nominated_president):
+                    continue
 
             # Current state:
+            self.state.start_round()
             print(f"\n{' NEW ROUND ':-^80}")
             self.print_gamestate()
 
             # Nominate a chancellor:
             print("\nPresident: ", nominated_president.name)
-            nominated_chancellor = nominated_president.nominate_chancellor(
-                self.state,
-                self.valid_chancellors(
-                    nominated_president, self.state.president, self.state.chancellor
-                ),
-            )
+            with metrics.timer("phase_seconds", phase="nomination"):
+                nominated_chancellor = self.nominate(
+                    nominated_president,
+                    self.valid_chancellors(
+                        nominated_president, self.state.president, self.state.chancellor
+                    ),
+                )
+            self.speculate_votes(nominated_president, nominated_chancellor)
             self.discuss_game(
                 prompt="What do you think about the nomination, should this person be chancellor?"
             )
 
             # Vote in the current government:
             voters = self.valid_voters(nominated_president, nominated_chancellor)
-            if self.debug:
-                votes = [True for _ in voters]
-            else:
-                votes = [
-                    p.vote_on_government(self.state, nominated_president, nominated_chancellor)
-                    for p in voters
-                ]
+            with metrics.timer("phase_seconds", phase="vote"):
+                votes = self.collect_votes(voters, nominated_president, nominated_chancellor)
 
             if sum(votes) > len(votes) // 2:
                 print("The government was elected successfully")
@@ -236,62 +444,89 @@ class Game:
             else:
                 print("The government was not elected")
                 self.state.failed_elections += 1
-                if self.state.failed_elections == 3:
+                if self.state.failed_elections == FAILED_ELECTIONS_LIMIT:
+                    # The top policy is enacted without a power and term limits are forgotten:
                     self.state.failed_elections = 0
                     policy = self.draw_policies(amount=1)[0]
                     self.state.enacted_policies[policy] += 1
+                    self.state.forget_government()
+                self.state.record_state()
 
-                    if win := self.check_win():
-                        party, reason = win
-                        print(f"The {party}s win the game!, {reason}")
-                        break
+                if win := self.check_win():
+                    party, reason = win
+                    print(f"The {party}s win the game!, {reason}")
+                    self.winner = (party, reason)
+                    break
 
+                self.speculate_nomination(turn_num)
                 self.discuss_game(
                     prompt="The government failed to be elected, how should we proceed?"
                 )
                 continue
 
-            if win := self.check_win():
+            if win := self.check_win(election=True):
                 party, reason = win
                 print(f"The {party}s win the game!, {reason}")
+                self.winner = (party, reason)
                 break
 
-            # President selects policy options:
-            policy_options = self.draw_policies()
-            policy_proposal = self.state.president.propose_policies(self.state, policy_options)
-            self.discard_deck.extend(policy_proposal.discarded)
+            with metrics.timer("phase_seconds", phase="legislation"):
+                # President selects policy options:
+                policy_options = self.draw_policies()
+                policy_proposal = self.state.president.propose_policies(self.state, policy_options)
+                self.discard_deck.extend(policy_proposal.discarded)
 
-            # Chancellor enacts policy:
-            policy_selection = self.state.chancellor.enact_policy(
-                self.state, policy_proposal.selected
-            )
-            self.discard_deck.extend(policy_selection.discarded)
+                # Chancellor enacts policy:
+                policy_selection = self.state.chancellor.enact_policy(
+                    self.state, policy_proposal.selected
+                )
+                self.discard_deck.extend(policy_selection.discarded)
             policy = policy_selection.selected[0]
 
             self.state.enacted_policies[policy] += 1
+            self.state.failed_elections = 0
+            self.state.record_state()
 
             if win := self.check_win():
                 party, reason = win
-                if reason != "Hitler was elected as Chancellor":
-                    print(f"The {party}s win the game!, {reason}")
-                    break
+                print(f"The {party}s win the game!, {reason}")
+                self.winner = (party, reason)
+                break
 
+            # A power can move the presidency or kill a candidate, so speculate once it's used:
+            power = policy == Policy.fascist and self.state.enacted_policies[policy] in self.powers
+            if not power:
+                self.speculate_nomination(turn_num)
             self.discuss_game(
                 prompt="What do you think about the card that was played? Was this a deliberate action, or were they forced to play that card?"
             )
 
             # Action to be taken:
             if policy == Policy.fascist:
-                self.take_action(self.state.president)
+                with metrics.timer("phase_seconds", phase="executive_action"):
+                    self.take_action(self.state.president)
 
                 if win := self.check_win():
                     party, reason = win
-                    if reason != "Hitler was elected as Chancellor":
-                        print(f"The {party}s win the game!, {reason}")
-                        break
+                    print(f"The {party}s win the game!, {reason}")
+                    self.winner = (party, reason)
+                    break
 
+                if power:
+                    self.speculate_nomination(turn_num)
                 self.discuss_game(
                     prompt="Do we have anything to discuss after this action has taken place?"
                 )
 
-            turn_num += 1
+        if self.speculator is not None:
+            self.speculator.close()
+        self.state.finish(*self.winner)
+        if self.transcript is not None:
+            self.transcript.close()
+        for player in self.players:
+            player.game_over(self.state)
+        metrics.inc("games_total", winner=self.winner[0])
+        if self.metrics_dir is not None and metrics.enabled:
+            metrics.export(self.metrics_dir)
+
+        return self.winner
@@ -1,10 +1,38 @@
+import datetime as dt
 from typing import Dict, List, Set
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from src.event_bus import EventBus
 from src.events import Event
-from src.game_types import Message, Policy
+from src.game_types import DecisionRecord, Message, Party, Policy
+from src.history import HistoryIndex
 from src.players import Player
+from src.streaming import ChatStreamListener
+
+
+class StateChange(BaseModel):
+    time: dt.datetime = Field(default_factory=dt.datetime.now)
+    round_num: int
+    president: str | None
+    chancellor: str | None
+    previous_president: str | None
+    previous_chancellor: str | None
+    failed_elections: int
+    enacted_policies: Dict[str, int]
+    dead: List[str]
+    winner: str | None = Field(default=None)
+    win_reason: str | None = Field(default=None)
+
+
+Record = Event | Message | StateChange | DecisionRecord
+
+
+class ArchiveSummary(BaseModel):
+    count: int = Field(default=0)
+    first: dt.datetime | None = Field(default=None)
+    last: dt.datetime | None = Field(default=None)
+    authors: Dict[str, int] = Field(default_factory=dict)
 
 
 class GameState(BaseModel):
@@ -16,12 +44,64 @@ class GameState(BaseModel):
     event_history: Set[Event] = Field(default_factory=set)
     public_chat: Set[Message] = Field(default_factory=set)
     players: List[Player] = Field(default_factory=list)
-    failed_elections: int = Field(default=1)
+    failed_elections: int = Field(default=0)
+    round_num: int = Field(default=0)
+    round_started: dt.datetime = Field(default_factory=dt.datetime.now)
+    winner: Party | None = Field(default=None)
+    win_reason: str | None = Field(default=None)
+    chat_streams: List[ChatStreamListener] = Field(default_factory=list, exclude=True)
+    bus: EventBus = Field(default_factory=EventBus, exclude=True)
+    history: HistoryIndex = Field(default_factory=HistoryIndex, exclude=True)
+    archived: Dict[str, ArchiveSummary] = Field(default_factory=dict)
     enacted_policies: Dict[Policy, int] = Field(
         default_factory=lambda: {Policy.liberal: 0, Policy.fascist: 0}
     )
 
-    model_config = ConfigDict(use_enum_values=True)
+    model_config = ConfigDict(use_enum_values=True, arbitrary_types_allowed=True)
+
+    def record(self, item: Event | Message | DecisionRecord) -> None:
+        if isinstance(item, DecisionRecord):
+            pass
+        elif isinstance(item, Event):
+            self.event_history.add(item)
+            self.history.add(item, self.round_num)
+        elif item.internal:
+            item.author.thoughts.add(item)
+        else:
+            self.public_chat.add(item)
+            self.history.add(item, self.round_num)
+
+        self.bus.publish(item)
+
+    def record_state(self) -> None:
+        if not self.bus:
+            return
+
+        change = StateChange(
+            round_num=self.round_num,
+            president=self.president.name if self.president else None,
+            chancellor=self.chancellor.name if self.chancellor else None,
+            previous_president=self.previous_president.name if self.previous_president else None,
+            previous_chancellor=(
+                self.previous_chancellor.name if self.previous_chancellor else None
+            ),
+            failed_elections=self.failed_elections,
+            enacted_policies=dict(self.enacted_policies),
+            dead=[p.name for p in self.players if not p.alive],
+            winner=self.winner,
+            win_reason=self.win_reason,
+        )
+        self.bus.publish(change)
+
+    def finish(self, winner: Party, reason: str) -> None:
+        self.winner = winner
+        self.win_reason = reason
+        self.record_state()
+
+    def start_round(self) -> None:
+        self.round_num += 1
+        self.round_started = dt.datetime.now()
+        self.record_state()
 
     def elect_government(self, chancellor: Player, president: Player) -> None:
         # Elect chancellor:
@@ -34,5 +114,12 @@ class GameState(BaseModel):
             self.previous_president = self.president
         self.president = president
 
+        self.record_state()
+
+    def forget_government(self) -> None:
+        # After three failed elections nobody is term limited by the last government:
+        self.previous_president, self.president = self.president, None
+        self.previous_chancellor, self.chancellor = self.chancellor, None
+
 
 GameState.model_rebuild()
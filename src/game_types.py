@@ -24,6 +24,13 @@ class Role(StrEnum):
     hitler = "Hitler"
 
 
+class Power(StrEnum):
+    investigate_loyalty = "Investigate Loyalty"
+    special_election = "Special Election"
+    policy_peek = "Policy Peek"
+    execution = "Execution"
+
+
 class PlayerType(StrEnum):
     human = "Human"
     ai = "AI"
@@ -34,6 +41,15 @@ class Selection(BaseModel):
     discarded: List[Policy]
 
 
+class DecisionRecord(BaseModel):
+    # A player's choice and the options it had, logged for training; never shown to other players.
+    time: dt.datetime = Field(default_factory=dt.datetime.now)
+    decision: str
+    actor: str
+    options: List[str]
+    choice: str
+
+
 class Message(BaseModel):
     time: dt.datetime = Field(default_factory=dt.datetime.now)
     author: "Player"
@@ -0,0 +1,148 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from pydantic import BaseModel, Field
+
+from src.events import Event, EventType
+from src.game_types import Message, Policy
+from src.players.base import POLICY_MAPPING, VOTE_MAPPING
+
+VOTE_EVENTS = {event_type: vote for vote, event_type in VOTE_MAPPING.items()}
+POLICY_EVENTS = {event_type: policy for policy, event_type in POLICY_MAPPING.items()}
+
+
+class Government(BaseModel):
+    round_num: int
+    president: str
+    chancellor: str
+    votes: Dict[str, bool] = Field(default_factory=dict)
+    policy: Policy | None = Field(default=None)
+
+    @property
+    def elected(self) -> bool | None:
+        if not self.votes:
+            return None
+
+        return sum(self.votes.values()) > len(self.votes) // 2
+
+
+class HistoryIndex:
+    # Public records of a game, indexed as they are recorded so queries never rescan the history.
+    #
+    # Each index keeps records in arrival order. Single-key queries cost the size of their result,
+    # combined keys scan the smallest matching index.
+    def __init__(self) -> None:
+        # Votes are recorded from one thread per voter, so updates to the indexes are serialised:
+        self.lock = threading.Lock()
+        self.timeline: List[Event | Message] = []
+        self.by_actor: Dict[str, List[Event]] = defaultdict(list)
+        self.by_recipient: Dict[str, List[Event]] = defaultdict(list)
+        self.by_type: Dict[str, List[Event]] = defaultdict(list)
+        self.by_round: Dict[int, List[Event | Message]] = defaultdict(list)
+        self.by_author: Dict[str, List[Message]] = defaultdict(list)
+        self.governments: List[Government] = []
+        self.governments_by_player: Dict[str, List[Government]] = defaultdict(list)
+        self.governments_by_policy: Dict[str, List[Government]] = defaultdict(list)
+
+    def add(self, item: Event | Message, round_num: int) -> None:
+        with self.lock:
+            self.index(item, round_num)
+
+    def index(self, item: Event | Message, round_num: int) -> None:
+        self.timeline.append(item)
+        self.by_round[round_num].append(item)
+        if isinstance(item, Message):
+            self.by_author[item.author.name].append(item)
+            return
+
+        self.by_actor[item.actor.name].append(item)
+        self.by_type[item.event_type].append(item)
+        if item.recipient is not None:
+            self.by_recipient[item.recipient.name].append(item)
+
+        if item.event_type == EventType.chancellor_nominated:
+            government = Government(
+                round_num=round_num, president=item.actor.name, chancellor=item.recipient.name
+            )
+            self.governments.append(government)
+            self.governments_by_player[government.president].append(government)
+            self.governments_by_player[government.chancellor].append(government)
+
+        elif item.event_type in VOTE_EVENTS and self.governments:
+            self.governments[-1].votes[item.actor.name] = VOTE_EVENTS[item.event_type]
+
+        elif item.event_type in POLICY_EVENTS and self.governments:
+            government = self.governments[-1]
+            if government.chancellor == item.actor.name and government.policy is None:
+                government.policy = POLICY_EVENTS[item.event_type]
+                self.governments_by_policy[government.policy].append(government)
+
+    def forget(self, records: Iterable[Event | Message]) -> None:
+        # Archived records leave the indexes, governments stay as the game's summary:
+        forgotten = {id(record) for record in records}
+        indexes = [self.by_actor, self.by_recipient, self.by_type, self.by_round, self.by_author]
+        with self.lock:
+            self.timeline = [item for item in self.timeline if id(item) not in forgotten]
+            for index in indexes:
+                for key in list(index):
+                    index[key] = [item for item in index[key] if id(item) not in forgotten]
+                    if not index[key]:
+                        del index[key]
+
+    def events(
+        self,
+        actor: str | None = None,
+        recipient: str | None = None,
+        event_type: EventType | None = None,
+        round_num: int | None = None,
+    ) -> List[Event]:
+        candidates = []
+        in_round = None
+        if actor is not None:
+            candidates.append(self.by_actor.get(actor, []))
+        if recipient is not None:
+            candidates.append(self.by_recipient.get(recipient, []))
+        if event_type is not None:
+            candidates.append(self.by_type.get(event_type, []))
+        if round_num is not None:
+            events = [e for e in self.by_round.get(round_num, []) if isinstance(e, Event)]
+            candidates.append(events)
+            in_round = {id(event) for event in events}
+        if not candidates:
+            return [item for item in self.timeline if isinstance(item, Event)]
+
+        smallest = min(candidates, key=len)
+        if len(candidates) == 1:
+            return list(smallest)
+
+        return [
+            event
+            for event in smallest
+            if (actor is None or event.actor.name == actor)
+            and (recipient is None or (event.recipient and event.recipient.name == recipient))
+            and (event_type is None or event.event_type == event_type)
+            and (in_round is None or id(event) in in_round)
+        ]
+
+    def messages(self, author: str | None = None, round_num: int | None = None) -> List[Message]:
+        if author is None and round_num is None:
+            return [item for item in self.timeline if isinstance(item, Message)]
+        if round_num is None:
+            return list(self.by_author.get(author, []))
+
+        return [
+            item
+            for item in self.by_round.get(round_num, [])
+            if isinstance(item, Message) and (author is None or item.author.name == author)
+        ]
+
+    def governments_with(self, player: str) -> List[Government]:
+        return list(self.governments_by_player.get(player, []))
+
+    def enacted(self, policy: Policy) -> List[Government]:
+        return list(self.governments_by_policy.get(policy, []))
+
+    def votes_by(self, player: str) -> List[bool | None]:
+        # One entry per government, None where the player didn't vote:
+        return [government.votes.get(player) for government in self.governments]
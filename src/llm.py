@@ -0,0 +1,212 @@
+import contextlib
+import json
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Dict, Iterator, List, get_type_hints
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+from google.api_core.exceptions import ResourceExhausted
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.metrics import get_metrics
+from src.rate_limit import Priority, RateLimiter
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+
+CHARS_PER_TOKEN = 4
+EXPECTED_OUTPUT_TOKENS = 250
+
+FAKE_CHAT_LINES = [
+    "I'm a Liberal, and I think we should trust this government for now.",
+    "That nomination feels a bit rushed, why that player?",
+    "The deck has been brutal, I don't think that was deliberate.",
+    "Let's keep an eye on who votes against liberal governments.",
+    "I have nothing to hide, ask me anything.",
+]
+
+MAX_RETRIES = 3
+RETRY_BACKOFF = 2.0
+
+
+def estimate_tokens(prompt: str) -> int:
+    return len(prompt) // CHARS_PER_TOKEN + EXPECTED_OUTPUT_TOKENS
+
+
+def record_call(
+    request: "LLMRequest", started: float, retries: int = 0, tokens: int | None = None
+) -> None:
+    metrics = get_metrics()
+    if not metrics.enabled:
+        return
+
+    model = request.model_name
+    metrics.observe("llm_seconds", time.perf_counter() - started, model=model)
+    metrics.observe("prompt_chars", len(request.prompt), model=model)
+    metrics.observe("prompt_tokens", tokens or estimate_tokens(request.prompt), model=model)
+    metrics.inc("llm_calls_total", model=model)
+    if retries:
+        metrics.inc("llm_retries_total", retries, model=model)
+
+
+class LLMRequest(BaseModel):
+    prompt: str
+    response_schema: Any
+    model_name: str = Field(default=DEFAULT_MODEL)
+    priority: Priority = Field(default=Priority.background)
+    decision: str | None = Field(default=None)
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class Backend(ABC):
+    @abstractmethod
+    def generate(self, request: LLMRequest) -> str:
+        pass
+
+    def generate_batch(self, requests: List[LLMRequest]) -> List[str]:
+        # Backends without a native batch endpoint dispatch the requests concurrently:
+        if not requests:
+            return []
+
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            return list(executor.map(self.generate, requests))
+
+    def stream(self, request: LLMRequest) -> Iterator[str]:
+        yield self.generate(request)
+
+
+class GeminiBackend(Backend):
+    def __init__(self, rate_limiter: RateLimiter = None) -> None:
+        load_dotenv()
+        genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(
+                requests_per_minute=float(os.environ.get("GEMINI_REQUESTS_PER_MINUTE", 15)),
+                tokens_per_minute=float(os.environ.get("GEMINI_TOKENS_PER_MINUTE", 1_000_000)),
+            )
+        self.rate_limiter = rate_limiter
+        self.models: Dict[str, genai.GenerativeModel] = {}
+
+    def model(self, model_name: str) -> genai.GenerativeModel:
+        if model_name not in self.models:
+            self.models[model_name] = genai.GenerativeModel(model_name)
+
+        return self.models[model_name]
+
+    def generate(self, request: LLMRequest) -> str:
+        tokens = estimate_tokens(request.prompt)
+        started = time.perf_counter()
+        for attempt in range(MAX_RETRIES + 1):
+            self.rate_limiter.acquire(tokens, request.priority)
+            try:
+                response = self.model(request.model_name).generate_content(
+                    request.prompt,
+                    generation_config=genai.GenerationConfig(
+                        response_mime_type="application/json",
+                        response_schema=request.response_schema,
+                    ),
+                )
+            except ResourceExhausted:
+                if attempt == MAX_RETRIES:
+                    raise
+                time.sleep(RETRY_BACKOFF * 2**attempt)
+                continue
+
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None and usage.total_token_count:
+                self.rate_limiter.record_usage(usage.total_token_count - tokens)
+                tokens = usage.total_token_count
+
+            record_call(request, started, retries=attempt, tokens=tokens)
+            return response.candidates[0].content.parts[0].text
+
+    def stream(self, request: LLMRequest) -> Iterator[str]:
+        started = time.perf_counter()
+        self.rate_limiter.acquire(estimate_tokens(request.prompt), request.priority)
+        response = self.model(request.model_name).generate_content(
+            request.prompt,
+            generation_config=genai.GenerationConfig(
+                response_mime_type="application/json",
+                response_schema=request.response_schema,
+            ),
+            stream=True,
+        )
+        for chunk in response:
+            yield chunk.text
+
+        record_call(request, started)
+
+
+class FakeBackend(Backend):
+    # Local stand-in which returns schema-conforming random responses without an API key.
+    def __init__(
+        self,
+        latency: float = 0.0,
+        chunk_size: int = 8,
+        chunk_delay: float = 0.0,
+        seed: int = None,
+    ) -> None:
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.random = random.Random(seed)
+
+    def respond(self, request: LLMRequest) -> str:
+        data = {}
+        for key, field_type in get_type_hints(request.response_schema).items():
+            if isinstance(field_type, type) and issubclass(field_type, Enum):
+                data[key] = self.random.choice(list(field_type)).value
+            else:
+                data[key] = self.random.choice(FAKE_CHAT_LINES)
+
+        return json.dumps(data)
+
+    def generate(self, request: LLMRequest) -> str:
+        started = time.perf_counter()
+        time.sleep(self.latency)
+        text = self.respond(request)
+        record_call(request, started)
+        return text
+
+    def stream(self, request: LLMRequest) -> Iterator[str]:
+        started = time.perf_counter()
+        time.sleep(self.latency)
+        text = self.respond(request)
+        for i in range(0, len(text), self.chunk_size):
+            time.sleep(self.chunk_delay)
+            yield text[i : i + self.chunk_size]
+
+        record_call(request, started)
+
+
+_backend: Backend = None
+
+
+def get_backend() -> Backend:
+    global _backend
+    if _backend is None:
+        _backend = GeminiBackend()
+
+    return _backend
+
+
+def set_backend(backend: Backend) -> None:
+    global _backend
+    _backend = backend
+
+
+@contextlib.contextmanager
+def using_backend(backend: Backend) -> Iterator[Backend]:
+    # Swaps the backend for the duration of a block and puts the previous one back afterwards:
+    global _backend
+    previous, _backend = _backend, backend
+    try:
+        yield backend
+    finally:
+        _backend = previous
@@ -0,0 +1,249 @@
+import argparse
+import contextlib
+import io
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Iterator, List, Tuple
+
+import numpy as np
+from google.api_core.exceptions import ResourceExhausted
+from pydantic import BaseModel, Field
+
+from src.game import Game
+from src.llm import MAX_RETRIES, FakeBackend, LLMRequest, record_call, using_backend
+
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16]
+GAMES_PER_LEVEL = 16
+PLAYER_COUNT = 7
+
+# Simulated backoff is much shorter than the real one so offline runs stay quick:
+SIMULATED_BACKOFF = 0.05
+
+# Throughput below this fraction of perfect scaling from one game counts as saturated:
+SCALING_EFFICIENCY = 0.8
+
+
+class Distribution(str, Enum):
+    fixed = "fixed"
+    lognormal = "lognormal"
+    exponential = "exponential"
+    trace = "trace"
+
+
+class LatencyModel(BaseModel):
+    distribution: Distribution = Field(default=Distribution.lognormal)
+    median: float = Field(default=0.05)
+    sigma: float = Field(default=0.5)
+    trace: List[float] = Field(default_factory=list)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == Distribution.fixed:
+            return self.median
+        if self.distribution == Distribution.lognormal:
+            return self.median * rng.lognormvariate(0.0, self.sigma)
+        if self.distribution == Distribution.exponential:
+            # Exponential median is ln(2) times its mean:
+            return rng.expovariate(np.log(2) / self.median)
+
+        return rng.choice(self.trace)
+
+
+def load_trace(path: str) -> List[float]:
+    # A JSON list of call latencies in seconds, e.g. collected from real games:
+    with open(path) as file:
+        return [float(seconds) for seconds in json.load(file)]
+
+
+class SimulatedBackend(FakeBackend):
+    # Fake responses after a sampled delay, with quota errors retried the way GeminiBackend does.
+    def __init__(
+        self,
+        latency: LatencyModel = None,
+        failure_rate: float = 0.0,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = SIMULATED_BACKOFF,
+        seed: int = None,
+    ) -> None:
+        super().__init__(seed=seed)
+        self.latency_model = latency or LatencyModel()
+        self.failure_rate = failure_rate
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.calls = 0
+            self.retries = 0
+            self.busy_seconds = 0.0
+
+    def attempt(self) -> Tuple[float, bool]:
+        with self.lock:
+            delay = self.latency_model.sample(self.random)
+            failed = self.random.random() < self.failure_rate
+
+        return delay, failed
+
+    def generate(self, request: LLMRequest) -> str:
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            delay, failed = self.attempt()
+            time.sleep(delay)
+            if not failed:
+                break
+
+            with self.lock:
+                self.retries += 1
+            if attempt == self.max_retries:
+                raise ResourceExhausted("Simulated quota error")
+            time.sleep(self.backoff * 2**attempt)
+
+        with self.lock:
+            self.calls += 1
+            self.busy_seconds += time.perf_counter() - started
+            text = self.respond(request)
+
+        record_call(request, started, retries=attempt)
+        return text
+
+    def stream(self, request: LLMRequest) -> Iterator[str]:
+        text = self.generate(request)
+        for i in range(0, len(text), self.chunk_size):
+            yield text[i : i + self.chunk_size]
+
+
+class LevelResult(BaseModel):
+    concurrency: int
+    games: int
+    failed_games: int
+    wall_seconds: float
+    duration_p50: float
+    duration_p90: float
+    duration_p99: float
+    calls_per_game: float
+    retries: int
+    games_per_second: float
+    requests_per_second: float
+    # How much of each game was spent waiting on the backend, and the call rate one game achieves:
+    llm_share: float
+    requests_per_second_per_game: float
+
+
+def play_one(names: List[str], batch_ai: bool) -> Tuple[float, bool]:
+    started = time.perf_counter()
+    try:
+        Game([], list(names), batch_ai=batch_ai).play_game()
+    except ResourceExhausted:
+        return time.perf_counter() - started, False
+
+    return time.perf_counter() - started, True
+
+
+def run_level(
+    backend: SimulatedBackend,
+    concurrency: int,
+    games: int,
+    players: int = PLAYER_COUNT,
+    batch_ai: bool = False,
+) -> LevelResult:
+    names = [f"Player{i}" for i in range(players)]
+    backend.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(lambda _: play_one(names, batch_ai), range(games)))
+    wall = time.perf_counter() - started
+
+    durations = np.array([duration for duration, _ in outcomes])
+    p50, p90, p99 = np.percentile(durations, [50, 90, 99])
+    return LevelResult(
+        concurrency=concurrency,
+        games=games,
+        failed_games=sum(not ok for _, ok in outcomes),
+        wall_seconds=wall,
+        duration_p50=p50,
+        duration_p90=p90,
+        duration_p99=p99,
+        calls_per_game=backend.calls / games,
+        retries=backend.retries,
+        games_per_second=games / wall,
+        requests_per_second=backend.calls / wall,
+        llm_share=backend.busy_seconds / durations.sum(),
+        requests_per_second_per_game=backend.calls / durations.sum(),
+    )
+
+
+def saturation_point(results: List[LevelResult]) -> int | None:
+    # The first concurrency level whose throughput falls short of scaling linearly from the first:
+    base = results[0]
+    for result in results[1:]:
+        ideal = base.requests_per_second * result.concurrency / base.concurrency
+        if result.requests_per_second < SCALING_EFFICIENCY * ideal:
+            return result.concurrency
+
+    return None
+
+
+def run_load_test(
+    backend: SimulatedBackend,
+    levels: List[int] = CONCURRENCY_LEVELS,
+    games: int = GAMES_PER_LEVEL,
+    players: int = PLAYER_COUNT,
+    batch_ai: bool = False,
+) -> List[LevelResult]:
+    with using_backend(backend), contextlib.redirect_stdout(io.StringIO()):
+        return [run_level(backend, level, games, players, batch_ai) for level in levels]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test full games against a simulated LLM.")
+    parser.add_argument("--concurrency", default=",".join(map(str, CONCURRENCY_LEVELS)))
+    parser.add_argument("--games", type=int, default=GAMES_PER_LEVEL)
+    parser.add_argument("--players", type=int, default=PLAYER_COUNT)
+    parser.add_argument("--distribution", choices=[d.value for d in Distribution])
+    parser.add_argument("--median", type=float, default=0.05, help="Median latency in seconds.")
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--trace", help="JSON list of recorded latencies to sample from.")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--batch-ai", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    latency = LatencyModel(median=args.median, sigma=args.sigma)
+    if args.trace:
+        latency.distribution = Distribution.trace
+        latency.trace = load_trace(args.trace)
+    if args.distribution:
+        latency.distribution = Distribution(args.distribution)
+
+    backend = SimulatedBackend(latency, failure_rate=args.failure_rate, seed=args.seed)
+    levels = [int(level) for level in args.concurrency.split(",")]
+    results = run_load_test(backend, levels, args.games, args.players, args.batch_ai)
+
+    print(
+        f"{'concurrent':>10} {'p50 s':>8} {'p90 s':>8} {'p99 s':>8} {'calls':>7} "
+        f"{'req/s':>8} {'req/s/game':>11} {'llm %':>6} {'failed':>7}"
+    )
+    for r in results:
+        print(
+            f"{r.concurrency:>10} {r.duration_p50:>8.2f} {r.duration_p90:>8.2f} "
+            f"{r.duration_p99:>8.2f} {r.calls_per_game:>7.1f} {r.requests_per_second:>8.1f} "
+            f"{r.requests_per_second_per_game:>11.2f} {r.llm_share:>6.0%} {r.failed_games:>7}"
+        )
+
+    saturated = saturation_point(results)
+    if saturated is not None:
+        print(f"Throughput stops scaling at {saturated} concurrent games.")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump([r.model_dump() for r in results], file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
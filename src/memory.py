@@ -0,0 +1,169 @@
+import json
+import os
+import sys
+import tracemalloc
+from typing import Any, Dict, List, Set
+
+from pydantic import BaseModel
+
+from src.events import Event
+from src.game_state import ArchiveSummary, GameState, StateChange
+from src.players import Player
+from src.store import encode_record
+
+MAX_RETAINED = 200
+TOP_ALLOCATIONS = 10
+
+
+class MemorySnapshot(BaseModel):
+    round_num: int
+    traced_bytes: int
+    peak_bytes: int
+    structures: Dict[str, int]
+    top: List[str]
+
+
+def deep_size(obj: Any, seen: Set[int] = None) -> int:
+    # Players are shared by every record, so they are sized once on their own rather than per reference:
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif isinstance(obj, BaseModel) and not isinstance(obj, Player):
+        size += deep_size(obj.__dict__, seen)
+
+    return size
+
+
+def structure_sizes(game_state: GameState) -> Dict[str, int]:
+    sizes = {
+        "event_history": deep_size(game_state.event_history),
+        "public_chat": deep_size(game_state.public_chat),
+        "thoughts": sum(deep_size(p.thoughts) for p in game_state.players),
+        "player_logs": sum(deep_size(getattr(p, "_log", [])) for p in game_state.players),
+    }
+    sizes["players"] = sum(
+        sys.getsizeof(p) + deep_size(p.__dict__, {id(p.thoughts)}) for p in game_state.players
+    )
+
+    return sizes
+
+
+class MemoryProfiler:
+    # Takes a tracemalloc snapshot as each round starts, alongside the size of the game's history.
+    def __init__(self, top: int = TOP_ALLOCATIONS) -> None:
+        self.top = top
+        self.snapshots: List[MemorySnapshot] = []
+        self.previous: tracemalloc.Snapshot = None
+        self.round_num = None
+        self.started = False
+
+    def attach(self, game_state: GameState) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started = True
+
+        game_state.bus.subscribe(lambda item: self.receive(game_state, item))
+
+    def receive(self, game_state: GameState, item: Any) -> None:
+        if isinstance(item, StateChange) and item.round_num != self.round_num:
+            self.round_num = item.round_num
+            self.snapshot(game_state)
+
+    def snapshot(self, game_state: GameState) -> MemorySnapshot:
+        current = tracemalloc.take_snapshot()
+        top = []
+        if self.previous is not None:
+            stats = current.compare_to(self.previous, "lineno")
+            top = [str(stat) for stat in stats[: self.top]]
+        self.previous = current
+
+        traced, peak = tracemalloc.get_traced_memory()
+        snapshot = MemorySnapshot(
+            round_num=game_state.round_num,
+            traced_bytes=traced,
+            peak_bytes=peak,
+            structures=structure_sizes(game_state),
+            top=top,
+        )
+        self.snapshots.append(snapshot)
+        return snapshot
+
+    def stop(self) -> None:
+        if self.started:
+            tracemalloc.stop()
+            self.started = False
+        self.previous = None
+
+    def export(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump([s.model_dump() for s in self.snapshots], file, indent=2)
+
+
+class RetentionPolicy:
+    # Keeps the newest records of each history in memory and moves older ones to a JSONL file.
+    #
+    # Histories are trimmed as each round starts, on the game thread, while no votes or
+    # discussion are adding to them. They can grow past max_items within a round.
+    def __init__(self, max_items: int = MAX_RETAINED, spill_dir: str | None = None) -> None:
+        self.max_items = max_items
+        self.round_num = None
+        self.spill_dir = spill_dir
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def spill_path(self, game_id: str) -> str | None:
+        if self.spill_dir is None:
+            return None
+
+        return os.path.join(self.spill_dir, f"{game_id}.jsonl")
+
+    def attach(self, game_id: str, game_state: GameState) -> None:
+        game_state.bus.subscribe(lambda item: self.receive(game_id, game_state, item))
+
+    def receive(self, game_id: str, game_state: GameState, item: Any) -> None:
+        if not isinstance(item, StateChange) or item.round_num == self.round_num:
+            return
+
+        self.round_num = item.round_num
+        self.trim(game_id, game_state, "event_history", game_state.event_history)
+        self.trim(game_id, game_state, "public_chat", game_state.public_chat)
+        for player in game_state.players:
+            self.trim(game_id, game_state, f"thoughts:{player.name}", player.thoughts)
+
+    def trim(self, game_id: str, game_state: GameState, key: str, records: Set) -> None:
+        if len(records) <= self.max_items:
+            return
+
+        ordered = sorted(records, key=lambda record: record.time)
+        spilled = ordered[: len(ordered) - self.max_items]
+        records.difference_update(spilled)
+        if key in ("event_history", "public_chat"):
+            game_state.history.forget(spilled)
+
+        summary = game_state.archived.setdefault(key, ArchiveSummary())
+        summary.count += len(spilled)
+        summary.first = summary.first or spilled[0].time
+        summary.last = spilled[-1].time
+        for record in spilled:
+            author = record.actor if isinstance(record, Event) else record.author
+            summary.authors[author.name] = summary.authors.get(author.name, 0) + 1
+
+        path = self.spill_path(game_id)
+        if path is not None:
+            with open(path, "a") as file:
+                for record in spilled:
+                    kind, data = encode_record(record)
+                    file.write(json.dumps({"kind": kind, **data}) + "\n")
+
+
+def load_spilled(path: str) -> List[Dict[str, Any]]:
+    with open(path) as file:
+        return [json.loads(line) for line in file]
@@ -0,0 +1,208 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+PREFIX = "secret_hitler"
+
+SECONDS_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+SIZE_BUCKETS = [2**i for i in range(6, 19)]
+
+# Metric name -> (help text, bucket upper bounds), anything else is a counter:
+HISTOGRAMS = {
+    "phase_seconds": ("Wall time spent in each phase of a round.", SECONDS_BUCKETS),
+    "player_call_seconds": ("Wall time of each player decision call.", SECONDS_BUCKETS),
+    "llm_seconds": ("Latency of each LLM round trip, including retries.", SECONDS_BUCKETS),
+    "prompt_chars": ("Characters sent in each LLM prompt.", SIZE_BUCKETS),
+    "prompt_tokens": ("Tokens used by each LLM call.", SIZE_BUCKETS),
+}
+COUNTERS = {
+    "llm_calls_total": "LLM calls made.",
+    "llm_retries_total": "LLM calls retried after being rate limited.",
+    "games_total": "Games played to completion.",
+    "speculative_calls_total": "AI decisions started ahead of being asked for.",
+    "speculative_hits_total": "Speculative decisions used as they were started.",
+    "speculative_wasted_total": "Speculative calls made and then discarded.",
+    "speculative_cancelled_total": "Speculative calls discarded before they were sent.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_null_timer = nullcontext()
+
+
+class Histogram:
+    def __init__(self, buckets: List[float]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float | None:
+        # Linear interpolation inside the bucket holding the q-th observation, None when empty so
+        # the JSON export writes null rather than a bare NaN:
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Metrics:
+    # Disabled metrics hand out a shared no-op timer, so instrumented code pays one attribute check.
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {name: {} for name in HISTOGRAMS}
+        self.counters: Dict[str, Dict[Labels, float]] = {name: {} for name in COUNTERS}
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        if not self.enabled:
+            return
+
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.histograms[name]
+            if key not in series:
+                series[key] = Histogram(HISTOGRAMS[name][1])
+            series[key].observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        if not self.enabled:
+            return
+
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.counters[name][key] = self.counters[name].get(key, 0) + amount
+
+    @contextmanager
+    def _timer(self, name: str, labels: Dict[str, str]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timer(self, name: str, **labels: str):
+        if not self.enabled:
+            return _null_timer
+
+        return self._timer(name, labels)
+
+    def report(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "histograms": {
+                    name: [
+                        {"labels": dict(key), **histogram.summary()}
+                        for key, histogram in series.items()
+                    ]
+                    for name, series in self.histograms.items()
+                },
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self.counters.items()
+                },
+            }
+
+    def prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            for name, series in self.histograms.items():
+                metric = f"{PREFIX}_{name}"
+                lines.append(f"# HELP {metric} {HISTOGRAMS[name][0]}")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ["+Inf"], histogram.counts):
+                        cumulative += count
+                        le = format_labels(key + (("le", str(bound)),))
+                        lines.append(f"{metric}_bucket{le} {cumulative}")
+                    lines.append(f"{metric}_sum{format_labels(key)} {histogram.sum}")
+                    lines.append(f"{metric}_count{format_labels(key)} {histogram.count}")
+
+            for name, series in self.counters.items():
+                metric = f"{PREFIX}_{name}"
+                lines.append(f"# HELP {metric} {COUNTERS[name]}")
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{format_labels(key)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: str) -> Tuple[str, str]:
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, "metrics.json")
+        prometheus_path = os.path.join(directory, "metrics.prom")
+        with open(json_path, "w") as file:
+            json.dump(self.report(), file, indent=2, allow_nan=False)
+        with open(prometheus_path, "w") as file:
+            file.write(self.prometheus())
+
+        return json_path, prometheus_path
+
+
+def format_labels(key: Labels) -> str:
+    if not key:
+        return ""
+
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in key)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + "}"
+
+
+def timed(method: Callable) -> Callable:
+    # Times a player method under its class and method name, skipped entirely when disabled:
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = _metrics
+        if not metrics.enabled:
+            return method(self, *args, **kwargs)
+
+        with metrics.timer(
+            "player_call_seconds", player_type=type(self).__name__, method=method.__name__
+        ):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+_metrics: Metrics = Metrics(enabled=False)
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def set_metrics(metrics: Metrics) -> None:
+    global _metrics
+    _metrics = metrics
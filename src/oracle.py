@@ -0,0 +1,334 @@
+import argparse
+import functools
+import math
+import random
+import threading
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+from src.game import (
+    FAILED_ELECTIONS_LIMIT,
+    FASCIST_POLICIES_WIN,
+    FASCIST_POLICY_COUNT,
+    LIBERAL_POLICIES_WIN,
+    LIBERAL_POLICY_COUNT,
+    POLICIES_FOR_HITLER_CHANCELLOR,
+    Game,
+    executive_powers,
+)
+from src.game_state import GameState, StateChange
+from src.game_types import Party, Policy, Power, Role
+from src.store import EventStore
+
+# Share of nominated governments that get elected, roughly what full AI games show:
+ELECTION_RATE = 0.7
+ROLLOUTS = 2000
+MAX_EXACT_STATES = 200_000
+CACHE_SIZE = 10_000
+
+LIBERAL_WIN = 1.0
+FASCIST_WIN = 0.0
+
+
+class StateKey(NamedTuple):
+    liberal: int
+    fascist: int
+    deck_liberal: int
+    deck_fascist: int
+    tracker: int
+    liberals: int
+    fascists: int
+    hitler: int
+    table: int
+
+
+# Liberal win probability once the game is over, otherwise the state it continues from:
+Outcome = float | StateKey
+
+
+class TooManyStates(Exception):
+    pass
+
+
+def rule_key(
+    enacted_policies: Dict[str, int],
+    failed_elections: int,
+    alive_roles: List[Role],
+    table: int,
+    policy_deck: List[Policy] | None = None,
+) -> StateKey:
+    liberal = enacted_policies[Policy.liberal]
+    fascist = enacted_policies[Policy.fascist]
+    if policy_deck is None:
+        # Without the deck, every card that hasn't been enacted could come next:
+        deck_liberal = LIBERAL_POLICY_COUNT - liberal
+        deck_fascist = FASCIST_POLICY_COUNT - fascist
+    else:
+        # The discard pile is whatever is neither enacted nor in the deck, so the deck pins it down:
+        deck_liberal = policy_deck.count(Policy.liberal)
+        deck_fascist = len(policy_deck) - deck_liberal
+
+    return StateKey(
+        liberal=liberal,
+        fascist=fascist,
+        deck_liberal=deck_liberal,
+        deck_fascist=deck_fascist,
+        tracker=failed_elections,
+        liberals=alive_roles.count(Role.liberal),
+        fascists=alive_roles.count(Role.fascist),
+        hitler=alive_roles.count(Role.hitler),
+        table=table,
+    )
+
+
+def state_key(game_state: GameState, policy_deck: List[Policy] | None = None) -> StateKey:
+    return rule_key(
+        game_state.enacted_policies,
+        game_state.failed_elections,
+        [p.role for p in game_state.players if p.alive],
+        len(game_state.players),
+        policy_deck,
+    )
+
+
+def draw(key: StateKey, amount: int) -> List[Tuple[float, int, StateKey]]:
+    # Each possible number of liberal cards drawn, with its probability and the deck left behind:
+    if key.deck_liberal + key.deck_fascist < amount:
+        key = key._replace(
+            deck_liberal=LIBERAL_POLICY_COUNT - key.liberal,
+            deck_fascist=FASCIST_POLICY_COUNT - key.fascist,
+        )
+
+    total = math.comb(key.deck_liberal + key.deck_fascist, amount)
+    hands = []
+    for liberal in range(amount + 1):
+        ways = math.comb(key.deck_liberal, liberal) * math.comb(key.deck_fascist, amount - liberal)
+        if ways:
+            deck = key._replace(
+                deck_liberal=key.deck_liberal - liberal,
+                deck_fascist=key.deck_fascist - amount + liberal,
+            )
+            hands.append((ways / total, liberal, deck))
+
+    return hands
+
+
+def enact(key: StateKey, policy: Policy, president: Role | None) -> List[Tuple[float, Outcome]]:
+    key = key._replace(tracker=0)
+    if policy == Policy.liberal:
+        if key.liberal + 1 == LIBERAL_POLICIES_WIN:
+            return [(1.0, LIBERAL_WIN)]
+        return [(1.0, key._replace(liberal=key.liberal + 1))]
+
+    key = key._replace(fascist=key.fascist + 1)
+    if key.fascist == FASCIST_POLICIES_WIN:
+        return [(1.0, FASCIST_WIN)]
+
+    # Policies enacted by a failed election grant no power:
+    power = executive_powers(key.table).get(key.fascist)
+    if president is None or power != Power.execution:
+        return [(1.0, key)]
+
+    # Fascist presidents shoot a liberal, liberal presidents anyone but themselves:
+    if president != Role.liberal:
+        return [(1.0, key._replace(liberals=key.liberals - 1))] if key.liberals else [(1.0, key)]
+
+    others = key.liberals - 1 + key.fascists + key.hitler
+    outcomes = []
+    if key.hitler:
+        outcomes.append((1 / others, LIBERAL_WIN))
+    if key.liberals > 1:
+        outcomes.append(((key.liberals - 1) / others, key._replace(liberals=key.liberals - 1)))
+    if key.fascists:
+        outcomes.append((key.fascists / others, key._replace(fascists=key.fascists - 1)))
+    return outcomes
+
+
+def legislate(liberal: int, president: Role, chancellor: Role) -> Policy:
+    # Each side discards the other side's cards whenever it can:
+    passed = min(liberal, 2) if president == Role.liberal else max(liberal - 1, 0)
+    if chancellor == Role.liberal:
+        return Policy.liberal if passed else Policy.fascist
+    return Policy.liberal if passed == 2 else Policy.fascist
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE * 10)
+def transitions(key: StateKey, election_rate: float) -> List[Tuple[float, Outcome]]:
+    # One round under a simple behaviour model: random nominations, a fixed chance the government
+    # is elected and every player plays for their own party.
+    outcomes = []
+    if election_rate < 1:
+        failed = 1 - election_rate
+        if key.tracker + 1 < FAILED_ELECTIONS_LIMIT:
+            outcomes.append((failed, key._replace(tracker=key.tracker + 1)))
+        else:
+            for p, liberal, deck in draw(key, 1):
+                policy = Policy.liberal if liberal else Policy.fascist
+                outcomes.extend((failed * p * q, o) for q, o in enact(deck, policy, None))
+
+    alive = {Role.liberal: key.liberals, Role.fascist: key.fascists, Role.hitler: key.hitler}
+    count = sum(alive.values())
+    hands = draw(key, 3)
+    for president, presidents in alive.items():
+        for chancellor, chancellors in alive.items():
+            chancellors -= president == chancellor
+            if not presidents or chancellors <= 0:
+                continue
+
+            p = election_rate * presidents / count * chancellors / (count - 1)
+            if chancellor == Role.hitler and key.fascist >= POLICIES_FOR_HITLER_CHANCELLOR:
+                outcomes.append((p, FASCIST_WIN))
+                continue
+
+            for q, liberal, deck in hands:
+                policy = legislate(liberal, president, chancellor)
+                outcomes.extend((p * q * r, o) for r, o in enact(deck, policy, president))
+
+    return outcomes
+
+
+class WinOracle:
+    # Estimates the liberal win probability of a rule-level game state, memoised by its StateKey.
+    #
+    # States are solved exactly by dynamic programming over every reachable state, falling back to
+    # Monte Carlo rollouts of the same model when that would visit more than max_states states.
+    def __init__(
+        self,
+        election_rate: float = ELECTION_RATE,
+        rollouts: int = ROLLOUTS,
+        max_states: int = MAX_EXACT_STATES,
+        cache_size: int = CACHE_SIZE,
+        seed: int | None = None,
+    ) -> None:
+        self.election_rate = election_rate
+        self.rollouts = rollouts
+        self.max_states = max_states
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        # Exactly solved states, shared by later queries since the model never changes:
+        self.values: Dict[StateKey, float] = {}
+        self.budget = 0
+        self.win_probability = functools.lru_cache(maxsize=cache_size)(self.solve)
+
+    def solve(self, key: StateKey) -> float:
+        with self.lock:
+            self.budget = self.max_states
+            try:
+                return self.exact(key)
+            except TooManyStates:
+                return self.monte_carlo(key)
+
+    def exact(self, key: StateKey) -> float:
+        if key in self.values:
+            return self.values[key]
+
+        self.budget -= 1
+        if self.budget < 0:
+            raise TooManyStates(f"More than {self.max_states} states to solve exactly")
+
+        value = 0.0
+        for p, outcome in transitions(key, self.election_rate):
+            value += p * (outcome if isinstance(outcome, float) else self.exact(outcome))
+
+        self.values[key] = value
+        return value
+
+    def monte_carlo(self, key: StateKey) -> float:
+        wins = 0.0
+        for _ in range(self.rollouts):
+            outcome = key
+            while not isinstance(outcome, float):
+                # Rollouts stop early on any state already solved exactly:
+                if outcome in self.values:
+                    outcome = self.values[outcome]
+                    break
+
+                options = transitions(outcome, self.election_rate)
+                weights = [p for p, _ in options]
+                outcome = self.random.choices([o for _, o in options], weights=weights)[0]
+            wins += outcome
+
+        return wins / self.rollouts
+
+    def estimate(
+        self, game_state: GameState, policy_deck: List[Policy] | None = None
+    ) -> Dict[Party, float]:
+        if game_state.winner is not None:
+            return {party: float(party == game_state.winner) for party in Party}
+
+        liberal = self.win_probability(state_key(game_state, policy_deck))
+        return {Party.liberal: liberal, Party.fascist: 1 - liberal}
+
+    def estimate_game(self, game: Game) -> Dict[Party, float]:
+        return self.estimate(game.state, game.policy_deck)
+
+
+def win_curve(store: EventStore, game_id: str, oracle: WinOracle) -> List[Tuple[int, float]]:
+    # The liberal win probability after every recorded state change of a stored game:
+    roles: Dict[str, Role] = {}
+    curve = []
+    for kind, data in store.load(game_id):
+        if kind == "game_started":
+            roles = {info["name"]: Role(info["role"]) for info in data["players"]}
+        elif kind == "state":
+            change = StateChange(**data)
+            if change.winner is not None:
+                curve.append((change.round_num, float(change.winner == Party.liberal)))
+                continue
+
+            alive = [role for name, role in roles.items() if name not in change.dead]
+            key = rule_key(change.enacted_policies, change.failed_elections, alive, len(roles))
+            curve.append((change.round_num, oracle.win_probability(key)))
+
+    return curve
+
+
+_oracle: WinOracle = None
+
+
+def get_oracle() -> WinOracle:
+    global _oracle
+    if _oracle is None:
+        _oracle = WinOracle()
+    return _oracle
+
+
+def set_oracle(oracle: WinOracle) -> None:
+    global _oracle
+    _oracle = oracle
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Estimate win probabilities for game states.")
+    parser.add_argument("--store", help="Event store to read a recorded game from.")
+    parser.add_argument("--game", help="Game id in the store, defaults to the latest.")
+    parser.add_argument("--players", type=int, default=7, help="Table size for a fresh game.")
+    parser.add_argument("--election-rate", type=float, default=ELECTION_RATE)
+    args = parser.parse_args()
+
+    oracle = WinOracle(election_rate=args.election_rate)
+    if args.store:
+        store = EventStore(args.store)
+        game_id = args.game or store.games()[-1]
+        for round_num, liberal in win_curve(store, game_id, oracle):
+            print(f"Round {round_num:>3}: Liberal {liberal:6.1%} / Fascist {1 - liberal:6.1%}")
+        store.close()
+        return
+
+    roles = [Role.liberal] * (args.players // 2 + 1) + [Role.hitler]
+    roles += [Role.fascist] * (args.players - len(roles))
+    key = rule_key({Policy.liberal: 0, Policy.fascist: 0}, 0, roles, args.players)
+    started = time.perf_counter()
+    liberal = oracle.win_probability(key)
+    solved = time.perf_counter() - started
+    started = time.perf_counter()
+    oracle.win_probability(key)
+    cached = time.perf_counter() - started
+
+    print(f"{args.players} players: Liberal {liberal:.1%} / Fascist {1 - liberal:.1%}")
+    print(f"Solved {len(oracle.values)} states in {solved * 1000:.1f} ms")
+    print(f"Cached answer in {cached * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
+from src.events import Event
+from src.game_types import Message
+from src.players.agent import AgentPlayer
 from src.players.base import Player
+from src.players.distilled import DistilledPlayer
 from src.players.gemini import GeminiPlayer
-from src.players.terminal import TerminalPlayer
+from src.players.remote import RemotePlayer
+from src.players.terminal import TerminalChatStream, TerminalPlayer
 
 base_players = [Player]
-players = [TerminalPlayer, GeminiPlayer]
+players = [TerminalPlayer, GeminiPlayer, RemotePlayer, AgentPlayer, DistilledPlayer]
 
 Player.model_rebuild()
 TerminalPlayer.model_rebuild()
 GeminiPlayer.model_rebuild()
+RemotePlayer.model_rebuild()
+AgentPlayer.model_rebuild()
+DistilledPlayer.model_rebuild()
+Event.model_rebuild()
+Message.model_rebuild()
@@ -0,0 +1,59 @@
+from typing import TYPE_CHECKING, Any, List
+
+from pydantic import PrivateAttr
+
+from src.game_types import Policy, Selection
+from src.players.base import Player
+
+if TYPE_CHECKING:
+    from src.game_state import GameState
+
+
+class AgentPlayer(Player):
+    # Seat whose decisions are supplied from outside the game loop, e.g. by src.env.VectorEnv.
+    #
+    # The driver sets the chosen action with act() before calling the decision it answers: a
+    # player for targeted decisions, a bool for votes and a card index for legislation. The
+    # environment keeps its own record of the game, so nothing is logged here.
+    _pending: Any = PrivateAttr(default=None)
+
+    def act(self, action: Any) -> None:
+        self._pending = action
+
+    def take(self) -> Any:
+        if self._pending is None:
+            raise RuntimeError(f"No action was given to {self.name} for this decision")
+
+        action, self._pending = self._pending, None
+        return action
+
+    def nominate_chancellor(self, game_state: "GameState", players: List[Player]) -> Player:
+        return self.take()
+
+    def vote_on_government(
+        self, game_state: "GameState", president: Player, chancellor: Player
+    ) -> bool:
+        return self.take()
+
+    def propose_policies(self, game_state: "GameState", policy_cards: List[Policy]) -> Selection:
+        discarded = [policy_cards.pop(self.take())]
+        return Selection(selected=policy_cards, discarded=discarded)
+
+    def enact_policy(self, game_state: "GameState", policy_cards: List[Policy]) -> Selection:
+        selected = [policy_cards.pop(self.take())]
+        return Selection(selected=selected, discarded=policy_cards)
+
+    def action_investigate_loyalty(self, game_state: "GameState", players: List[Player]) -> Player:
+        return self.take()
+
+    def action_execution(self, game_state: "GameState", players: List[Player]) -> Player:
+        return self.take()
+
+    def action_special_election(self, game_state: "GameState", players: List[Player]) -> Player:
+        return self.take()
+
+    def action_policy_peek(self, game_state: "GameState", policy_cards: List[Policy]) -> None:
+        pass
+
+    def discuss(self, game_state: "GameState", prompt: str) -> None:
+        pass
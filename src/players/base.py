@@ -6,6 +6,7 @@ from pydantic import BaseModel, ConfigDict, Field
 
 from src.events import EventType
 from src.game_types import Message, Party, Policy, Role, Selection
+from src.metrics import timed
 
 if TYPE_CHECKING:
     from src.game_state import GameState
@@ -16,6 +17,22 @@ POLICY_MAPPING = {
     Policy.liberal: EventType.liberal_policy_enacted,
 }
 
+# Player calls timed by the metrics registry, including the halves of batched decisions:
+TIMED_METHODS = {
+    "nominate_chancellor",
+    "vote_on_government",
+    "resolve_vote",
+    "resolve_nomination",
+    "propose_policies",
+    "enact_policy",
+    "action_investigate_loyalty",
+    "action_execution",
+    "action_special_election",
+    "action_policy_peek",
+    "discuss",
+    "resolve_discussion",
+}
+
 
 class Player(BaseModel, ABC):
     name: str
@@ -30,6 +47,19 @@ class Player(BaseModel, ABC):
     def __hash__(self) -> int:
         return hash((self.name,))
 
+    def __eq__(self, other: object) -> bool:
+        # Names are unique within a game, comparing every field made membership tests costly:
+        if not isinstance(other, Player):
+            return NotImplemented
+
+        return self.name == other.name
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        for name in TIMED_METHODS & set(vars(cls)):
+            setattr(cls, name, timed(vars(cls)[name]))
+
     @abstractmethod
     def nominate_chancellor(self, game_state: "GameState", players: List["Player"]) -> "Player":
         pass
@@ -56,6 +86,10 @@ class Player(BaseModel, ABC):
     def action_execution(self, game_state: "GameState", players: List["Player"]) -> None:
         pass
 
+    @abstractmethod
+    def action_special_election(self, game_state: "GameState", players: List["Player"]) -> "Player":
+        pass
+
     @abstractmethod
     def action_policy_peek(self, game_state: "GameState", policies: List["Policy"]) -> None:
         pass
@@ -64,6 +98,24 @@ class Player(BaseModel, ABC):
     def discuss(self, game_state: "GameState", prompt: str) -> None:
         pass
 
+    def observe(self, game_state: "GameState") -> None:
+        # Players that keep incremental views of the game subscribe to its bus here:
+        pass
+
+    def game_over(self, game_state: "GameState") -> None:
+        pass
+
+    def known_allies(self, players: List["Player"]) -> List["Player"]:
+        if self.party != Party.fascist:
+            return []
+
+        # Hitler only knows the other fascist in small games:
+        fascists = [x for x in players if x.party == Party.fascist and x != self]
+        if self.role != Role.hitler or len(fascists) == 1:
+            return fascists
+
+        return []
+
     def __str__(self) -> str:
         return self.name
 
@@ -0,0 +1,278 @@
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+import numpy as np
+from pydantic import Field, PrivateAttr
+
+from src.events import Event, EventType
+from src.game_types import Party, Policy, Role, Selection
+from src.players.agent import AgentPlayer
+from src.players.base import POLICY_MAPPING, VOTE_MAPPING, Player
+from src.routing import DecisionType
+
+if TYPE_CHECKING:
+    from src.game_state import GameState
+
+TARGET_DECISIONS = {
+    DecisionType.nominate_chancellor,
+    DecisionType.action_investigate_loyalty,
+    DecisionType.action_execution,
+    DecisionType.action_special_election,
+}
+CARD_DECISIONS = {DecisionType.propose_policies, DecisionType.enact_policy}
+
+VOTES = {EventType.vote_in_favour.name: True, EventType.vote_against.name: False}
+ENACTED = {
+    EventType.liberal_policy_enacted.name: Policy.liberal,
+    EventType.fascist_policy_enacted.name: Policy.fascist,
+}
+
+Examples = Dict[str, List[Tuple[np.ndarray, int]]]
+
+
+class GameView:
+    # A game rebuilt from its log records, used for features both when training and when playing.
+    def __init__(self, started: Dict[str, Any]) -> None:
+        self.players = {
+            info["name"]: AgentPlayer(name=info["name"], party=info["party"], role=info["role"])
+            for info in started["players"]
+        }
+        self.types = {info["name"]: info["type"] for info in started["players"]}
+        self.allies = {
+            name: {ally.name for ally in player.known_allies(list(self.players.values()))}
+            for name, player in self.players.items()
+        }
+        self.alive = set(self.players)
+        self.failed_elections = started["failed_elections"]
+        self.enacted = {Policy.liberal: 0, Policy.fascist: 0}
+        self.president: str = None
+        self.chancellor: str = None
+        self.nominee: Tuple[str, str] = (None, None)
+        self.records: Dict[str, List[int]] = {name: [0, 0] for name in self.players}
+        self.votes: List[Dict[str, bool]] = []
+        self.investigated: Dict[str, Dict[str, Party]] = defaultdict(dict)
+
+    def update(self, kind: str, data: Dict[str, Any]) -> None:
+        if kind == "state":
+            self.president = data["president"]
+            self.chancellor = data["chancellor"]
+            self.failed_elections = data["failed_elections"]
+            self.enacted.update(data["enacted_policies"])
+            self.alive = set(self.players) - set(data["dead"])
+            return
+
+        if kind != "event":
+            return
+
+        event_type = data["event_type"]
+        if event_type == EventType.chancellor_nominated.name:
+            self.nominee = (data["actor"], data["recipient"])
+            self.votes.append({})
+        elif event_type in VOTES and self.votes:
+            self.votes[-1][data["actor"]] = VOTES[event_type]
+        elif event_type in ENACTED:
+            # Both members of the sitting government share the credit or blame:
+            column = 1 if ENACTED[event_type] == Policy.fascist else 0
+            for name in {self.president, self.chancellor} - {None}:
+                self.records[name][column] += 1
+        elif event_type == EventType.loyalty_investigated.name:
+            recipient = data["recipient"]
+            self.investigated[data["actor"]][recipient] = self.players[recipient].party
+
+    def known_role(self, actor: str, name: str) -> Role | None:
+        player = self.players[name]
+        if name == actor or name in self.allies[actor]:
+            return player.role
+
+        party = self.investigated[actor].get(name)
+        if party is not None:
+            return Role.fascist if party == Party.fascist else Role.liberal
+
+        return None
+
+    def player_features(self, actor: str, name: str) -> List[float]:
+        if name is None:
+            return [0.0] * 8
+
+        role = self.known_role(actor, name)
+        liberal, fascist = self.records[name]
+        shared = [v for v in self.votes if actor in v and name in v]
+        agreement = sum(v[actor] == v[name] for v in shared) / len(shared) if shared else 0.5
+        cast = [v[name] for v in self.votes if name in v]
+        in_favour = sum(cast) / len(cast) if cast else 0.5
+
+        return [
+            float(role in (Role.fascist, Role.hitler)),
+            float(role == Role.liberal),
+            float(role == Role.hitler),
+            fascist / 3,
+            liberal / 3,
+            agreement - 0.5,
+            in_favour - 0.5,
+            float(name in (self.president, self.chancellor)),
+        ]
+
+    def context(self) -> List[float]:
+        return [
+            self.enacted[Policy.fascist] / 6,
+            self.enacted[Policy.liberal] / 5,
+            self.failed_elections / 3,
+        ]
+
+    def features(self, decision: str, actor: str, options: List[str]) -> np.ndarray:
+        # One row per option, scored by a linear model, fascists get their own copy of each weight:
+        fascist = float(self.players[actor].party == Party.fascist)
+        hitler = float(self.players[actor].role == Role.hitler)
+        rows = []
+        for option in options:
+            if decision in TARGET_DECISIONS:
+                row = self.player_features(actor, option)
+            elif decision in CARD_DECISIONS:
+                is_fascist = float(option == Policy.fascist)
+                row = [is_fascist, is_fascist * hitler] + [is_fascist * c for c in self.context()]
+            else:
+                president, chancellor = self.nominee
+                yes = float(option == "Y")
+                row = [
+                    yes * value
+                    for value in [1.0]
+                    + self.context()
+                    + self.player_features(actor, president)
+                    + self.player_features(actor, chancellor)
+                ]
+            rows.append(row + [value * fascist for value in row])
+
+        return np.asarray(rows, dtype=np.float64)
+
+
+class LinearPolicy:
+    # Conditional logit per decision type: each option's features are scored and the best one taken.
+    def __init__(self, weights: Dict[str, np.ndarray]) -> None:
+        self.weights = weights
+
+    def scores(self, decision: str, features: np.ndarray) -> np.ndarray:
+        # Decisions missing from the training logs are left to chance:
+        if decision not in self.weights:
+            return np.zeros(len(features))
+
+        return features @ self.weights[decision]
+
+    def choose(
+        self, decision: str, features: np.ndarray, rng: np.random.Generator | None = None
+    ) -> int:
+        scores = self.scores(decision, features)
+        if rng is None:
+            return int(np.argmax(scores))
+
+        probabilities = np.exp(scores - scores.max())
+        return int(rng.choice(len(scores), p=probabilities / probabilities.sum()))
+
+    def accuracy(self, examples: Examples) -> Dict[str, float]:
+        return {
+            decision: float(np.mean([self.choose(decision, x) == y for x, y in rows]))
+            for decision, rows in examples.items()
+            if rows and decision in self.weights
+        }
+
+    def save(self, path: str) -> None:
+        np.savez(path, **self.weights)
+
+    @classmethod
+    def load(cls, path: str) -> "LinearPolicy":
+        with np.load(path) as data:
+            return cls({decision: data[decision] for decision in data.files})
+
+
+_policy: LinearPolicy = None
+
+
+def get_policy() -> LinearPolicy:
+    if _policy is None:
+        raise RuntimeError("No distilled policy loaded, train one with `python -m src.distill`.")
+
+    return _policy
+
+
+def has_policy() -> bool:
+    return _policy is not None
+
+
+def set_policy(policy: LinearPolicy) -> None:
+    global _policy
+    _policy = policy
+
+
+class DistilledPlayer(Player):
+    # Plays from a policy distilled from logged LLM decisions, in microseconds and offline.
+    sample: bool = Field(default=False)
+    seed: int | None = Field(default=None)
+    _view: GameView = PrivateAttr(default=None)
+    _rng: np.random.Generator = PrivateAttr(default=None)
+
+    def observe(self, game_state: "GameState") -> None:
+        # Imported here as the store itself depends on the players package:
+        from src.store import encode_record, game_started
+
+        self._view = GameView(game_started(game_state))
+        self._rng = np.random.default_rng(self.seed) if self.sample else None
+        game_state.bus.subscribe(lambda item: self._view.update(*encode_record(item)))
+
+    def decide(self, decision: DecisionType, options: List[Any]) -> int:
+        features = self._view.features(decision, self.name, [str(o) for o in options])
+        return get_policy().choose(decision, features, self._rng)
+
+    def nominate_chancellor(self, game_state: "GameState", players: List[Player]) -> Player:
+        chosen_player = players[self.decide(DecisionType.nominate_chancellor, players)]
+        game_state.record(
+            Event(event_type=EventType.chancellor_nominated, actor=self, recipient=chosen_player)
+        )
+
+        return chosen_player
+
+    def vote_on_government(
+        self, game_state: "GameState", president: Player, chancellor: Player
+    ) -> bool:
+        vote_result = self.decide(DecisionType.vote_on_government, ["Y", "N"]) == 0
+        game_state.record(Event(event_type=VOTE_MAPPING[vote_result], actor=self))
+
+        return vote_result
+
+    def propose_policies(self, game_state: "GameState", policy_cards: List[Policy]) -> Selection:
+        discard_idx = self.decide(DecisionType.propose_policies, policy_cards)
+
+        discarded = [policy_cards.pop(discard_idx)]
+        return Selection(selected=policy_cards, discarded=discarded)
+
+    def enact_policy(self, game_state: "GameState", policy_cards: List[Policy]) -> Selection:
+        enact_idx = self.decide(DecisionType.enact_policy, policy_cards)
+
+        selected = [policy_cards.pop(enact_idx)]
+        game_state.record(Event(event_type=POLICY_MAPPING[selected[0]], actor=self))
+
+        return Selection(selected=selected, discarded=policy_cards)
+
+    def action_investigate_loyalty(self, game_state: "GameState", players: List[Player]) -> None:
+        player = players[self.decide(DecisionType.action_investigate_loyalty, players)]
+        game_state.record(
+            Event(event_type=EventType.loyalty_investigated, actor=self, recipient=player)
+        )
+
+    def action_execution(self, game_state: "GameState", players: List[Player]) -> Player:
+        player = players[self.decide(DecisionType.action_execution, players)]
+        game_state.record(Event(event_type=EventType.player_executed, actor=self, recipient=player))
+
+        return player
+
+    def action_special_election(self, game_state: "GameState", players: List[Player]) -> Player:
+        player = players[self.decide(DecisionType.action_special_election, players)]
+        game_state.record(
+            Event(event_type=EventType.special_election, actor=self, recipient=player)
+        )
+
+        return player
+
+    def action_policy_peek(self, game_state: "GameState", policy_cards: List[Policy]) -> None:
+        game_state.record(Event(event_type=EventType.policy_peek, actor=self))
+
+    def discuss(self, game_state: "GameState", prompt: str) -> None:
+        pass
@@ -1,24 +1,29 @@
+import bisect
+import datetime as dt
 import json
-import os
+import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import TYPE_CHECKING, List, Type
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Type
 
-import google.generativeai as genai
-from dotenv import load_dotenv
+from pydantic import Field, PrivateAttr
 from typing_extensions import TypedDict
 
 from src.events import Event, EventType
-from src.game_types import Message, Party, Policy, Role, Selection
+from src.game_types import DecisionRecord, Message, Policy, Selection
+from src.llm import LLMRequest, get_backend
 from src.players.base import POLICY_MAPPING, VOTE_MAPPING, Player
+from src.players.distilled import GameView, get_policy, has_policy
+from src.rate_limit import Priority
+from src.retrieval import MemoryIndex, get_memory_store
+from src.routing import DecisionType, get_routing_policy
+from src.streaming import JsonFieldStream
 
 if TYPE_CHECKING:
     from src.game_state import GameState
 
-load_dotenv()
-genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
-model = genai.GenerativeModel("gemini-1.5-flash")
-
 
 BASE_PROMPT = """
 # SECRET HITLER
@@ -158,30 +163,170 @@ def create_schema(name: str, choices) -> Type[TypedDict]:
     )
 
 
+LOG_RETENTION = 1000
+RECENT_MEMORIES = 20
+RETRIEVED_MEMORIES = 25
+GOVERNMENT_RECORD = 10
+# With a distilled policy loaded, calls that fail or take longer than this are decided by it:
+FALLBACK_TIMEOUT = 30.0
+FALLBACK_WORKERS = 32
+
+logger = logging.getLogger(__name__)
+_fallback_executor = ThreadPoolExecutor(max_workers=FALLBACK_WORKERS)
+
+
+def call_backend(request: LLMRequest) -> str | None:
+    # Without a policy to fall back on, backend errors reach the caller as they always have:
+    if not has_policy():
+        return get_backend().generate(request)
+
+    future = _fallback_executor.submit(get_backend().generate, request)
+    try:
+        return future.result(timeout=FALLBACK_TIMEOUT)
+    except Exception:
+        logger.warning(
+            "%s call failed, using the distilled policy", request.decision, exc_info=True
+        )
+        return None
+
+
+def call_backend_batch(requests: List[LLMRequest]) -> List[str | None]:
+    if not has_policy():
+        return get_backend().generate_batch(requests)
+
+    future = _fallback_executor.submit(get_backend().generate_batch, requests)
+    try:
+        return future.result(timeout=FALLBACK_TIMEOUT)
+    except Exception:
+        logger.warning("Batch of %d calls failed, using the distilled policy", len(requests))
+        return [None] * len(requests)
+
+
 class GeminiPlayer(Player):
-    def build_game_log(self, game_state: "GameState", max_events: int = 150) -> str:
-        events = list(game_state.event_history)
-        events.extend(list(game_state.public_chat))
-        events.extend(list(self.thoughts))
-        events = sorted(events, key=lambda x: x.time)
-
-        logs = {"old": "", "new": ""}
-        for event in events[-max_events:]:
-            log = "old" if event.time <= self.last_logged_message_dt else "new"
-            if isinstance(event, Message):
-                chat_type = "INTERNAL THOUGHT" if event.internal else "PUBLIC CHAT"
-                if event.author == self:
-                    string = f"\n[{chat_type}][Myself]: {event.content}"
-                else:
-                    string = f"\n[{chat_type}][{event.author}]: {event.content}"
+    priority: Priority = Field(default=Priority.background)
+    _log: List[Tuple[dt.datetime, str]] = PrivateAttr(default_factory=list)
+    _memory: MemoryIndex = PrivateAttr(default=None)
+    # Bus subscribers run on whichever thread records, including the vote threads:
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    # Only kept when a distilled policy is loaded to answer for failed calls:
+    _view: GameView = PrivateAttr(default=None)
+
+    def request(
+        self,
+        game_state: "GameState",
+        decision: DecisionType,
+        prompt: str,
+        response_schema: Type,
+    ) -> LLMRequest:
+        return LLMRequest(
+            prompt=prompt,
+            response_schema=response_schema,
+            model_name=get_routing_policy().route(decision, game_state),
+            priority=self.priority,
+            decision=decision,
+        )
+
+    def generate(
+        self,
+        game_state: "GameState",
+        decision: DecisionType,
+        prompt: str,
+        response_schema: Type,
+        options: List[Any],
+    ) -> Dict[str, Any]:
+        request = self.request(game_state, decision, prompt, response_schema)
+        return self.parse(decision, call_backend(request), options)
+
+    def parse(self, decision: DecisionType, response: str | None, options: List[Any]) -> Dict:
+        if response is not None:
+            try:
+                return json.loads(response)
+            except json.JSONDecodeError:
+                if self._view is None:
+                    raise
+
+        if self._view is None:
+            raise RuntimeError(f"No response for {self.name}'s {decision} decision")
+
+        return self.fallback(decision, options)
+
+    def fallback(self, decision: DecisionType, options: List[Any]) -> Dict[str, Any]:
+        if decision == DecisionType.discuss:
+            return {"internal_thoughts": "", "public_chat": ""}
+
+        features = self._view.features(decision, self.name, [str(o) for o in options])
+        choice = get_policy().choose(decision, features)
+        if decision == DecisionType.vote_on_government:
+            return {"thoughts": "", "selection": options[choice]}
+
+        return {"thoughts": "", "selection": str(choice + 1)}
+
+    def record_decision(
+        self, game_state: "GameState", decision: DecisionType, options: List, choice: Any
+    ) -> None:
+        game_state.record(
+            DecisionRecord(
+                decision=decision,
+                actor=self.name,
+                options=[str(option) for option in options],
+                choice=str(choice),
+            )
+        )
+
+    def observe(self, game_state: "GameState") -> None:
+        memory_store = get_memory_store()
+        if memory_store is not None:
+            self._memory = memory_store.load(self.name)
+
+        game_state.bus.subscribe(self.receive)
+        if has_policy():
+            # Imported here as the store itself depends on the players package:
+            from src.store import encode_record, game_started
+
+            self._view = GameView(game_started(game_state))
+            game_state.bus.subscribe(lambda item: self._view.update(*encode_record(item)))
+
+    def game_over(self, game_state: "GameState") -> None:
+        memory_store = get_memory_store()
+        if memory_store is not None and self._memory is not None:
+            memory_store.save(self.name, self._memory)
+
+    def receive(self, item: Event | Message) -> None:
+        if isinstance(item, Message):
+            if item.internal and item.author.name != self.name:
+                return
 
+            chat_type = "INTERNAL THOUGHT" if item.internal else "PUBLIC CHAT"
+            if item.author.name == self.name:
+                string = f"\n[{chat_type}][Myself]: {item.content}"
             else:
-                string = f"\n[EVENT]: {event.description()}"
+                string = f"\n[{chat_type}][{item.author}]: {item.content}"
 
-            logs[log] += string
+        elif isinstance(item, Event):
+            string = f"\n[EVENT]: {item.description()}"
 
-        if events:
-            self.last_logged_message_dt = events[-1].time
+        else:
+            return
+
+        with self._lock:
+            # Items arrive almost in time order, so this is nearly always an append:
+            bisect.insort(self._log, (item.time, string), key=lambda entry: entry[0])
+            if len(self._log) > 2 * LOG_RETENTION:
+                del self._log[:-LOG_RETENTION]
+            if self._memory is not None:
+                self._memory.add(string.strip(), item.time)
+
+    def build_game_log(self, game_state: "GameState", max_events: int = 150) -> str:
+        with self._lock:
+            entries = self._log[-max_events:]
+        split = bisect.bisect_right(entries, self.last_logged_message_dt, key=lambda e: e[0])
+        logs = {
+            "old": "".join(string for _, string in entries[:split]),
+            "new": "".join(string for _, string in entries[split:]),
+        }
+
+        if entries:
+            self.last_logged_message_dt = entries[-1][0]
 
         event_log = ""
         if not (logs["new"] or logs["old"]):
@@ -195,11 +340,66 @@ class GeminiPlayer(Player):
 
         return event_log
 
+    def build_memory_log(self, query: str) -> str:
+        # The latest events always go in, older ones only when they're relevant to the decision:
+        memory = self._memory
+        with self._lock:
+            recent = [
+                i
+                for i in memory.recent(RECENT_MEMORIES)
+                if memory.memories[i].session == memory.session
+            ]
+            relevant = sorted(
+                memory.search(query, RETRIEVED_MEMORIES, exclude=set(recent)),
+                key=lambda i: (memory.memories[i].session, memory.memories[i].time),
+            )
+
+        if not (recent or relevant):
+            return "\n## GAME EVENT HISTORY:\nThe game has just begun!\n"
+
+        event_log = ""
+        if relevant:
+            lines = []
+            for i in relevant:
+                earlier = "[EARLIER GAME]" if memory.memories[i].session != memory.session else ""
+                lines.append(f"{earlier}{memory.memories[i].text}")
+            event_log += "\n## RELEVANT EARLIER EVENTS:\n" + "\n".join(lines) + "\n"
+
+        if recent:
+            lines = [memory.memories[i].text for i in recent]
+            event_log += "\n## LATEST GAME EVENTS:\n" + "\n".join(lines) + "\n"
+
+        return event_log
+
+    def build_government_record(self, game_state: "GameState") -> str:
+        # Read straight from the history index, so the votes stay visible after the log trims them:
+        governments = game_state.history.governments[-GOVERNMENT_RECORD:]
+        if not governments:
+            return ""
+
+        lines = []
+        for government in governments:
+            line = f"Round {government.round_num}: {government.president} nominated {government.chancellor}"
+            if government.votes:
+                ja = [name for name, vote in government.votes.items() if vote]
+                nein = [name for name, vote in government.votes.items() if not vote]
+                outcome = "elected" if government.elected else "rejected"
+                line += f", {outcome} (Ja: {', '.join(ja) or 'nobody'}; Nein: {', '.join(nein) or 'nobody'})"
+            if government.policy is not None:
+                line += f", enacted a {government.policy} policy"
+            lines.append(line)
+
+        return "\n## GOVERNMENTS SO FAR:\n" + "\n".join(lines) + "\n"
+
     def build_prompt(
         self, game_state: "GameState", choice_prompt: str, government_role: str = None
     ) -> str:
         prompt = BASE_PROMPT
-        prompt += self.build_game_log(game_state)
+        if self._memory is not None:
+            prompt += self.build_memory_log(choice_prompt)
+        else:
+            prompt += self.build_game_log(game_state)
+        prompt += self.build_government_record(game_state)
 
         prompt += "\n## PLAYER INFO:"
         prompt += f"\nYour name: {self.name}"
@@ -208,19 +408,18 @@ class GeminiPlayer(Player):
             prompt += f"\nYour current government position: {government_role}"
 
         allies = ""
-        if self.party == Party.fascist:
-            fascists = [x for x in game_state.players if x.party == Party.fascist and x != self]
-            if self.role != Role.hitler or len(fascists) == 1:
-                allies = "Your fascist allies:"
-                for player in fascists:
-                    allies += f"\t - {player.name}"
+        fascists = self.known_allies(game_state.players)
+        if fascists:
+            allies = "Your fascist allies:"
+            for player in fascists:
+                allies += f"\t - {player.name}"
 
         prompt += allies
         prompt += f"\n\n## PROMPT:\n{choice_prompt}"
 
         return prompt
 
-    def nominate_chancellor(self, game_state: "GameState", players: List[Player]) -> Player:
+    def prepare_nomination(self, game_state: "GameState", players: List[Player]) -> LLMRequest:
         choice_prompt = create_choice_prompt(
             title_message=f"{self.name}, you are the president and you must now nominate a chancellor:",
             input_message="Please nominate one of the above players as chancellor.",
@@ -230,53 +429,62 @@ class GeminiPlayer(Player):
         prompt = self.build_prompt(game_state, choice_prompt, government_role="President")
 
         Decision = create_schema("Decision", players)
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type="application/json", response_schema=Decision
-            ),
-        )
+        return self.request(game_state, DecisionType.nominate_chancellor, prompt, Decision)
 
-        data = json.loads(response.candidates[0].content.parts[0].text)
+    def resolve_nomination(
+        self, game_state: "GameState", players: List[Player], response: str
+    ) -> Player:
+        data = self.parse(DecisionType.nominate_chancellor, response, players)
         choice_idx = int(data["selection"]) - 1
         thoughts = data.get("thoughts", "")
 
         chosen_player = players[choice_idx]
-        game_state.event_history.add(
+        self.record_decision(game_state, DecisionType.nominate_chancellor, players, chosen_player)
+        game_state.record(
             Event(event_type=EventType.chancellor_nominated, actor=self, recipient=chosen_player)
         )
         time.sleep(0.01)
         thought = Message(author=self, internal=True, content=thoughts)
-        self.thoughts.add(thought)
+        game_state.record(thought)
 
         print(f"Nominating {chosen_player}")
 
         return chosen_player
 
-    def vote_on_government(
+    def nominate_chancellor(self, game_state: "GameState", players: List[Player]) -> Player:
+        request = self.prepare_nomination(game_state, players)
+        return self.resolve_nomination(game_state, players, call_backend(request))
+
+    def prepare_vote(
         self, game_state: "GameState", president: Player, chancellor: Player
-    ) -> bool:
+    ) -> LLMRequest:
         choice_prompt = f"f\n{self.name} - Vote on government (president: {president.name}, chancellor: {chancellor.name}) [y/n]? "
         prompt = self.build_prompt(game_state, choice_prompt)
 
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type="application/json", response_schema=VoteDecision
-            ),
-        )
+        return self.request(game_state, DecisionType.vote_on_government, prompt, VoteDecision)
 
-        data = json.loads(response.candidates[0].content.parts[0].text)
+    def resolve_vote(self, game_state: "GameState", response: str | None) -> bool:
+        data = self.parse(DecisionType.vote_on_government, response, [v.value for v in Vote])
         vote_result = data["selection"].lower() == "y"
         thoughts = data.get("thoughts", "")
 
-        game_state.event_history.add(Event(event_type=VOTE_MAPPING[vote_result], actor=self))
+        vote = Vote.y if vote_result else Vote.n
+        self.record_decision(
+            game_state, DecisionType.vote_on_government, [v.value for v in Vote], vote.value
+        )
+        game_state.record(Event(event_type=VOTE_MAPPING[vote_result], actor=self))
         time.sleep(0.01)
         thought = Message(author=self, internal=True, content=thoughts)
-        self.thoughts.add(thought)
+        game_state.record(thought)
 
         return vote_result
 
+    def vote_on_government(
+        self, game_state: "GameState", president: Player, chancellor: Player
+    ) -> bool:
+        request = self.prepare_vote(game_state, president, chancellor)
+        return self.resolve_vote(game_state, call_backend(request))
+
     def propose_policies(self, game_state: "GameState", policy_cards: List[Policy]) -> Selection:
         choice_prompt = create_choice_prompt(
             title_message=f"{self.name} - Choose policies to discard (you must discard one):",
@@ -287,20 +495,18 @@ class GeminiPlayer(Player):
         prompt = self.build_prompt(game_state, choice_prompt, government_role="President")
 
         Decision = create_schema("ProposePoliciesDecision", policy_cards)
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type="application/json", response_schema=Decision
-            ),
+        data = self.generate(
+            game_state, DecisionType.propose_policies, prompt, Decision, policy_cards
         )
-
-        data = json.loads(response.candidates[0].content.parts[0].text)
         discard_idx = int(data["selection"]) - 1
         thoughts = data.get("thoughts", "")
 
+        self.record_decision(
+            game_state, DecisionType.propose_policies, policy_cards, policy_cards[discard_idx]
+        )
         discarded = [policy_cards.pop(discard_idx)]
         thought = Message(author=self, internal=True, content=thoughts)
-        self.thoughts.add(thought)
+        game_state.record(thought)
 
         return Selection(selected=policy_cards, discarded=discarded)
 
@@ -314,22 +520,18 @@ class GeminiPlayer(Player):
         prompt = self.build_prompt(game_state, choice_prompt, government_role="President")
 
         Decision = create_schema("EnactPolicyDecision", policy_cards)
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type="application/json", response_schema=Decision
-            ),
-        )
-
-        data = json.loads(response.candidates[0].content.parts[0].text)
+        data = self.generate(game_state, DecisionType.enact_policy, prompt, Decision, policy_cards)
         enact_idx = int(data["selection"]) - 1
         thoughts = data.get("thoughts", "")
 
+        self.record_decision(
+            game_state, DecisionType.enact_policy, policy_cards, policy_cards[enact_idx]
+        )
         selected = [policy_cards.pop(enact_idx)]
-        game_state.event_history.add(Event(event_type=POLICY_MAPPING[selected[0]], actor=self))
+        game_state.record(Event(event_type=POLICY_MAPPING[selected[0]], actor=self))
         time.sleep(0.01)
         thought = Message(author=self, internal=True, content=thoughts)
-        self.thoughts.add(thought)
+        game_state.record(thought)
 
         return Selection(selected=selected, discarded=policy_cards)
 
@@ -343,24 +545,20 @@ class GeminiPlayer(Player):
         prompt = self.build_prompt(game_state, choice_prompt, government_role="President")
 
         Decision = create_schema("Decision", players)
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type="application/json", response_schema=Decision
-            ),
+        data = self.generate(
+            game_state, DecisionType.action_investigate_loyalty, prompt, Decision, players
         )
-
-        data = json.loads(response.candidates[0].content.parts[0].text)
         choice_idx = int(data["selection"]) - 1
         thoughts = data.get("thoughts", "")
 
         player = players[choice_idx]
-        game_state.event_history.add(
+        self.record_decision(game_state, DecisionType.action_investigate_loyalty, players, player)
+        game_state.record(
             Event(event_type=EventType.loyalty_investigated, actor=self, recipient=player)
         )
         time.sleep(0.01)
         thought = Message(author=self, internal=True, content=thoughts)
-        self.thoughts.add(thought)
+        game_state.record(thought)
 
         investigation = f"I have investigated the party loyalty of {player.name}, and I know with certainty that they are {player.role},"
 
@@ -371,7 +569,7 @@ class GeminiPlayer(Player):
 
         time.sleep(0.01)
         thought = Message(author=self, internal=True, content=investigation)
-        self.thoughts.add(thought)
+        game_state.record(thought)
 
     def action_execution(self, game_state: "GameState", players: List[Player]) -> Player:
         choice_prompt = create_choice_prompt(
@@ -383,31 +581,54 @@ class GeminiPlayer(Player):
         prompt = self.build_prompt(game_state, choice_prompt, government_role="President")
 
         Decision = create_schema("Decision", players)
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type="application/json", response_schema=Decision
-            ),
+        data = self.generate(game_state, DecisionType.action_execution, prompt, Decision, players)
+        choice_idx = int(data["selection"]) - 1
+        thoughts = data.get("thoughts", "")
+
+        chosen_player = players[choice_idx]
+        self.record_decision(game_state, DecisionType.action_execution, players, chosen_player)
+        game_state.record(
+            Event(event_type=EventType.player_executed, actor=self, recipient=chosen_player)
         )
+        time.sleep(0.01)
+        thought = Message(author=self, internal=True, content=thoughts)
+        game_state.record(thought)
+
+        print(f"Executing {chosen_player}")
+
+        return chosen_player
 
-        data = json.loads(response.candidates[0].content.parts[0].text)
+    def action_special_election(self, game_state: "GameState", players: List[Player]) -> Player:
+        choice_prompt = create_choice_prompt(
+            title_message=f"{self.name}, you are the President and you must now choose the next President:",
+            input_message="Please choose one of the above players.",
+            choices=players,
+        )
+
+        prompt = self.build_prompt(game_state, choice_prompt, government_role="President")
+
+        Decision = create_schema("Decision", players)
+        data = self.generate(
+            game_state, DecisionType.action_special_election, prompt, Decision, players
+        )
         choice_idx = int(data["selection"]) - 1
         thoughts = data.get("thoughts", "")
 
         chosen_player = players[choice_idx]
-        game_state.event_history.add(
-            Event(event_type=EventType.chancellor_nominated, actor=self, recipient=chosen_player)
+        self.record_decision(
+            game_state, DecisionType.action_special_election, players, chosen_player
+        )
+        game_state.record(
+            Event(event_type=EventType.special_election, actor=self, recipient=chosen_player)
         )
         time.sleep(0.01)
         thought = Message(author=self, internal=True, content=thoughts)
-        self.thoughts.add(thought)
-
-        print(f"Nominating {chosen_player}")
+        game_state.record(thought)
 
         return chosen_player
 
     def action_policy_peek(self, game_state: "GameState", policy_cards: List[Policy]) -> None:
-        game_state.event_history.add(Event(event_type=EventType.policy_peek, actor=self))
+        game_state.record(Event(event_type=EventType.policy_peek, actor=self))
 
         cards = "\n".join(
             [f"{idx} - {card}" for idx, card in enumerate(policy_cards[-3:], start=1)]
@@ -416,9 +637,9 @@ class GeminiPlayer(Player):
         thought_str += cards
 
         thought = Message(author=self, internal=True, content=thought_str)
-        self.thoughts.add(thought)
+        game_state.record(thought)
 
-    def discuss(self, game_state: "GameState", prompt: str) -> None:
+    def prepare_discussion(self, game_state: "GameState", prompt: str) -> LLMRequest:
         discussion_prompt = (
             "It is now time to discuss, you should consider any questions you might want to ask the others, or "
             "perhaps respond to others if you have been asked, or even just speak your mind, but be aware this will be publicly broadcast "
@@ -428,18 +649,56 @@ class GeminiPlayer(Player):
 
         prompt = self.build_prompt(game_state, discussion_prompt)
 
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type="application/json", response_schema=Discussion
-            ),
-        )
+        return self.request(game_state, DecisionType.discuss, prompt, Discussion)
 
-        data = json.loads(response.candidates[0].content.parts[0].text)
-        thoughts = data.get("thoughts", "")
+    def resolve_discussion(self, game_state: "GameState", response: str | None) -> None:
+        data = self.parse(DecisionType.discuss, response, [])
+        thoughts = data.get("internal_thoughts", "")
         public_chat = data.get("public_chat", "")
+        # Seats the distilled policy speaks for have nothing to say:
+        if not (thoughts or public_chat):
+            return
 
         thought = Message(author=self, internal=True, content=thoughts)
-        self.thoughts.add(thought)
+        game_state.record(thought)
         time.sleep(0.01)
-        game_state.public_chat.add(Message(author=self, content=public_chat))
+        game_state.record(Message(author=self, content=public_chat))
+
+    def stream_discussion(self, game_state: "GameState", request: LLMRequest) -> str:
+        parser = JsonFieldStream("public_chat")
+        chunks = []
+        started = False
+        for chunk in get_backend().stream(request):
+            chunks.append(chunk)
+            text = parser.feed(chunk)
+            if not text:
+                continue
+
+            # Announce the speaker on their first public token:
+            if not started:
+                started = True
+                for listener in game_state.chat_streams:
+                    listener.start(self)
+            for listener in game_state.chat_streams:
+                listener.chunk(self, text)
+
+        if started:
+            for listener in game_state.chat_streams:
+                listener.end(self)
+
+        return "".join(chunks)
+
+    def discuss(self, game_state: "GameState", prompt: str) -> None:
+        request = self.prepare_discussion(game_state, prompt)
+        if not game_state.chat_streams:
+            response = call_backend(request)
+        elif self._view is None:
+            response = self.stream_discussion(game_state, request)
+        else:
+            try:
+                response = self.stream_discussion(game_state, request)
+            except Exception:
+                logger.warning("Streamed discussion failed", exc_info=True)
+                response = None
+
+        self.resolve_discussion(game_state, response)
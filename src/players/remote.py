@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import json
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List
+
+from pydantic import PrivateAttr
+
+from src.events import Event, EventType
+from src.game_types import Message, Policy, Selection
+from src.players.base import POLICY_MAPPING, VOTE_MAPPING, Player
+from src.players.terminal import TerminalPlayer
+
+if TYPE_CHECKING:
+    from src.game_state import GameState
+
+
+class RemoteChannel:
+    # Bridges decisions from a game thread to a connection served by an asyncio event loop.
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.send: Callable[[str], Awaitable[None]] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.counter = itertools.count(1)
+
+    @property
+    def connected(self) -> bool:
+        return self.send is not None
+
+    def attach(self, send: Callable[[str], Awaitable[None]]) -> None:
+        self.send = send
+
+    def detach(self) -> None:
+        self.send = None
+        for future in self.pending.values():
+            if not future.done():
+                future.set_result(None)
+
+    def receive(self, text: str) -> None:
+        # Clients are untrusted, anything that can't answer a pending request is ignored:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return
+        if not isinstance(data, dict) or not isinstance(data.get("id"), int):
+            return
+
+        future = self.pending.get(data["id"])
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    async def request(
+        self, payload: Dict[str, Any], timeout: float | None
+    ) -> Dict[str, Any] | None:
+        request_id = next(self.counter)
+        future = self.loop.create_future()
+        self.pending[request_id] = future
+        try:
+            await self.send(json.dumps({**payload, "id": request_id}))
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
+        finally:
+            self.pending.pop(request_id, None)
+
+    def ask(self, payload: Dict[str, Any], timeout: float | None = None) -> Dict[str, Any] | None:
+        if not self.connected:
+            return None
+
+        return asyncio.run_coroutine_threadsafe(self.request(payload, timeout), self.loop).result()
+
+    def notify(self, payload: Dict[str, Any]) -> None:
+        if self.connected:
+            asyncio.run_coroutine_threadsafe(self.send(json.dumps(payload)), self.loop)
+
+
+class RemotePlayer(TerminalPlayer):
+    _channel: RemoteChannel = PrivateAttr(default=None)
+
+    def connect(self, channel: RemoteChannel) -> None:
+        self._channel = channel
+
+    def ask(self, payload: Dict[str, Any]) -> Dict[str, Any] | None:
+        if self._channel is None:
+            return None
+
+        return self._channel.ask(payload, self.turn_timeout)
+
+    def notify(self, text: str) -> None:
+        if self._channel is not None:
+            self._channel.notify({"type": "info", "text": text})
+
+    def choose(self, title_message: str, choices: List[Player | Policy]) -> int:
+        response = self.ask(
+            {"type": "choice", "title": title_message, "choices": [str(c) for c in choices]}
+        )
+        if response is None:
+            return 0
+
+        choice_idx = response.get("choice")
+        if not isinstance(choice_idx, int) or not 0 <= choice_idx < len(choices):
+            return 0
+
+        return choice_idx
+
+    def nominate_chancellor(self, game_state: "GameState", players: List[Player]) -> Player:
+        choice_idx = self.choose("Nominate a chancellor:", players)
+
+        chosen_player = players[choice_idx]
+        game_state.record(
+            Event(event_type=EventType.chancellor_nominated, actor=self, recipient=chosen_player)
+        )
+        game_state.record(
+            Message(author=self, content=f"I've nominated {chosen_player.name} as chancellor")
+        )
+
+        return chosen_player
+
+    def vote_on_government(
+        self, game_state: "GameState", president: Player, chancellor: Player
+    ) -> bool:
+        response = self.ask(
+            {"type": "vote", "president": president.name, "chancellor": chancellor.name}
+        )
+        vote = None if response is None else response.get("vote")
+        vote_result = vote if isinstance(vote, bool) else self.default_vote
+        game_state.record(Event(event_type=VOTE_MAPPING[vote_result], actor=self))
+
+        return vote_result
+
+    def propose_policies(self, game_state: "GameState", policy_cards: List[Policy]) -> Selection:
+        choice_idx = self.choose("Choose policies to discard (you must discard one):", policy_cards)
+
+        discarded = [policy_cards.pop(choice_idx)]
+        return Selection(selected=policy_cards, discarded=discarded)
+
+    def enact_policy(self, game_state: "GameState", policy_cards: List[Policy]) -> Selection:
+        choice_idx = self.choose("Choose a policy to enact:", policy_cards)
+
+        selected = [policy_cards.pop(choice_idx)]
+        game_state.record(Event(event_type=POLICY_MAPPING[selected[0]], actor=self))
+
+        return Selection(selected=selected, discarded=policy_cards)
+
+    def action_investigate_loyalty(self, game_state: "GameState", players: List[Player]):
+        choice_idx = self.choose("Choose a player to investigate:", players)
+
+        player = players[choice_idx]
+        game_state.record(
+            Event(event_type=EventType.loyalty_investigated, actor=self, recipient=player)
+        )
+        self.notify(f"{player.name} is a {player.party}")
+
+    def action_execution(self, game_state: "GameState", players: List[Player]) -> Player:
+        choice_idx = self.choose("Choose a player to execute:", players)
+
+        player = players[choice_idx]
+        game_state.record(Event(event_type=EventType.player_executed, actor=self, recipient=player))
+        return player
+
+    def action_special_election(self, game_state: "GameState", players: List[Player]) -> Player:
+        choice_idx = self.choose("Choose the next President:", players)
+
+        player = players[choice_idx]
+        game_state.record(
+            Event(event_type=EventType.special_election, actor=self, recipient=player)
+        )
+        return player
+
+    def action_policy_peek(self, game_state: "GameState", policy_cards: List[Policy]) -> None:
+        self.notify(f"The next 3 policies are: {', '.join(policy_cards[-3:])}")
+        game_state.record(Event(event_type=EventType.policy_peek, actor=self))
+
+    def discuss(self, game_state: "GameState", prompt: str) -> None:
+        chat = self.build_latest_chat(game_state)
+        response = self.ask({"type": "discuss", "prompt": prompt, "chat": chat})
+        if response is None or not response.get("message"):
+            return
+
+        game_state.record(Message(author=self, content=response["message"]))
@@ -1,57 +1,149 @@
+import queue
+import sys
+import threading
+import time
 from typing import TYPE_CHECKING, List
 
+from pydantic import Field, PrivateAttr
+
 from src.events import Event, EventType
 from src.game_types import Message, Policy, Selection
 from src.players.base import POLICY_MAPPING, VOTE_MAPPING, Player
+from src.streaming import ChatStreamListener
 
 if TYPE_CHECKING:
     from src.game_state import GameState
 
 
-def get_choice_idx(title_message: str, input_message: str, choices: List[Player | Policy]) -> int:
-    print(f"\n{title_message}")
-    for i, choice in enumerate(choices, start=1):
-        print(f"\t{i} - {choice}")
+# Humans share one terminal, so prompts take turns while AI seats keep working:
+input_lock = threading.RLock()
+_input_lines: "queue.Queue[str]" = queue.Queue()
+_input_reader: threading.Thread = None
+
+
+def _read_stdin() -> None:
+    try:
+        for line in sys.stdin:
+            _input_lines.put(line.rstrip("\n"))
+    except (OSError, ValueError):
+        # No usable terminal, every timed prompt will fall back to its default:
+        return
 
+
+def _drain_input() -> None:
+    # Lines typed after an earlier prompt timed out don't answer the next one:
     while True:
         try:
-            choice = input(f"\n{input_message} ")
-            choice_idx = int(choice) - 1
-            if 0 <= choice_idx <= len(choices) - 1:
-                return choice_idx
+            _input_lines.get_nowait()
+        except queue.Empty:
+            return
+
+
+def make_deadline(timeout: float | None) -> float | None:
+    if timeout is None:
+        return None
+
+    return time.monotonic() + timeout
+
+
+def read_input(message: str, deadline: float | None = None) -> str | None:
+    global _input_reader
+    if deadline is None and _input_reader is None:
+        return input(message)
+
+    if _input_reader is None:
+        _input_reader = threading.Thread(target=_read_stdin, daemon=True)
+        _input_reader.start()
+
+    _drain_input()
+    print(message, end="", flush=True)
+    try:
+        if deadline is None:
+            return _input_lines.get()
+        return _input_lines.get(timeout=max(0.0, deadline - time.monotonic()))
+    except queue.Empty:
+        print()
+        return None
+
+
+def get_choice_idx(
+    title_message: str,
+    input_message: str,
+    choices: List[Player | Policy],
+    timeout: float | None = None,
+    default_idx: int = 0,
+) -> int:
+    with input_lock:
+        deadline = make_deadline(timeout)
+        print(f"\n{title_message}")
+        for i, choice in enumerate(choices, start=1):
+            print(f"\t{i} - {choice}")
+
+        while True:
+            try:
+                choice = read_input(f"\n{input_message} ", deadline)
+                if choice is None:
+                    print(f"Out of time, defaulting to {choices[default_idx]}")
+                    return default_idx
+
+                choice_idx = int(choice) - 1
+                if 0 <= choice_idx <= len(choices) - 1:
+                    return choice_idx
+
+                print(f"Please enter a number between 1 and {len(choices)}")
+            except ValueError:
+                print("Please enter a valid number")
+
+
+class TerminalChatStream(ChatStreamListener):
+    def start(self, author: Player) -> None:
+        print(f"\n[PUBLIC CHAT][{author}]: ", end="", flush=True)
 
-            print(f"Please enter a number between 1 and {len(choices)}")
-        except ValueError:
-            print("Please enter a valid number")
+    def chunk(self, author: Player, text: str) -> None:
+        print(text, end="", flush=True)
+
+    def end(self, author: Player) -> None:
+        print(flush=True)
 
 
 class TerminalPlayer(Player):
+    turn_timeout: float | None = Field(default=None)
+    default_vote: bool = Field(default=False)
+    _unseen: List[Event | Message] = PrivateAttr(default_factory=list)
+    # Bus subscribers run on whichever thread records, including the vote threads:
+    _unseen_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def observe(self, game_state: "GameState") -> None:
+        game_state.bus.subscribe(self.receive)
+
+    def receive(self, item: Event | Message) -> None:
+        if isinstance(item, Event) or (isinstance(item, Message) and not item.internal):
+            with self._unseen_lock:
+                self._unseen.append(item)
+
     def build_latest_chat(self, game_state) -> str:
-        events = list(game_state.event_history)
-        events.extend(list(game_state.public_chat))
+        with self._unseen_lock:
+            events, self._unseen = self._unseen, []
         events = sorted(events, key=lambda x: x.time)
 
-        logs = {"old": "", "new": ""}
+        log = ""
         for event in events:
-            log = "old" if event.time <= self.last_logged_message_dt else "new"
             if isinstance(event, Message):
                 chat_type = "INTERNAL THOUGHT" if event.internal else "PUBLIC CHAT"
-                if event.author == self:
-                    string = f"\n[{chat_type}][Myself]: {event.content}"
+                if event.author.name == self.name:
+                    log += f"\n[{chat_type}][Myself]: {event.content}"
                 else:
-                    string = f"\n[{chat_type}][{event.author}]: {event.content}"
+                    log += f"\n[{chat_type}][{event.author}]: {event.content}"
 
             else:
-                string = f"\n[EVENT]: {event.description()}"
-
-            logs[log] += string
+                log += f"\n[EVENT]: {event.description()}"
 
         if events:
             self.last_logged_message_dt = events[-1].time
 
         event_log = ""
-        if logs["new"]:
-            event_log += f"\n## GAME EVENTS SINCE LAST TURN:\n{logs['new']}\n"
+        if log:
+            event_log += f"\n## GAME EVENTS SINCE LAST TURN:\n{log}\n"
 
         return event_log
 
@@ -60,13 +152,14 @@ class TerminalPlayer(Player):
             title_message=f"{self.name} - Nominate a chancellor:",
             input_message="Which player?",
             choices=players,
+            timeout=self.turn_timeout,
         )
 
         chosen_player = players[choice_idx]
-        game_state.event_history.add(
+        game_state.record(
             Event(event_type=EventType.chancellor_nominated, actor=self, recipient=chosen_player)
         )
-        game_state.public_chat.add(
+        game_state.record(
             Message(author=self, content=f"I've nominated {chosen_player.name} as chancellor")
         )
 
@@ -75,24 +168,31 @@ class TerminalPlayer(Player):
     def vote_on_government(
         self, game_state: "GameState", president: Player, chancellor: Player
     ) -> bool:
-        while True:
-            vote = input(
-                f"f\n{self.name} - Vote on government (president: {president.name}, chancellor: {chancellor.name}) [y/n]? "
-            ).lower()
-            if vote in ["y", "n"]:
-                vote_result = vote == "y"
-                game_state.event_history.add(
-                    Event(event_type=VOTE_MAPPING[vote_result], actor=self)
+        with input_lock:
+            deadline = make_deadline(self.turn_timeout)
+            while True:
+                vote = read_input(
+                    f"f\n{self.name} - Vote on government (president: {president.name}, chancellor: {chancellor.name}) [y/n]? ",
+                    deadline,
                 )
-                return vote_result
+                if vote is None:
+                    vote = "y" if self.default_vote else "n"
+                    print(f"Out of time, voting '{vote}'")
+
+                vote = vote.lower()
+                if vote in ["y", "n"]:
+                    vote_result = vote == "y"
+                    game_state.record(Event(event_type=VOTE_MAPPING[vote_result], actor=self))
+                    return vote_result
 
-            print("Please enter 'y' or 'n'")
+                print("Please enter 'y' or 'n'")
 
     def propose_policies(self, game_state: "GameState", policy_cards: List[Policy]) -> Selection:
         choice_idx = get_choice_idx(
             title_message=f"{self.name} - Choose policies to discard (you must discard one):",
             input_message="Which policy to discard (1-3)?",
             choices=policy_cards,
+            timeout=self.turn_timeout,
         )
 
         discarded = [policy_cards.pop(choice_idx)]
@@ -103,9 +203,10 @@ class TerminalPlayer(Player):
             title_message=f"{self.name} - Choose a policy to enact:",
             input_message="Which policy to discard (1-2)?",
             choices=policy_cards,
+            timeout=self.turn_timeout,
         )
         selected = [policy_cards.pop(choice_idx)]
-        game_state.event_history.add(Event(event_type=POLICY_MAPPING[selected[0]], actor=self))
+        game_state.record(Event(event_type=POLICY_MAPPING[selected[0]], actor=self))
 
         return Selection(selected=selected, discarded=policy_cards)
 
@@ -114,10 +215,11 @@ class TerminalPlayer(Player):
             title_message=f"{self.name} - Choose a player to investigate:",
             input_message="Which player?",
             choices=players,
+            timeout=self.turn_timeout,
         )
 
         player = players[choice_idx]
-        game_state.event_history.add(
+        game_state.record(
             Event(event_type=EventType.loyalty_investigated, actor=self, recipient=player)
         )
         print(f"\n{player.name} is a {player.party}")
@@ -127,25 +229,45 @@ class TerminalPlayer(Player):
             title_message=f"{self.name} - Choose a player to execute:",
             input_message="Which player?",
             choices=players,
+            timeout=self.turn_timeout,
         )
 
         player = players[choice_idx]
-        game_state.event_history.add(
-            Event(event_type=EventType.player_executed, actor=self, recipient=player)
-        )
+        game_state.record(Event(event_type=EventType.player_executed, actor=self, recipient=player))
         print(f"\n{player.name} has been executed")
         return player
 
+    def action_special_election(self, game_state: "GameState", players: List[Player]) -> Player:
+        choice_idx = get_choice_idx(
+            title_message=f"{self.name} - Choose the next President:",
+            input_message="Which player?",
+            choices=players,
+            timeout=self.turn_timeout,
+        )
+
+        player = players[choice_idx]
+        game_state.record(
+            Event(event_type=EventType.special_election, actor=self, recipient=player)
+        )
+        print(f"\n{player.name} will be the next President")
+        return player
+
     def action_policy_peek(self, game_state: "GameState", policy_cards: List[Policy]) -> None:
         print("\nThe next 3 policies are:")
         for idx, card in enumerate(policy_cards[-3:], start=1):
             print(f"{idx} - {card}")
 
-        game_state.event_history.add(Event(event_type=EventType.policy_peek, actor=self))
+        game_state.record(Event(event_type=EventType.policy_peek, actor=self))
 
     def discuss(self, game_state: "GameState", prompt: str) -> None:
         chat = self.build_latest_chat(game_state)
         chat += f"\{prompt}"
-        print(chat)
-        response = input("What would you like to say? ")
-        game_state.public_chat.add(Message(author=self, content=response))
+        with input_lock:
+            print(chat)
+            response = read_input("What would you like to say? ", make_deadline(self.turn_timeout))
+
+        # Staying silent is the default when the turn times out:
+        if response is None:
+            return
+
+        game_state.record(Message(author=self, content=response))
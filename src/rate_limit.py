@@ -0,0 +1,170 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from enum import IntEnum
+from multiprocessing.managers import BaseManager
+from typing import Deque, Dict, List, Tuple
+
+from pydantic import BaseModel, Field
+
+SECONDS_PER_MINUTE = 60.0
+WAIT_SAMPLE_SIZE = 1000
+
+COORDINATOR_ADDRESS = ("127.0.0.1", 50515)
+COORDINATOR_AUTHKEY = b"secret-hitler"
+
+
+class Priority(IntEnum):
+    # Lower values are served first:
+    interactive = 0
+    background = 1
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, period: float = SECONDS_PER_MINUTE) -> None:
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self.refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        # The level may go negative when usage is reconciled after a call:
+        self.level -= amount
+
+
+class LimiterMetrics(BaseModel):
+    queue_depth: int = 0
+    queue_depth_by_priority: Dict[str, int] = Field(default_factory=dict)
+    granted: int = 0
+    granted_by_priority: Dict[str, int] = Field(default_factory=dict)
+    mean_wait: float = 0.0
+    p95_wait: float = 0.0
+    max_wait: float = 0.0
+    mean_wait_by_priority: Dict[str, float] = Field(default_factory=dict)
+
+
+class RateLimiter:
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.condition = threading.Condition()
+        self.queue: List[Tuple[int, int]] = []
+        self.counter = itertools.count()
+
+        self.granted = {priority: 0 for priority in Priority}
+        self.total_wait = {priority: 0.0 for priority in Priority}
+        self.max_wait = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def acquire(self, tokens: int = 0, priority: Priority = Priority.background) -> float:
+        priority = Priority(priority)
+        ticket = (int(priority), next(self.counter))
+        started = time.monotonic()
+
+        with self.condition:
+            heapq.heappush(self.queue, ticket)
+            while True:
+                if self.queue[0] != ticket:
+                    self.condition.wait()
+                    continue
+
+                now = time.monotonic()
+                wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+                if wait > 0:
+                    self.condition.wait(timeout=wait)
+                    continue
+
+                self.requests.consume(1)
+                self.tokens.consume(min(tokens, self.tokens.capacity))
+                heapq.heappop(self.queue)
+                self.condition.notify_all()
+                break
+
+            waited = time.monotonic() - started
+            self.granted[priority] += 1
+            self.total_wait[priority] += waited
+            self.max_wait = max(self.max_wait, waited)
+            self.recent_waits.append(waited)
+
+        return waited
+
+    def record_usage(self, tokens: int) -> None:
+        # Charge (or refund) the difference between estimated and actual token usage:
+        with self.condition:
+            self.tokens.refill(time.monotonic())
+            self.tokens.consume(tokens)
+            self.tokens.level = min(self.tokens.level, self.tokens.capacity)
+            self.condition.notify_all()
+
+    def queue_depth(self) -> int:
+        with self.condition:
+            return len(self.queue)
+
+    def metrics(self) -> LimiterMetrics:
+        with self.condition:
+            depth_by_priority = {priority.name: 0 for priority in Priority}
+            for priority, _ in self.queue:
+                depth_by_priority[Priority(priority).name] += 1
+
+            granted = sum(self.granted.values())
+            waits = sorted(self.recent_waits)
+            return LimiterMetrics(
+                queue_depth=len(self.queue),
+                queue_depth_by_priority=depth_by_priority,
+                granted=granted,
+                granted_by_priority={p.name: count for p, count in self.granted.items()},
+                mean_wait=sum(self.total_wait.values()) / granted if granted else 0.0,
+                p95_wait=waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                max_wait=self.max_wait,
+                mean_wait_by_priority={
+                    p.name: self.total_wait[p] / count if count else 0.0
+                    for p, count in self.granted.items()
+                },
+            )
+
+
+class _CoordinatorServer(BaseManager):
+    pass
+
+
+class _CoordinatorClient(BaseManager):
+    pass
+
+
+_CoordinatorClient.register("get_limiter")
+
+
+def serve_rate_limiter(
+    limiter: RateLimiter,
+    address: Tuple[str, int] = COORDINATOR_ADDRESS,
+    authkey: bytes = COORDINATOR_AUTHKEY,
+) -> Tuple[str, int]:
+    # Host the limiter for worker processes on a background thread of this process:
+    _CoordinatorServer.register("get_limiter", callable=lambda: limiter)
+    server = _CoordinatorServer(address=address, authkey=authkey).get_server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    return server.address
+
+
+def connect_rate_limiter(
+    address: Tuple[str, int] = COORDINATOR_ADDRESS, authkey: bytes = COORDINATOR_AUTHKEY
+) -> RateLimiter:
+    manager = _CoordinatorClient(address=address, authkey=authkey)
+    manager.connect()
+    return manager.get_limiter()
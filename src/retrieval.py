@@ -0,0 +1,193 @@
+import datetime as dt
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, List, Set
+
+import numpy as np
+from pydantic import BaseModel
+
+EMBEDDING_DIM = 256
+MAX_MEMORIES = 5000
+LEXICAL_WEIGHT = 0.6
+CURRENT_GAME_BOOST = 0.1
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "i", "in", "is", "it", "of",
+    "on", "or", "that", "the", "this", "to", "was", "we", "with", "you",
+}  # fmt: skip
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def embed(tokens: List[str]) -> np.ndarray:
+    # Hashed bag of words and bigrams, crc32 keeps it stable across processes for persistence:
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        code = zlib.crc32(feature.encode())
+        vector[code % EMBEDDING_DIM] += 1.0 if code & 0x80000000 else -1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class Memory(BaseModel):
+    time: dt.datetime
+    text: str
+    session: int
+
+
+class MemoryIndex:
+    # One player's memories, searchable by BM25 over tokens and by cosine over hashed embeddings.
+    def __init__(self) -> None:
+        self.memories: List[Memory] = []
+        self.tokens: List[Counter] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        self.total_length = 0
+        self.vectors = np.zeros((64, EMBEDDING_DIM), dtype=np.float32)
+        self.session = 0
+
+    def __len__(self) -> int:
+        return len(self.memories)
+
+    def start_session(self) -> None:
+        self.session += 1
+
+    def add(self, text: str, time: dt.datetime) -> int:
+        idx = len(self.memories)
+        tokens = tokenize(text)
+        self.memories.append(Memory(time=time, text=text, session=self.session))
+        self.tokens.append(Counter(tokens))
+        self.lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        for token in set(tokens):
+            self.postings[token].add(idx)
+
+        # Grow the embedding matrix geometrically rather than per memory:
+        if idx == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+        self.vectors[idx] = embed(tokens)
+
+        return idx
+
+    def lexical_scores(self, query: List[str]) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        average_length = self.total_length / len(self) if self.memories else 1.0
+        for token in set(query):
+            matches = self.postings.get(token)
+            if not matches:
+                continue
+
+            idf = math.log(1 + (len(self) - len(matches) + 0.5) / (len(matches) + 0.5))
+            for idx in matches:
+                frequency = self.tokens[idx][token]
+                length = self.lengths[idx]
+                scores[idx] += (
+                    idf
+                    * frequency
+                    * (BM25_K1 + 1)
+                    / (frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+                )
+
+        return scores
+
+    def search(self, query: str, k: int, exclude: Set[int] = frozenset()) -> List[int]:
+        if not self.memories or k <= 0:
+            return []
+
+        tokens = tokenize(query)
+        scores = np.clip(self.vectors[: len(self)] @ embed(tokens), 0, None) * (1 - LEXICAL_WEIGHT)
+        lexical = self.lexical_scores(tokens)
+        if lexical:
+            top = max(lexical.values())
+            for idx, score in lexical.items():
+                scores[idx] += LEXICAL_WEIGHT * score / top
+
+        sessions = np.fromiter((m.session for m in self.memories), dtype=np.int64)
+        scores += CURRENT_GAME_BOOST * (sessions == self.session)
+        scores[list(exclude)] = -np.inf
+
+        ranked = np.argsort(-scores)[:k]
+        return [int(idx) for idx in ranked if np.isfinite(scores[idx]) and scores[idx] > 0]
+
+    def recent(self, n: int) -> List[int]:
+        return list(range(max(len(self) - n, 0), len(self)))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MemoryIndex":
+        index = cls()
+        for memory in data["memories"]:
+            index.session = memory["session"]
+            index.add(memory["text"], dt.datetime.fromisoformat(memory["time"]))
+        index.session = data["session"]
+
+        return index
+
+
+class MemoryStore:
+    # Player memories by name, kept on disk between games when a directory is given.
+    #
+    # Each game works on its own copy, so tables sharing player names don't interleave memories,
+    # and only what was learnt during that game is merged back.
+    def __init__(self, directory: str | None = None) -> None:
+        self.directory = directory
+        self.snapshots: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    def snapshot(self, name: str) -> Dict:
+        if name not in self.snapshots:
+            self.snapshots[name] = {"session": 0, "memories": []}
+            if self.directory is not None and os.path.exists(self.path(name)):
+                with open(self.path(name)) as file:
+                    self.snapshots[name] = json.load(file)
+
+        return self.snapshots[name]
+
+    def load(self, name: str) -> MemoryIndex:
+        with self.lock:
+            index = MemoryIndex.from_dict(self.snapshot(name))
+
+        index.start_session()
+        return index
+
+    def save(self, name: str, index: MemoryIndex) -> None:
+        learnt = [m.model_dump(mode="json") for m in index.memories if m.session == index.session]
+        with self.lock:
+            snapshot = self.snapshot(name)
+            snapshot["session"] += 1
+            for memory in learnt:
+                memory["session"] = snapshot["session"]
+            snapshot["memories"] = (snapshot["memories"] + learnt)[-MAX_MEMORIES:]
+
+            if self.directory is not None:
+                with open(self.path(name), "w") as file:
+                    json.dump(snapshot, file)
+
+
+_memory_store: MemoryStore = None
+
+
+def get_memory_store() -> MemoryStore | None:
+    return _memory_store
+
+
+def set_memory_store(memory_store: MemoryStore | None) -> None:
+    global _memory_store
+    _memory_store = memory_store
@@ -0,0 +1,97 @@
+import datetime as dt
+from enum import IntEnum, StrEnum
+from typing import TYPE_CHECKING, Dict, Set
+
+from pydantic import BaseModel, Field
+
+from src.game_types import Policy
+
+if TYPE_CHECKING:
+    from src.game_state import GameState
+
+CRITICAL_FASCIST_POLICIES = 3
+ROUND_LATENCY_BUDGET = 90.0
+
+
+class DecisionType(StrEnum):
+    nominate_chancellor = "nominate_chancellor"
+    vote_on_government = "vote_on_government"
+    propose_policies = "propose_policies"
+    enact_policy = "enact_policy"
+    action_investigate_loyalty = "action_investigate_loyalty"
+    action_execution = "action_execution"
+    action_special_election = "action_special_election"
+    discuss = "discuss"
+
+
+class ModelTier(IntEnum):
+    fast = 0
+    standard = 1
+    strong = 2
+
+
+class RoutingPolicy(BaseModel):
+    model_names: Dict[ModelTier, str] = Field(
+        default_factory=lambda: {
+            ModelTier.fast: "gemini-1.5-flash-8b",
+            ModelTier.standard: "gemini-1.5-flash",
+            ModelTier.strong: "gemini-1.5-pro",
+        }
+    )
+    decision_tiers: Dict[DecisionType, ModelTier] = Field(
+        default_factory=lambda: {
+            DecisionType.discuss: ModelTier.fast,
+            DecisionType.nominate_chancellor: ModelTier.standard,
+            DecisionType.vote_on_government: ModelTier.standard,
+            DecisionType.propose_policies: ModelTier.standard,
+            DecisionType.enact_policy: ModelTier.standard,
+            DecisionType.action_investigate_loyalty: ModelTier.standard,
+            DecisionType.action_execution: ModelTier.strong,
+            DecisionType.action_special_election: ModelTier.standard,
+        }
+    )
+    # Decisions that can hand the game to Hitler once enough fascist policies are enacted:
+    critical_decisions: Set[DecisionType] = Field(
+        default_factory=lambda: {
+            DecisionType.nominate_chancellor,
+            DecisionType.vote_on_government,
+            DecisionType.propose_policies,
+            DecisionType.enact_policy,
+        }
+    )
+    critical_fascist_policies: int = Field(default=CRITICAL_FASCIST_POLICIES)
+    round_latency_budget: float | None = Field(default=ROUND_LATENCY_BUDGET)
+
+    def tier(self, decision: DecisionType, game_state: "GameState") -> ModelTier:
+        tier = self.decision_tiers[decision]
+
+        # Critical decisions are upgraded and are never downgraded for latency:
+        fascist_policies = game_state.enacted_policies[Policy.fascist]
+        if (
+            decision in self.critical_decisions
+            and fascist_policies >= self.critical_fascist_policies
+        ):
+            return ModelTier(min(tier + 1, ModelTier.strong))
+
+        if tier == ModelTier.strong or not self.round_latency_budget:
+            return tier
+
+        # Drop a tier for each latency budget the current round has overrun:
+        elapsed = (dt.datetime.now() - game_state.round_started).total_seconds()
+        overruns = int(elapsed // self.round_latency_budget)
+        return ModelTier(max(tier - overruns, ModelTier.fast))
+
+    def route(self, decision: DecisionType, game_state: "GameState") -> str:
+        return self.model_names[self.tier(decision, game_state)]
+
+
+_routing_policy = RoutingPolicy()
+
+
+def get_routing_policy() -> RoutingPolicy:
+    return _routing_policy
+
+
+def set_routing_policy(routing_policy: RoutingPolicy) -> None:
+    global _routing_policy
+    _routing_policy = routing_policy
@@ -0,0 +1,3 @@
+from src.server.app import GameServer, Table
+
+__all__ = ["GameServer", "Table"]
@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+
+from src.memory import MAX_RETAINED, RetentionPolicy
+from src.server.app import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    MAX_RUNNING_TABLES,
+    TURN_TIMEOUT,
+    GameServer,
+)
+from src.transcript import TranscriptArchive
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host many Secret Hitler tables locally.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--turn-timeout", type=float, default=TURN_TIMEOUT)
+    parser.add_argument(
+        "--max-running-tables",
+        type=int,
+        default=MAX_RUNNING_TABLES,
+        help="Games played at once, later tables are queued.",
+    )
+    parser.add_argument("--max-history", type=int, default=MAX_RETAINED)
+    parser.add_argument("--spill-dir", help="Directory for history trimmed from memory.")
+    parser.add_argument("--transcripts", help="Directory to archive game transcripts in.")
+    parser.add_argument("--thoughts", action="store_true", help="Include private thoughts.")
+    args = parser.parse_args()
+
+    server = GameServer(
+        args.host,
+        args.port,
+        max_running_tables=args.max_running_tables,
+        turn_timeout=args.turn_timeout,
+        retention=RetentionPolicy(args.max_history, args.spill_dir),
+        transcripts=(
+            TranscriptArchive(args.transcripts, thoughts=args.thoughts)
+            if args.transcripts
+            else None
+        ),
+    )
+    asyncio.run(server.serve_forever())
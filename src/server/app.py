@@ -0,0 +1,417 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.events import EventType
+from src.game import EXECUTIVE_POWERS, Game
+from src.game_state import Record, StateChange
+from src.game_types import DecisionRecord, Message, Party
+from src.history import HistoryIndex
+from src.memory import RetentionPolicy
+from src.oracle import StateKey, WinOracle, state_key
+from src.players import RemotePlayer
+from src.players.remote import RemoteChannel
+from src.server.websocket import WebSocket, WebSocketClosed, handshake_response
+from src.store import encode_record
+from src.transcript import TranscriptArchive
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_RUNNING_TABLES = 512
+TURN_TIMEOUT = 120.0
+# Exact solves past this many states fall back to rollouts, which bounds each estimate:
+ESTIMATE_MAX_STATES = 20_000
+
+HTTP_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found"}
+
+# Table sizes the rules have powers for:
+MIN_PLAYERS = min(EXECUTIVE_POWERS)
+MAX_PLAYERS = max(EXECUTIVE_POWERS)
+
+logger = logging.getLogger(__name__)
+
+
+class Table:
+    def __init__(
+        self,
+        table_id: str,
+        remote_players: List[str],
+        ai_players: List[str],
+        loop: asyncio.AbstractEventLoop,
+        turn_timeout: float,
+        oracle: WinOracle,
+        estimator: Executor,
+        retention: RetentionPolicy | None = None,
+        transcripts: TranscriptArchive | None = None,
+    ) -> None:
+        self.table_id = table_id
+        self.result: Dict[str, Any] = None
+        self.game = Game(
+            remote_players,
+            ai_players,
+            batch_ai=True,
+            async_humans=True,
+            turn_timeout=turn_timeout,
+            human_class=RemotePlayer,
+            retention=retention,
+            transcripts=transcripts,
+        )
+        # The game thread only takes the rule-level key of each state, the estimator solves it and
+        # summaries read the latest result:
+        self.oracle = oracle
+        self.estimator = estimator
+        self.pending: StateKey | None = None
+        self.lock = threading.Lock()
+        self.win_probability: Dict[Party, float] | None = None
+        self.game.state.bus.subscribe(self.state_changed)
+        self.status = "waiting"
+        self.channels = {name: RemoteChannel(loop) for name in remote_players}
+        for player in self.game.players:
+            if isinstance(player, RemotePlayer):
+                player.connect(self.channels[player.name])
+
+    def state_changed(self, item: Record) -> None:
+        if not isinstance(item, StateChange):
+            return
+
+        with self.lock:
+            if item.winner is not None:
+                self.pending = None
+                self.win_probability = {party: float(party == item.winner) for party in Party}
+                return
+
+            key = self.pending = state_key(self.game.state, list(self.game.policy_deck))
+        self.estimator.submit(self.estimate, key)
+
+    def estimate(self, key: StateKey) -> None:
+        # Keys superseded while queued or solving are dropped, only the latest state is reported:
+        if key is not self.pending:
+            return
+
+        liberal = self.oracle.win_probability(key)
+        with self.lock:
+            if key is self.pending:
+                self.win_probability = {Party.liberal: liberal, Party.fascist: 1 - liberal}
+
+    def play(self) -> Tuple[Party, str]:
+        # Runs on a worker, so the status only says running once the game really is:
+        self.status = "running"
+        return self.game.play_game()
+
+    def ready(self) -> bool:
+        return all(channel.connected for channel in self.channels.values())
+
+    def close(self) -> None:
+        # Finished tables keep only their summary, so a long-running host doesn't hold old games:
+        self.result = self.summary()
+        self.game = None
+
+    def summary(self) -> Dict[str, Any]:
+        if self.game is None:
+            return {**self.result, "status": self.status}
+
+        state = self.game.state
+        winner = None
+        if self.game.winner is not None:
+            party, reason = self.game.winner
+            winner = {"party": party, "reason": reason}
+
+        return {
+            "id": self.table_id,
+            "status": self.status,
+            "players": [p.name for p in self.game.players],
+            "remote_players": list(self.channels),
+            "connected": [name for name, c in self.channels.items() if c.connected],
+            "round": state.round_num,
+            "enacted_policies": state.enacted_policies,
+            "win_probability": self.win_probability,
+            "winner": winner,
+        }
+
+
+class GameServer:
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_running_tables: int = MAX_RUNNING_TABLES,
+        turn_timeout: float = TURN_TIMEOUT,
+        retention: RetentionPolicy | None = None,
+        transcripts: TranscriptArchive | None = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.turn_timeout = turn_timeout
+        self.retention = retention
+        self.transcripts = transcripts
+        self.tables: Dict[str, Table] = {}
+        self.table_ids = itertools.count(1)
+        # Game rules are synchronous, each running table waits on humans or LLMs in a worker and
+        # the event loop only serves connections. Tables past the pool size wait as "queued":
+        self.executor = ThreadPoolExecutor(max_workers=max_running_tables)
+        # Win probabilities are solved off both the event loop and the game threads:
+        self.oracle = WinOracle(max_states=ESTIMATE_MAX_STATES)
+        self.estimator = ThreadPoolExecutor(max_workers=1)
+        self.server: asyncio.Server = None
+
+    async def start(self) -> Tuple[str, int]:
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        if self.server is None:
+            await self.start()
+
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.estimator.shutdown(wait=False, cancel_futures=True)
+
+    def create_table(self, remote_players: List[str], ai_players: List[str]) -> Table:
+        names = remote_players + ai_players
+        if not all(isinstance(name, str) and name for name in names):
+            raise ValueError("Player names must be non-empty strings.")
+        if not MIN_PLAYERS <= len(names) <= MAX_PLAYERS:
+            raise ValueError(f"Tables need between {MIN_PLAYERS} and {MAX_PLAYERS} players.")
+        if len(set(names)) != len(names):
+            raise ValueError("All player names must be unique.")
+
+        table_id = str(next(self.table_ids))
+        table = Table(
+            table_id,
+            remote_players,
+            ai_players,
+            asyncio.get_running_loop(),
+            self.turn_timeout,
+            self.oracle,
+            self.estimator,
+            self.retention,
+            self.transcripts,
+        )
+        self.tables[table_id] = table
+        if table.ready():
+            self.start_table(table)
+
+        return table
+
+    def start_table(self, table: Table) -> None:
+        table.status = "queued"
+        future = asyncio.get_running_loop().run_in_executor(self.executor, table.play)
+        future.add_done_callback(lambda f: self.finish_table(table, f))
+
+    def finish_table(self, table: Table, future: Future) -> None:
+        if error := future.exception():
+            logger.error("Table %s failed", table.table_id, exc_info=error)
+        table.status = "failed" if error else "finished"
+        table.close()
+        summary = table.summary()
+        for channel in table.channels.values():
+            channel.notify({"type": "game_over", "winner": summary["winner"]})
+
+    def route(
+        self, method: str, path: List[str], body: bytes, query: Dict[str, List[str]] = None
+    ) -> Tuple[int, Any]:
+        if path == ["tables"] and method == "GET":
+            return 200, [table.summary() for table in self.tables.values()]
+
+        if path == ["tables"] and method == "POST":
+            try:
+                request = json.loads(body or b"{}")
+                table = self.create_table(request.get("players", []), request.get("ai", []))
+            except (ValueError, AttributeError, TypeError) as e:
+                return 400, {"error": str(e)}
+            return 201, table.summary()
+
+        if len(path) == 2 and path[0] == "tables" and method == "GET":
+            if table := self.tables.get(path[1]):
+                return 200, table.summary()
+
+        if len(path) == 3 and path[0] == "tables" and method == "GET":
+            table = self.tables.get(path[1])
+            if table is not None and table.game is not None:
+                return self.query_history(table.game.state.history, path[2], query or {})
+
+        return 404, {"error": "Not found"}
+
+    def query_history(
+        self, history: HistoryIndex, view: str, query: Dict[str, List[str]]
+    ) -> Tuple[int, Any]:
+        params = {key: values[0] for key, values in query.items()}
+        if view == "governments":
+            governments = history.governments
+            if "player" in params:
+                governments = history.governments_with(params["player"])
+            elif "policy" in params:
+                governments = history.enacted(params["policy"])
+            return 200, [g.model_dump(mode="json") for g in governments]
+
+        if view == "events":
+            try:
+                round_num = int(params["round"]) if "round" in params else None
+                event_type = EventType[params["type"]] if "type" in params else None
+            except (KeyError, ValueError) as e:
+                return 400, {"error": f"Bad query: {e}"}
+
+            events = history.events(
+                actor=params.get("actor"),
+                recipient=params.get("recipient"),
+                event_type=event_type,
+                round_num=round_num,
+            )
+            return 200, [encode_record(event)[1] for event in events]
+
+        return 404, {"error": "Not found"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+
+        try:
+            request_line, *header_lines = head.decode().strip().split("\r\n")
+            method, target, _ = request_line.split(" ", 2)
+            headers = {}
+            for line in header_lines:
+                key, _, value = line.partition(":")
+                headers[key.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if length < 0:
+                raise ValueError(f"Negative content length {length}")
+        except ValueError as e:
+            await self.respond(writer, 400, {"error": f"Bad request: {e}"})
+            return
+
+        url = urlsplit(target)
+        path = [part for part in url.path.split("/") if part]
+        if headers.get("upgrade", "").lower() == "websocket":
+            await self.handle_websocket(reader, writer, path, parse_qs(url.query), headers)
+            return
+
+        try:
+            body = await reader.readexactly(length)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        status, data = self.route(method, path, body, parse_qs(url.query))
+        await self.respond(writer, status, data)
+
+    async def respond(self, writer: asyncio.StreamWriter, status: int, data: Any) -> None:
+        body = json.dumps(data).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        writer.close()
+
+    async def handle_websocket(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        path: List[str],
+        query: Dict[str, List[str]],
+        headers: Dict[str, str],
+    ) -> None:
+        key = headers.get("sec-websocket-key")
+        if not key:
+            await self.respond(writer, 400, {"error": "Missing Sec-WebSocket-Key"})
+            return
+
+        table = self.tables.get(path[1]) if len(path) == 3 and path[0] == "tables" else None
+        if table is not None and table.game is None:
+            table = None
+        if table is not None and path[2] == "spectate":
+            writer.write(handshake_response(key))
+            await self.spectate(WebSocket(reader, writer), table)
+            return
+
+        name = query.get("name", [None])[0]
+        channel = table.channels.get(name) if table and path[2] == "ws" else None
+        if channel is None or channel.connected:
+            await self.respond(writer, 404, {"error": "No open seat"})
+            return
+
+        writer.write(handshake_response(key))
+        socket = WebSocket(reader, writer)
+        channel.attach(socket.send)
+
+        player = next(p for p in table.game.players if p.name == name)
+        await socket.send(
+            json.dumps(
+                {
+                    "type": "welcome",
+                    "table": table.table_id,
+                    "name": player.name,
+                    "role": player.role,
+                    "allies": [p.name for p in player.known_allies(table.game.players)],
+                    "players": [p.name for p in table.game.players],
+                }
+            )
+        )
+        if table.status == "waiting" and table.ready():
+            self.start_table(table)
+
+        try:
+            while True:
+                channel.receive(await socket.recv())
+        except WebSocketClosed:
+            pass
+        finally:
+            channel.detach()
+
+    async def spectate(self, socket: WebSocket, table: Table) -> None:
+        bus = table.game.state.bus
+        subscription = bus.subscribe_asyncio(asyncio.get_running_loop())
+        closed = asyncio.ensure_future(self.drain(socket))
+        try:
+            # Late joiners catch up from the public timeline, skipping it when it reaches the queue:
+            backlog = list(table.game.state.history.timeline)
+            sent = {id(item) for item in backlog}
+            for item in backlog:
+                kind, data = encode_record(item)
+                await socket.send(json.dumps({"kind": kind, **data}))
+
+            while True:
+                getter = asyncio.ensure_future(subscription.queue.get())
+                await asyncio.wait({getter, closed}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    break
+
+                item = getter.result()
+                # Spectators only ever see public information:
+                if isinstance(item, DecisionRecord) or (
+                    isinstance(item, Message) and item.internal
+                ):
+                    continue
+                if id(item) in sent:
+                    sent.discard(id(item))
+                    continue
+
+                kind, data = encode_record(item)
+                await socket.send(json.dumps({"kind": kind, **data}))
+        except WebSocketClosed:
+            pass
+        finally:
+            bus.unsubscribe(subscription)
+            closed.cancel()
+
+    async def drain(self, socket: WebSocket) -> None:
+        try:
+            while True:
+                await socket.recv()
+        except WebSocketClosed:
+            return
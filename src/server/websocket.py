@@ -0,0 +1,147 @@
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+from typing import List
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OPCODE_CONTINUATION = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+class WebSocketClosed(ConnectionError):
+    pass
+
+
+def accept_key(key: str) -> str:
+    digest = hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()
+    return base64.b64encode(digest).decode()
+
+
+def handshake_response(key: str) -> bytes:
+    return (
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept_key(key)}\r\n\r\n"
+    ).encode()
+
+
+def apply_mask(payload: bytes, mask: bytes) -> bytes:
+    repeated = (mask * (len(payload) // 4 + 1))[: len(payload)]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(
+        len(payload), "big"
+    )
+
+
+def encode_frame(payload: bytes, opcode: int = OPCODE_TEXT, mask: bool = False) -> bytes:
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0x00
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 2**16:
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+
+    # Clients must mask every frame they send:
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = apply_mask(payload, key)
+
+    return bytes(header) + payload
+
+
+class WebSocket:
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, mask: bool = False
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.mask = mask
+        self.closed = False
+
+    async def send(self, text: str) -> None:
+        if self.closed:
+            raise WebSocketClosed()
+
+        self.writer.write(encode_frame(text.encode(), OPCODE_TEXT, self.mask))
+        await self.writer.drain()
+
+    async def recv(self) -> str:
+        fragments: List[bytes] = []
+        try:
+            while True:
+                head = await self.reader.readexactly(2)
+                fin = head[0] & 0x80
+                opcode = head[0] & 0x0F
+                length = head[1] & 0x7F
+                if length == 126:
+                    (length,) = struct.unpack("!H", await self.reader.readexactly(2))
+                elif length == 127:
+                    (length,) = struct.unpack("!Q", await self.reader.readexactly(8))
+
+                key = await self.reader.readexactly(4) if head[1] & 0x80 else None
+                payload = await self.reader.readexactly(length)
+                if key is not None:
+                    payload = apply_mask(payload, key)
+
+                if opcode == OPCODE_CLOSE:
+                    await self.close()
+                    raise WebSocketClosed()
+                if opcode == OPCODE_PING:
+                    self.writer.write(encode_frame(payload, OPCODE_PONG, self.mask))
+                    continue
+                if opcode == OPCODE_PONG:
+                    continue
+
+                fragments.append(payload)
+                if fin:
+                    return b"".join(fragments).decode()
+        except (asyncio.IncompleteReadError, ConnectionResetError) as e:
+            self.closed = True
+            raise WebSocketClosed() from e
+
+    async def close(self) -> None:
+        if self.closed:
+            return
+
+        self.closed = True
+        try:
+            self.writer.write(encode_frame(b"", OPCODE_CLOSE, self.mask))
+            await self.writer.drain()
+            self.writer.close()
+        except ConnectionError:
+            pass
+
+
+async def connect(host: str, port: int, path: str) -> WebSocket:
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode()
+    writer.write(
+        (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        ).encode()
+    )
+    await writer.drain()
+
+    response = await reader.readuntil(b"\r\n\r\n")
+    if b" 101 " not in response.split(b"\r\n", 1)[0]:
+        writer.close()
+        raise WebSocketClosed(response.split(b"\r\n", 1)[0].decode())
+
+    return WebSocket(reader, writer, mask=True)
@@ -0,0 +1,65 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Hashable, Tuple
+
+from src.llm import LLMRequest
+from src.metrics import get_metrics
+from src.players.gemini import call_backend
+from src.rate_limit import Priority
+
+SPECULATIVE_WORKERS = 10
+
+
+class Speculator:
+    # Starts AI decisions before they are asked for, keyed on the state the decision depends on.
+    #
+    # A result is only handed back when the key it was started with still matches, everything else
+    # is discarded and counted, so the hit rate can be weighed against the wasted calls.
+    def __init__(self, max_workers: int = SPECULATIVE_WORKERS) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.pending: Dict[str, Dict[str, Tuple[Hashable, Future]]] = {}
+        self.counts = {"calls": 0, "hits": 0, "wasted": 0, "cancelled": 0}
+
+    def count(self, outcome: str, decision: str) -> None:
+        self.counts[outcome] += 1
+        get_metrics().inc(f"speculative_{outcome}_total", decision=decision)
+
+    def start(self, decision: str, name: str, key: Hashable, request: LLMRequest) -> None:
+        # Speculative calls should never hold up one somebody is waiting on:
+        request.priority = Priority.background
+
+        pending = self.pending.setdefault(decision, {})
+        if name in pending:
+            self.discard(decision, pending.pop(name)[1])
+
+        pending[name] = (key, self.executor.submit(call_backend, request))
+        self.count("calls", decision)
+
+    def collect(self, decision: str, keys: Dict[str, Hashable]) -> Dict[str, Future]:
+        hits = {}
+        for name, (key, future) in self.pending.pop(decision, {}).items():
+            if name in keys and keys[name] == key:
+                hits[name] = future
+                self.count("hits", decision)
+            else:
+                self.discard(decision, future)
+
+        return hits
+
+    def discard(self, decision: str, future: Future) -> None:
+        # Calls that never left the queue cost nothing:
+        if future.cancel():
+            self.count("cancelled", decision)
+        else:
+            self.count("wasted", decision)
+
+    def report(self) -> Dict[str, float]:
+        report = dict(self.counts)
+        report["hit_rate"] = (
+            self.counts["hits"] / self.counts["calls"] if self.counts["calls"] else 0.0
+        )
+        return report
+
+    def close(self) -> None:
+        for decision in list(self.pending):
+            self.collect(decision, {})
+        self.executor.shutdown(wait=True, cancel_futures=True)
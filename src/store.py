@@ -0,0 +1,258 @@
+import datetime as dt
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Tuple
+
+from src.events import Event, EventType
+from src.game_state import GameState, Record, StateChange
+from src.game_types import DecisionRecord, Message, Role
+from src.players import Player
+from src.players import players as player_classes
+
+BATCH_SIZE = 1000
+FLUSH_INTERVAL = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (game_id, seq)
+)
+"""
+
+PLAYER_CLASSES = {player_class.__name__: player_class for player_class in player_classes}
+
+_CLOSE = object()
+
+logger = logging.getLogger(__name__)
+
+
+def encode_record(item: Record | Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    if isinstance(item, dict):
+        return "game_started", item
+
+    if isinstance(item, Event):
+        return "event", {
+            "time": item.time.isoformat(),
+            "event_type": EventType(item.event_type).name,
+            "actor": item.actor.name if item.actor else None,
+            "recipient": item.recipient.name if item.recipient else None,
+        }
+
+    if isinstance(item, Message):
+        return "message", {
+            "time": item.time.isoformat(),
+            "author": item.author.name,
+            "internal": item.internal,
+            "content": item.content,
+        }
+
+    if isinstance(item, DecisionRecord):
+        return "decision", item.model_dump(mode="json")
+
+    return "state", item.model_dump(mode="json")
+
+
+def game_started(game_state: GameState) -> Dict[str, Any]:
+    return {
+        "players": [
+            {
+                "name": p.name,
+                "party": p.party,
+                "role": p.role,
+                "type": type(p).__name__,
+            }
+            for p in game_state.players
+        ],
+        "failed_elections": game_state.failed_elections,
+    }
+
+
+class EventStore:
+    # Append-only SQLite log, written in group commits by a single background thread.
+    def __init__(
+        self, path: str, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self.sequences: Dict[str, int] = defaultdict(int)
+        self.errors = 0
+        self.last_error: Exception | None = None
+        self.startup_error: Exception | None = None
+        self.ready = threading.Event()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+        self.ready.wait()
+        if self.startup_error is not None:
+            raise self.startup_error
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(SCHEMA)
+        # Games already in the file carry on from their last sequence number:
+        rows = connection.execute("SELECT game_id, MAX(seq) FROM log GROUP BY game_id")
+        self.sequences.update(dict(rows))
+        return connection
+
+    def attach(self, game_id: str, game_state: GameState) -> None:
+        self.append(game_id, game_started(game_state))
+        game_state.bus.subscribe(lambda item: self.append(game_id, item))
+
+    def append(self, game_id: str, item: Record | Dict[str, Any]) -> None:
+        # Serialisation happens on the writer thread, the game thread only enqueues:
+        self.queue.put((game_id, item))
+
+    def write_loop(self) -> None:
+        try:
+            connection = self.connect()
+        except Exception as error:
+            self.startup_error = error
+            self.ready.set()
+            return
+        self.ready.set()
+
+        closing = False
+        while not closing:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = []
+            flushed = []
+            for entry in batch:
+                if entry is _CLOSE:
+                    closing = True
+                elif isinstance(entry, threading.Event):
+                    flushed.append(entry)
+                else:
+                    entries.append(entry)
+
+            # A failed batch is dropped and reported, the writer keeps going for later ones:
+            try:
+                self.write_batch(connection, entries)
+            except Exception as error:
+                self.last_error = error
+                self.errors += 1
+                logger.exception("Dropped %d event store records", len(entries))
+
+            for marker in flushed:
+                marker.set()
+
+        connection.close()
+
+    def write_batch(self, connection: sqlite3.Connection, entries: List[Tuple[str, Any]]) -> None:
+        rows = []
+        sequences = dict(self.sequences)
+        for game_id, item in entries:
+            kind, data = encode_record(item)
+            sequences[game_id] = sequences.get(game_id, 0) + 1
+            rows.append((game_id, sequences[game_id], kind, json.dumps(data)))
+
+        with connection:
+            connection.executemany("INSERT INTO log VALUES (?, ?, ?, ?)", rows)
+        self.sequences.update(sequences)
+
+    def flush(self) -> None:
+        # Block until everything enqueued so far has been committed, failing if it can't be:
+        errors = self.errors
+        marker = threading.Event()
+        self.queue.put(marker)
+        while not marker.wait(timeout=self.flush_interval):
+            if not self.writer.is_alive():
+                raise RuntimeError("The event store writer has stopped")
+
+        if self.errors > errors:
+            raise RuntimeError("Event store records could not be written") from self.last_error
+
+    def close(self) -> None:
+        self.queue.put(_CLOSE)
+        self.writer.join()
+
+    def games(self) -> List[str]:
+        with sqlite3.connect(self.path) as connection:
+            rows = connection.execute("SELECT DISTINCT game_id FROM log ORDER BY game_id")
+            return [row[0] for row in rows]
+
+    def load(self, game_id: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        with sqlite3.connect(self.path) as connection:
+            rows = connection.execute(
+                "SELECT kind, data FROM log WHERE game_id = ? ORDER BY seq", (game_id,)
+            ).fetchall()
+
+        for kind, data in rows:
+            yield kind, json.loads(data)
+
+
+def apply_state(game_state: GameState, change: StateChange, players: Dict[str, Player]) -> None:
+    game_state.round_num = change.round_num
+    game_state.president = players.get(change.president)
+    game_state.chancellor = players.get(change.chancellor)
+    game_state.previous_president = players.get(change.previous_president)
+    game_state.previous_chancellor = players.get(change.previous_chancellor)
+    game_state.failed_elections = change.failed_elections
+    game_state.enacted_policies.update(change.enacted_policies)
+    game_state.winner = change.winner
+    game_state.win_reason = change.win_reason
+    for name, player in players.items():
+        player.alive = name not in change.dead
+
+
+def replay(store: EventStore, game_id: str) -> GameState:
+    game_state = GameState()
+    players: Dict[str, Player] = {}
+    for kind, data in store.load(game_id):
+        if kind == "game_started":
+            for info in data["players"]:
+                player_class = PLAYER_CLASSES[info["type"]]
+                player = player_class(name=info["name"], party=info["party"], role=info["role"])
+                players[player.name] = player
+            game_state.players = list(players.values())
+            game_state.hitler = next(p for p in game_state.players if p.role == Role.hitler)
+            game_state.failed_elections = data["failed_elections"]
+
+        elif kind == "event":
+            fields = {
+                "time": dt.datetime.fromisoformat(data["time"]),
+                "event_type": EventType[data["event_type"]],
+                "actor": players[data["actor"]],
+            }
+            if data["recipient"] is not None:
+                fields["recipient"] = players[data["recipient"]]
+            event = Event(**fields)
+            game_state.event_history.add(event)
+            game_state.history.add(event, game_state.round_num)
+
+        elif kind == "message":
+            message = Message(
+                time=dt.datetime.fromisoformat(data["time"]),
+                author=players[data["author"]],
+                internal=data["internal"],
+                content=data["content"],
+            )
+            if message.internal:
+                message.author.thoughts.add(message)
+            else:
+                game_state.public_chat.add(message)
+                game_state.history.add(message, game_state.round_num)
+
+        elif kind == "state":
+            apply_state(game_state, StateChange(**data), players)
+
+    return game_state
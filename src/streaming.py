@@ -0,0 +1,125 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    from src.players import Player
+
+JSON_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+HIGH_SURROGATES = range(0xD800, 0xDC00)
+LOW_SURROGATES = range(0xDC00, 0xE000)
+
+
+class ChatStreamListener(ABC):
+    @abstractmethod
+    def start(self, author: "Player") -> None:
+        pass
+
+    @abstractmethod
+    def chunk(self, author: "Player", text: str) -> None:
+        pass
+
+    @abstractmethod
+    def end(self, author: "Player") -> None:
+        pass
+
+
+class JsonFieldStream:
+    # Incrementally extracts one top-level string field from a streamed JSON object.
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.depth = 0
+        self.expect_key = False
+        self.in_string = False
+        self.escape = False
+        self.unicode: str = None
+        # Characters outside the BMP arrive as two escapes, the first is held until its pair:
+        self.high_surrogate: int = None
+        self.string: List[str] = []
+        self.last_key: str = None
+        self.capturing = False
+        self.done = False
+
+    def emit(self, char: str, output: List[str]) -> None:
+        self.flush_surrogate(output)
+        if self.capturing:
+            output.append(char)
+        else:
+            self.string.append(char)
+
+    def flush_surrogate(self, output: List[str]) -> None:
+        # Unpaired surrogates can't be printed or encoded, so they become replacement characters:
+        if self.high_surrogate is not None:
+            self.high_surrogate = None
+            self.emit("\ufffd", output)
+
+    def emit_code_point(self, code: int, output: List[str]) -> None:
+        if code in LOW_SURROGATES and self.high_surrogate is not None:
+            high, self.high_surrogate = self.high_surrogate, None
+            self.emit(chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)), output)
+        elif code in HIGH_SURROGATES:
+            self.flush_surrogate(output)
+            self.high_surrogate = code
+        elif code in LOW_SURROGATES:
+            self.emit("\ufffd", output)
+        else:
+            self.emit(chr(code), output)
+
+    def feed(self, chunk: str) -> str:
+        output = []
+        for char in chunk:
+            if self.in_string:
+                if self.unicode is not None:
+                    self.unicode += char
+                    if len(self.unicode) == 4:
+                        self.emit_code_point(int(self.unicode, 16), output)
+                        self.unicode = None
+                elif self.escape:
+                    self.escape = False
+                    if char == "u":
+                        self.unicode = ""
+                    else:
+                        self.emit(JSON_ESCAPES.get(char, char), output)
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.flush_surrogate(output)
+                    self.end_string()
+                else:
+                    self.emit(char, output)
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self.string = []
+                is_value = self.depth == 1 and not self.expect_key
+                if is_value and self.last_key == self.key and not self.done:
+                    self.capturing = True
+            elif char in "{[":
+                self.depth += 1
+                self.expect_key = char == "{" and self.depth == 1
+            elif char in "}]":
+                self.depth -= 1
+            elif char == "," and self.depth == 1:
+                self.expect_key = True
+            elif char == ":" and self.depth == 1:
+                self.expect_key = False
+
+        return "".join(output)
+
+    def end_string(self) -> None:
+        self.in_string = False
+        if self.capturing:
+            self.capturing = False
+            self.done = True
+        elif self.depth == 1 and self.expect_key:
+            self.last_key = "".join(self.string)
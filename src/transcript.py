@@ -0,0 +1,296 @@
+import argparse
+import bisect
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List
+
+from pydantic import BaseModel
+
+from src.event_bus import Subscription
+from src.events import EventType
+from src.game_state import GameState, Record, StateChange
+from src.game_types import DecisionRecord, Message, Policy
+from src.store import encode_record, game_started
+
+# zlib only looks back 32 KiB, so larger chunks barely compress better but make seeks slower:
+CHUNK_BYTES = 32 * 1024
+COMPRESSION_LEVEL = 9
+SUFFIX = ".transcript"
+
+MAGIC = b"SHTX\x01"
+END_MAGIC = b"SHTXEND\x01"
+# Compressed length, raw length, first round, last round and record count:
+FRAME = struct.Struct(">IIIII")
+LENGTH = struct.Struct(">I")
+TRAILER = struct.Struct(">Q8s")
+
+
+class Chunk(BaseModel):
+    offset: int
+    length: int
+    raw_length: int
+    first_round: int
+    last_round: int
+    records: int
+
+
+class TranscriptWriter:
+    # Streams a game's public records, and optionally private thoughts, to a chunked zlib file.
+    #
+    # Each chunk is compressed on its own and framed with its round range, and the chunk index is
+    # appended on close, so readers can seek to a round without decompressing what came before it.
+    def __init__(self, path: str, thoughts: bool = False, chunk_bytes: int = CHUNK_BYTES) -> None:
+        self.path = path
+        self.thoughts = thoughts
+        self.chunk_bytes = chunk_bytes
+        self.file = open(path, "wb")
+        self.lock = threading.Lock()
+        self.chunks: List[Chunk] = []
+        self.buffer: List[bytes] = []
+        self.buffered = 0
+        self.round_num = 0
+        self.first_round = 0
+        self.subscription: Subscription | None = None
+        self.game_state: GameState | None = None
+
+    def attach(self, game_id: str, game_state: GameState) -> None:
+        header = {"game_id": game_id, "thoughts": self.thoughts, **game_started(game_state)}
+        payload = zlib.compress(json.dumps(header).encode(), COMPRESSION_LEVEL)
+        self.file.write(MAGIC + LENGTH.pack(len(payload)) + payload)
+
+        self.round_num = self.first_round = game_state.round_num
+        self.game_state = game_state
+        self.subscription = game_state.bus.subscribe(self.write)
+
+    def write(self, item: Record) -> None:
+        if isinstance(item, DecisionRecord):
+            return
+        if isinstance(item, Message) and item.internal and not self.thoughts:
+            return
+
+        with self.lock:
+            if isinstance(item, StateChange):
+                self.round_num = item.round_num
+            if not self.buffer:
+                self.first_round = self.round_num
+
+            kind, data = encode_record(item)
+            line = json.dumps({"kind": kind, "round": self.round_num, **data}).encode()
+            self.buffer.append(line)
+            self.buffered += len(line) + 1
+            if self.buffered >= self.chunk_bytes:
+                self.flush_chunk()
+
+    def flush_chunk(self) -> None:
+        if not self.buffer:
+            return
+
+        raw = b"\n".join(self.buffer)
+        payload = zlib.compress(raw, COMPRESSION_LEVEL)
+        chunk = Chunk(
+            offset=self.file.tell(),
+            length=len(payload),
+            raw_length=len(raw),
+            first_round=self.first_round,
+            last_round=self.round_num,
+            records=len(self.buffer),
+        )
+        self.file.write(
+            FRAME.pack(
+                chunk.length, chunk.raw_length, chunk.first_round, chunk.last_round, chunk.records
+            )
+            + payload
+        )
+        # Finished chunks reach the OS straight away, so a crashed game is still readable:
+        self.file.flush()
+        self.chunks.append(chunk)
+        self.buffer = []
+        self.buffered = 0
+
+    def close(self) -> None:
+        if self.subscription is not None:
+            self.game_state.bus.unsubscribe(self.subscription)
+            self.subscription = None
+
+        with self.lock:
+            if self.file.closed:
+                return
+
+            self.flush_chunk()
+            index = json.dumps([chunk.model_dump() for chunk in self.chunks]).encode()
+            offset = self.file.tell()
+            self.file.write(zlib.compress(index, COMPRESSION_LEVEL))
+            self.file.write(TRAILER.pack(offset, END_MAGIC))
+            self.file.close()
+
+
+class TranscriptReader:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.chunks_read = 0
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a transcript")
+
+            (length,) = LENGTH.unpack(file.read(LENGTH.size))
+            self.header: Dict[str, Any] = json.loads(zlib.decompress(file.read(length)))
+            self.data_start = file.tell()
+            self.chunks = self.read_index(file)
+
+        self.last_rounds = [chunk.last_round for chunk in self.chunks]
+
+    def read_index(self, file) -> List[Chunk]:
+        size = file.seek(0, os.SEEK_END)
+        if size - self.data_start >= TRAILER.size:
+            file.seek(size - TRAILER.size)
+            offset, magic = TRAILER.unpack(file.read(TRAILER.size))
+            if magic == END_MAGIC:
+                file.seek(offset)
+                index = zlib.decompress(file.read(size - TRAILER.size - offset))
+                return [Chunk(**chunk) for chunk in json.loads(index)]
+
+        # Unfinished files have no index, rebuild it from the frame headers alone:
+        chunks = []
+        offset = self.data_start
+        while offset + FRAME.size <= size:
+            file.seek(offset)
+            length, raw_length, first_round, last_round, records = FRAME.unpack(
+                file.read(FRAME.size)
+            )
+            if offset + FRAME.size + length > size:
+                break
+
+            chunks.append(
+                Chunk(
+                    offset=offset,
+                    length=length,
+                    raw_length=raw_length,
+                    first_round=first_round,
+                    last_round=last_round,
+                    records=records,
+                )
+            )
+            offset += FRAME.size + length
+
+        return chunks
+
+    def rounds(self) -> range:
+        if not self.chunks:
+            return range(0)
+
+        return range(self.chunks[0].first_round, self.chunks[-1].last_round + 1)
+
+    def read_chunk(self, file, chunk: Chunk) -> List[Dict[str, Any]]:
+        self.chunks_read += 1
+        file.seek(chunk.offset + FRAME.size)
+        raw = zlib.decompress(file.read(chunk.length))
+        return [json.loads(line) for line in raw.split(b"\n")]
+
+    def records(self, start: int | None = None, end: int | None = None) -> Iterator[Dict[str, Any]]:
+        # Chunks are in round order, bisect for the first one that reaches the start round:
+        first = 0 if start is None else bisect.bisect_left(self.last_rounds, start)
+        with open(self.path, "rb") as file:
+            for chunk in self.chunks[first:]:
+                if end is not None and chunk.first_round > end:
+                    return
+
+                for record in self.read_chunk(file, chunk):
+                    if start is not None and record["round"] < start:
+                        continue
+                    if end is not None and record["round"] > end:
+                        return
+                    yield record
+
+    def round(self, round_num: int) -> List[Dict[str, Any]]:
+        return list(self.records(round_num, round_num))
+
+    def size(self) -> Dict[str, int]:
+        return {
+            "compressed": sum(chunk.length for chunk in self.chunks),
+            "raw": sum(chunk.raw_length for chunk in self.chunks),
+        }
+
+
+class TranscriptArchive:
+    # One transcript file per game in a directory, attached to games like the event store.
+    def __init__(
+        self, directory: str, thoughts: bool = False, chunk_bytes: int = CHUNK_BYTES
+    ) -> None:
+        self.directory = directory
+        self.thoughts = thoughts
+        self.chunk_bytes = chunk_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, game_id: str) -> str:
+        return os.path.join(self.directory, f"{game_id}{SUFFIX}")
+
+    def attach(self, game_id: str, game_state: GameState) -> TranscriptWriter:
+        writer = TranscriptWriter(self.path(game_id), self.thoughts, self.chunk_bytes)
+        writer.attach(game_id, game_state)
+        return writer
+
+    def games(self) -> List[str]:
+        return sorted(
+            name[: -len(SUFFIX)] for name in os.listdir(self.directory) if name.endswith(SUFFIX)
+        )
+
+    def open(self, game_id: str) -> TranscriptReader:
+        return TranscriptReader(self.path(game_id))
+
+
+def format_record(record: Dict[str, Any]) -> str:
+    if record["kind"] == "event":
+        event_type = EventType[record["event_type"]]
+        if record["recipient"] is not None:
+            return f"[EVENT]: {record['recipient']} was {event_type} by {record['actor']}"
+        return f"[EVENT]: {event_type} by {record['actor']}"
+
+    if record["kind"] == "message":
+        chat_type = "INTERNAL THOUGHT" if record["internal"] else "PUBLIC CHAT"
+        return f"[{chat_type}][{record['author']}]: {record['content']}"
+
+    liberal = record["enacted_policies"].get(Policy.liberal, 0)
+    fascist = record["enacted_policies"].get(Policy.fascist, 0)
+    return (
+        f"[STATE]: President: {record['president']} / Chancellor: {record['chancellor']} / "
+        f"Liberal policies: {liberal} / Fascist policies: {fascist}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="View a game transcript from any round.")
+    parser.add_argument("path")
+    parser.add_argument("--round", type=int, help="First round to show.")
+    parser.add_argument("--to", type=int, help="Last round to show.")
+    parser.add_argument("--no-thoughts", action="store_true", help="Hide private thoughts.")
+    parser.add_argument("--info", action="store_true", help="Only show the chunk index.")
+    args = parser.parse_args()
+
+    reader = TranscriptReader(args.path)
+    if args.info:
+        size = reader.size()
+        rounds = reader.rounds()
+        print(f"Game {reader.header['game_id']}: {len(reader.chunks)} chunks, rounds {rounds}")
+        print(f"{size['raw']} bytes compressed to {size['compressed']}")
+        for chunk in reader.chunks:
+            print(
+                f"\t@{chunk.offset}: rounds {chunk.first_round}-{chunk.last_round}, "
+                f"{chunk.records} records, {chunk.length} bytes"
+            )
+        return
+
+    round_num = None
+    for record in reader.records(args.round, args.to):
+        if args.no_thoughts and record["kind"] == "message" and record["internal"]:
+            continue
+        if record["round"] != round_num:
+            round_num = record["round"]
+            print(f"\n{f' ROUND {round_num} ':-^80}")
+        print(format_record(record))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.analytics import GameArchive, export_archive
+from src.game import Game
+from src.llm import FakeBackend, set_backend
+from src.store import EventStore
+
+
+def test_export_and_query(tmp_path):
+    set_backend(FakeBackend(seed=5))
+    store = EventStore(str(tmp_path / "games.db"))
+    games = [Game([], [f"Player{i}" for i in range(n)], store=store) for n in (5, 7, 10)]
+    for game in games:
+        game.play_game()
+    store.flush()
+
+    export_archive(store, str(tmp_path / "archive"))
+    archive = GameArchive.load(str(tmp_path / "archive"))
+
+    assert isinstance(archive.games["winner"], np.memmap)
+    assert sorted(archive.games["n_players"]) == [5, 7, 10]
+    assert set(archive.games["winner"]) <= {0, 1}
+    assert len(archive.players["seat"]) == 22
+
+    vote_events = sum(
+        1
+        for game in games
+        for event in game.state.event_history
+        if event.event_type.startswith("voted")
+    )
+    assert len(archive.votes["vote"]) == vote_events
+
+    enacted = archive.governments["policy"] >= 0
+    assert (
+        enacted.sum()
+        <= archive.games["liberal_enacted"].sum() + archive.games["fascist_enacted"].sum()
+    )
+
+    rates = archive.win_rate_by_role()
+    assert set(rates) == {"Liberal", "Fascist", "Hitler"}
+    # Fascists win exactly the games Hitler does, but larger tables seat more of them, so their
+    # rate is weighted by each game's fascist count and only equals Hitler's on equal tables:
+    fascist_won = archive.games["winner"] == 1
+    fascists = archive.games["n_players"] - (archive.games["n_players"] // 2 + 1) - 1
+    assert rates["Hitler"] == fascist_won.mean()
+    assert np.isclose(rates["Fascist"], (fascists * fascist_won).sum() / fascists.sum())
+
+    alignment = archive.vote_alignment()
+    assert all(0.0 <= rate <= 1.0 for rate in alignment.values())
+    assert archive.vote_alignment(by="name")
+
+    blame = archive.fascist_policy_blame()
+    assert sum(row["enacted"] for row in blame.values()) == enacted.sum()
+    store.close()
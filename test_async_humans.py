@@ -0,0 +1,35 @@
+import time
+
+from src.game import Game
+from src.llm import FakeBackend, set_backend
+from src.players import TerminalPlayer, terminal
+
+
+def test_human_timeouts_fall_back_to_defaults():
+    game = Game(["Human"], [f"AI{i}" for i in range(4)], turn_timeout=0.05)
+    human = next(p for p in game.players if isinstance(p, TerminalPlayer))
+    others = [p for p in game.players if p != human]
+
+    assert human.vote_on_government(game.state, others[0], others[1]) is False
+    human.discuss(game.state, "Anything to add?")
+    assert not game.state.public_chat
+
+
+def test_ai_votes_overlap_human_turn():
+    set_backend(FakeBackend(latency=0.2))
+    game = Game(["Human"], [f"AI{i}" for i in range(6)], async_humans=True, turn_timeout=0.2)
+    human = next(p for p in game.players if isinstance(p, TerminalPlayer))
+    president, chancellor = [p for p in game.players if p != human][:2]
+    voters = game.valid_voters(president, chancellor)
+
+    started = time.monotonic()
+    votes = game.collect_votes(voters, president, chancellor)
+
+    assert len(votes) == len(voters)
+    assert time.monotonic() - started < 0.6
+
+
+def test_late_input_does_not_answer_the_next_prompt():
+    # A line typed after the last prompt timed out is still queued when the next one starts:
+    terminal._input_lines.put("1")
+    assert terminal.read_input("Vote: ", terminal.make_deadline(0.05)) is None
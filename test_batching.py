@@ -0,0 +1,86 @@
+import json
+import random
+import re
+from typing import List
+
+import pytest
+
+from src.game import Game
+from src.game_types import Message
+from src.llm import Backend, LLMRequest, using_backend
+from src.players import GeminiPlayer, TerminalPlayer
+from src.routing import DecisionType
+
+
+class RecordingBackend(Backend):
+    def __init__(self) -> None:
+        self.batches: List[List[LLMRequest]] = []
+
+    def generate(self, request: LLMRequest) -> str:
+        # Each response names its asker, so a batch routed back to the wrong seat shows up:
+        name = re.search(r"Your name: (\S+)", request.prompt).group(1)
+        if request.decision == DecisionType.vote_on_government:
+            return json.dumps({"thoughts": "", "selection": "Y" if votes_yes(name) else "N"})
+
+        return json.dumps({"internal_thoughts": "", "public_chat": f"Hello from {name}"})
+
+    def generate_batch(self, requests: List[LLMRequest]) -> List[str]:
+        self.batches.append(requests)
+        return super().generate_batch(requests)
+
+
+def votes_yes(name: str) -> bool:
+    return int(name[-1]) % 2 == 0
+
+
+@pytest.fixture
+def backend():
+    with using_backend(RecordingBackend()) as backend:
+        yield backend
+
+
+def test_votes_dispatched_as_one_batch(backend):
+    game = Game([], [f"Player{i}" for i in range(7)], batch_ai=True)
+    president, chancellor = game.players[:2]
+    voters = game.valid_voters(president, chancellor)
+
+    votes = game.collect_votes(voters, president, chancellor)
+
+    assert votes == [votes_yes(voter.name) for voter in voters]
+    assert len(set(votes)) == 2
+    assert len(backend.batches) == 1
+    for voter, request in zip(voters, backend.batches[0]):
+        assert f"Your name: {voter.name}" in request.prompt
+        others = [p for p in voters if p != voter]
+        assert not any(f"Your name: {p.name}" in request.prompt for p in others)
+
+
+def test_discussion_dispatched_as_one_batch(backend):
+    game = Game([], [f"Player{i}" for i in range(5)], batch_ai=True)
+    game.discuss_game("Any thoughts?")
+
+    assert len(backend.batches) == 1
+    assert len(game.state.public_chat) == 5
+    for message in game.state.public_chat:
+        assert message.content == f"Hello from {message.author.name}"
+
+
+class Talker(TerminalPlayer):
+    def discuss(self, game_state, prompt: str) -> None:
+        game_state.record(Message(author=self, content="Trust me, I'm liberal"))
+
+
+def test_ai_seats_after_a_human_hear_what_they_said(backend):
+    # This deal seats the human fifth, between two runs of AI seats:
+    names = [f"Player{i}" for i in range(6)]
+    game = Game(["Human"], names, batch_ai=True, human_class=Talker, rng=random.Random(0))
+    game.discuss_game("Any thoughts?")
+
+    seat = next(i for i, p in enumerate(game.players) if isinstance(p, Talker))
+    before = [p for p in game.players[:seat] if isinstance(p, GeminiPlayer)]
+    after = [p for p in game.players[seat + 1 :] if isinstance(p, GeminiPlayer)]
+    assert len(before) == 4 and len(after) == 2
+    assert [len(batch) for batch in backend.batches] == [4, 2]
+    for request in [r for batch in backend.batches for r in batch]:
+        speaker = next(p for p in before + after if f"Your name: {p.name}" in request.prompt)
+        assert ("Trust me, I'm liberal" in request.prompt) == (speaker in after)
@@ -0,0 +1,51 @@
+import random
+
+from src import llm
+from src.benchmark import bench_prompt_sizes, compare, run_benchmarks
+from src.llm import FakeBackend
+
+
+def test_compare_flags_only_regressions_past_threshold():
+    baseline = {
+        "game.seconds": 1.0,
+        "build_game_log.10": 1e-5,
+        "records.hash_seconds": 1e-6,
+        "prompt_chars.discuss": 1000,
+        "prompt_chars.enact_policy": 1000,
+    }
+    results = {
+        "game.seconds": 1.8,
+        "build_game_log.10": 3e-5,
+        "records.hash_seconds": 5e-7,
+        "prompt_chars.discuss": 1200,
+        "prompt_chars.enact_policy": 1300,
+    }
+
+    regressions = compare(results, baseline, threshold=0.25, timing_threshold=1.0)
+
+    assert [r.split(":")[0] for r in regressions] == [
+        "build_game_log.10",
+        "prompt_chars.enact_policy",
+    ]
+
+
+def test_quick_benchmarks_cover_every_hot_path():
+    results = run_benchmarks(quick=True)
+
+    assert results["game.seconds"] > 0
+    assert "prompt_chars.vote_on_government" in results
+    assert {"build_game_log.100", "build_latest_chat.100"} <= set(results)
+    assert results["records.create_seconds"] > results["records.hash_seconds"] > 0
+
+
+def test_benchmarks_leave_the_global_generator_and_backend_alone():
+    backend = FakeBackend(seed=9)
+    llm.set_backend(backend)
+    random.seed(3)
+    expected = random.Random(3).random()
+
+    first = bench_prompt_sizes()
+
+    assert random.random() == expected
+    assert llm.get_backend() is backend
+    assert bench_prompt_sizes() == first
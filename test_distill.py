@@ -0,0 +1,104 @@
+import json
+import time
+
+import pytest
+
+from src.distill import load_examples, train
+from src.game import Game
+from src.llm import FakeBackend, LLMRequest, set_backend, using_backend
+from src.players import gemini
+from src.players import DistilledPlayer
+from src.players.distilled import set_policy
+from src.routing import DecisionType
+from src.store import EventStore
+
+
+class AlwaysYesBackend(FakeBackend):
+    def respond(self, request: LLMRequest) -> str:
+        if request.decision == DecisionType.vote_on_government:
+            return json.dumps({"thoughts": "", "selection": "Y"})
+
+        return super().respond(request)
+
+
+class FailingBackend(FakeBackend):
+    def respond(self, request: LLMRequest) -> str:
+        raise RuntimeError("API unavailable")
+
+
+class SlowBackend(FakeBackend):
+    def respond(self, request: LLMRequest) -> str:
+        time.sleep(1.0)
+        return super().respond(request)
+
+
+@pytest.fixture
+def policy(tmp_path):
+    store = EventStore(str(tmp_path / "games.db"))
+    with using_backend(AlwaysYesBackend(seed=4)):
+        for _ in range(2):
+            Game([], [f"Player{i}" for i in range(6)], store=store).play_game()
+    store.flush()
+
+    policy = train(load_examples(store))
+    store.close()
+    set_policy(policy)
+    yield policy
+    set_policy(None)
+
+
+def test_distilled_player_imitates_logged_decisions(tmp_path):
+    set_backend(AlwaysYesBackend(seed=4))
+    store = EventStore(str(tmp_path / "games.db"))
+    for _ in range(2):
+        Game([], [f"Player{i}" for i in range(6)], store=store).play_game()
+    store.flush()
+
+    examples = load_examples(store)
+    store.close()
+    assert {DecisionType.nominate_chancellor, DecisionType.vote_on_government} <= set(examples)
+    assert all(len(x) == 2 for x, _ in examples[DecisionType.vote_on_government])
+
+    policy = train(examples)
+    assert policy.accuracy(examples)[DecisionType.vote_on_government] == 1.0
+
+    set_policy(policy)
+    try:
+        game = Game([], [f"Player{i}" for i in range(6)], ai_class=DistilledPlayer)
+        president, chancellor = game.players[:2]
+        voters = game.valid_voters(president, chancellor)
+        assert game.collect_votes(voters, president, chancellor) == [True for _ in voters]
+
+        winner, _ = game.play_game()
+        assert winner is not None
+    finally:
+        set_policy(None)
+
+
+def test_gemini_seats_fall_back_to_the_policy_when_calls_fail(policy):
+    with using_backend(FailingBackend()):
+        game = Game([], [f"Player{i}" for i in range(6)])
+        president, chancellor = game.players[:2]
+        voters = game.valid_voters(president, chancellor)
+        assert game.collect_votes(voters, president, chancellor) == [True for _ in voters]
+
+        winner, _ = game.play_game()
+        assert winner is not None
+
+
+def test_gemini_seats_fall_back_to_the_policy_when_calls_time_out(policy, monkeypatch):
+    monkeypatch.setattr(gemini, "FALLBACK_TIMEOUT", 0.05)
+    with using_backend(SlowBackend()):
+        game = Game([], [f"Player{i}" for i in range(6)])
+        president, chancellor = game.players[:2]
+        voters = game.valid_voters(president, chancellor)
+        started = time.perf_counter()
+        assert game.collect_votes(voters, president, chancellor) == [True for _ in voters]
+        assert time.perf_counter() - started < 1.0
+
+
+def test_gemini_seats_raise_backend_errors_without_a_policy():
+    with using_backend(FailingBackend()):
+        game = Game([], [f"Player{i}" for i in range(6)])
+        with pytest.raises(RuntimeError, match="API unavailable"):
+            game.players[0].nominate_chancellor(game.state, game.players[1:])
@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.env import OBS_SIZE, Phase, VectorEnv
+from src.game_types import Policy
+
+
+def random_actions(rng, masks):
+    return (rng.random(masks.shape) * masks).argmax(-1)
+
+
+def test_random_rollouts_reuse_buffers_and_finish_games():
+    env = VectorEnv(16, num_players=7)
+    observations, masks = env.reset(seed=1)
+    assert observations.shape == (16, 10, OBS_SIZE)
+    assert not masks[:, 7:].any()
+
+    # Every game opens with only its president nominating:
+    assert (masks.any(-1).sum(-1) == 1).all()
+    assert all(phase == Phase.nominate for phase in env.phase)
+
+    rng = np.random.default_rng(1)
+    finished = 0
+    for _ in range(500):
+        step = env.step(random_actions(rng, masks))
+        assert step[0] is observations and step[1] is masks
+        rewards, dones = step[2], step[3]
+        finished += dones.sum()
+        assert (rewards[~dones] == 0).all()
+        for i in np.flatnonzero(dones):
+            # Four liberals and three fascists, so the reward signs are split 4/3:
+            assert sorted(np.abs(rewards[i, :7]).tolist()) == [1] * 7
+            assert abs(rewards[i, :7].sum()) == 1
+
+    assert finished > 16
+    assert env.illegal_actions == 0
+
+
+def test_seeded_resets_replay_without_touching_the_global_generator():
+    env = VectorEnv(num_envs=3)
+    random.seed(4)
+    expected = random.Random(4).random()
+
+    first = env.reset(seed=5)[0].copy()
+    assert random.random() == expected
+    env.reset()
+    assert (env.reset(seed=5)[0] == first).all()
+
+
+def test_illegal_actions_fall_back_to_a_legal_choice():
+    env = VectorEnv(4, num_players=5)
+    _, masks = env.reset(seed=2)
+    actions = np.full((4, 10), 9)
+
+    env.step(actions)
+
+    assert env.illegal_actions == 4
+    assert all(phase == Phase.vote for phase in env.phase)
+
+
+def test_agent_seats_answer_with_the_action_they_were_given():
+    env = VectorEnv(1, num_players=5)
+    env.reset(seed=3)
+    game = env.games[0]
+    president = env.president(0)
+    candidates = game.valid_chancellors(president, None, None)
+
+    president.act(candidates[-1])
+    assert president.nominate_chancellor(game.state, candidates) == candidates[-1]
+    with pytest.raises(RuntimeError):
+        president.nominate_chancellor(game.state, candidates)
+
+    president.act(1)
+    selection = president.propose_policies(game.state, [Policy.liberal, Policy.fascist] * 2)
+    assert selection.discarded == [Policy.fascist]
+    assert len(selection.selected) == 3
@@ -0,0 +1,80 @@
+import datetime as dt
+import queue
+import threading
+
+from src.event_bus import EventBus
+from src.game import Game
+from src.game_types import Message
+from src.llm import FakeBackend, set_backend
+from src.players import GeminiPlayer, TerminalPlayer
+
+
+def test_queued_subscriber_sheds_oldest_without_blocking():
+    bus = EventBus()
+    release = threading.Event()
+    seen = []
+
+    def slow(item):
+        release.wait()
+        seen.append(item)
+
+    inline = []
+    bus.subscribe(inline.append)
+    subscription = bus.subscribe_queued(slow, maxsize=3)
+    for i in range(10):
+        bus.publish(i)
+
+    assert inline == list(range(10))
+    assert subscription.dropped > 0
+
+    release.set()
+    subscription.join()
+    assert seen[-1] == 9
+    assert seen == sorted(seen)
+    assert len(seen) + subscription.dropped == 10
+
+
+def test_close_survives_the_worker_draining_a_full_queue():
+    bus = EventBus()
+    subscription = bus.subscribe_queued(lambda item: None, maxsize=1)
+    put_nowait = subscription.queue.put_nowait
+    calls = []
+
+    def full_then_drained(item):
+        # The first attempt sees a full queue which the worker empties before close retries:
+        calls.append(item)
+        if len(calls) == 1:
+            raise queue.Full
+        put_nowait(item)
+
+    subscription.queue.put_nowait = full_then_drained
+    subscription.close()
+    subscription.worker.join(timeout=1)
+    assert not subscription.worker.is_alive()
+    assert len(calls) == 2
+
+
+def test_players_keep_every_item_published_from_many_threads():
+    set_backend(FakeBackend(seed=1))
+    game = Game(["Human"], [f"AI{i}" for i in range(4)])
+    ai = next(p for p in game.players if isinstance(p, GeminiPlayer))
+    human = next(p for p in game.players if isinstance(p, TerminalPlayer))
+    human.build_latest_chat(game.state)
+    start = dt.datetime.now()
+
+    def publish(offset):
+        for i in range(200):
+            seconds = offset + 10 * i
+            game.state.record(
+                Message(author=ai, content="hi", time=start + dt.timedelta(seconds=seconds))
+            )
+
+    threads = [threading.Thread(target=publish, args=(k,)) for k in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    times = [time for time, _ in ai._log]
+    assert len(times) == 2000 and times == sorted(times)
+    assert human.build_latest_chat(game.state).count("[PUBLIC CHAT]") == 2000
@@ -0,0 +1,36 @@
+from src.fuzz import PLAYER_COUNTS, fuzz, minimal_replay, play
+from src.game import Game
+from src.game_state import GameState
+from src.game_types import Power
+
+
+def test_random_games_keep_the_rules():
+    totals = fuzz(games=120, workers=1)
+
+    assert totals["failures"] == []
+    assert set(totals["games"]) == set(PLAYER_COUNTS)
+    assert totals["steps"] > 0
+
+
+def test_power_tables_follow_player_count():
+    assert GameState().failed_elections == 0
+    assert Game([], [f"P{i}" for i in range(5)]).powers[3] == Power.policy_peek
+    assert Game([], [f"P{i}" for i in range(7)]).powers[3] == Power.special_election
+    assert Game([], [f"P{i}" for i in range(9)]).powers[1] == Power.investigate_loyalty
+
+
+def test_violations_shrink_to_a_minimal_replay(monkeypatch):
+    # Reintroduce the old rule, which term limited the last president with five players alive:
+    def valid_chancellors(self, president, previous_president, previous_chancellor):
+        return self.valid_players(exclude=[president, previous_president, previous_chancellor])
+
+    monkeypatch.setattr(Game, "valid_chancellors", valid_chancellors)
+    seed, (checker, violation) = next(
+        (seed, result) for seed, result in ((s, play(5, s)) for s in range(50)) if result[1]
+    )
+    assert violation.invariant == "term_limits"
+
+    replay = minimal_replay(5, seed, checker.tape.used(), violation)
+    assert replay.invariant == "term_limits"
+    assert len(replay.choices) <= len(checker.tape.used())
+    assert play(5, replay.seed, replay.choices)[1].invariant == "term_limits"
@@ -0,0 +1,85 @@
+import threading
+
+from src.events import Event, EventType
+from src.game import Game
+from src.game_types import Policy
+from src.history import HistoryIndex
+from src.llm import FakeBackend, set_backend
+from src.players.base import VOTE_MAPPING
+
+
+def play(seed: int) -> Game:
+    set_backend(FakeBackend(seed=seed))
+    game = Game([], [f"Player{i}" for i in range(7)])
+    game.play_game()
+    return game
+
+
+def test_indexes_match_a_scan_of_the_history():
+    game = play(seed=5)
+    state = game.state
+    history = state.history
+
+    # The event history is an unordered set, the index keeps arrival order:
+    events = history.events()
+    assert set(events) == state.event_history
+    assert events == sorted(events, key=lambda e: e.time)
+    for player in game.players:
+        scanned = [e for e in state.event_history if e.actor.name == player.name]
+        assert set(history.events(actor=player.name)) == set(scanned)
+
+        scanned = [
+            e
+            for e in state.event_history
+            if e.recipient
+            and e.recipient.name == player.name
+            and e.event_type == EventType.chancellor_nominated
+        ]
+        nominated = history.events(recipient=player.name, event_type=EventType.chancellor_nominated)
+        assert set(nominated) == set(scanned)
+
+    votes = [e for e in state.event_history if e.event_type in VOTE_MAPPING.values()]
+    assert sum(len(g.votes) for g in history.governments) == len(votes)
+    assert len(history.enacted(Policy.liberal)) + len(history.enacted(Policy.fascist)) == sum(
+        g.policy is not None for g in history.governments
+    )
+    for government in history.governments_with("Player0"):
+        assert "Player0" in (government.president, government.chancellor)
+    assert len(history.votes_by("Player0")) == len(history.governments)
+
+
+def test_forget_drops_records_but_keeps_governments():
+    game = play(seed=8)
+    history = game.state.history
+    governments = list(history.governments)
+    first_round = history.events(round_num=1)
+
+    history.forget(first_round)
+    assert history.events(round_num=1) == []
+    assert not any(e in first_round for e in history.events())
+    assert history.governments == governments
+
+
+def test_votes_added_while_forgetting_are_kept():
+    voters = play(seed=3).players
+    history = HistoryIndex()
+    old = [Event(event_type=EventType.vote_in_favour, actor=voters[0]) for _ in range(2000)]
+    for event in old:
+        history.add(event, 1)
+
+    def vote(player):
+        for _ in range(500):
+            history.add(Event(event_type=EventType.vote_against, actor=player), 2)
+
+    threads = [threading.Thread(target=vote, args=(player,)) for player in voters[1:]]
+    for thread in threads:
+        thread.start()
+    for start in range(0, len(old), 10):
+        history.forget(old[start : start + 10])
+    for thread in threads:
+        thread.join()
+
+    assert history.events(round_num=1) == []
+    assert len(history.events(round_num=2)) == 500 * len(threads)
+    for player in voters[1:]:
+        assert len(history.events(actor=player.name)) == 500
@@ -1,7 +1,7 @@
 from collections import defaultdict
 
 from src.game import Game
-from src.players import Role
+from src.game_types import Role
 
 
 def test_player_counts():
@@ -0,0 +1,60 @@
+import random
+
+from src import llm
+from src.llm import FakeBackend
+from src.loadtest import (
+    Distribution,
+    LatencyModel,
+    LevelResult,
+    SimulatedBackend,
+    run_load_test,
+    saturation_point,
+)
+
+
+def test_latency_models_sample_around_the_median():
+    rng = random.Random(0)
+    for distribution in [Distribution.lognormal, Distribution.exponential]:
+        model = LatencyModel(distribution=distribution, median=0.1)
+        samples = sorted(model.sample(rng) for _ in range(2001))
+        assert 0.08 < samples[1000] < 0.12
+
+    trace = LatencyModel(distribution=Distribution.trace, trace=[0.5, 1.5])
+    assert {trace.sample(rng) for _ in range(50)} == {0.5, 1.5}
+
+
+def test_load_test_reports_each_concurrency_level():
+    backend = SimulatedBackend(LatencyModel(distribution=Distribution.fixed, median=0.001), seed=0)
+    previous = FakeBackend(seed=0)
+    llm.set_backend(previous)
+    results = run_load_test(backend, levels=[1, 2], games=2, players=5)
+    assert llm.get_backend() is previous
+
+    assert [r.concurrency for r in results] == [1, 2]
+    for result in results:
+        assert result.failed_games == 0
+        assert result.calls_per_game > 0
+        assert result.duration_p50 <= result.duration_p99
+        assert 0 < result.llm_share < 1
+
+
+def test_exhausted_retries_fail_the_game_not_the_run():
+    backend = SimulatedBackend(
+        LatencyModel(distribution=Distribution.fixed, median=0.0), failure_rate=1.0, backoff=0.0
+    )
+    [result] = run_load_test(backend, levels=[2], games=2, players=5)
+
+    assert result.failed_games == 2
+    assert result.retries == 2 * (backend.max_retries + 1)
+
+
+def test_saturation_point():
+    def level(concurrency: int, rps: float) -> LevelResult:
+        return LevelResult(
+            concurrency=concurrency, games=1, failed_games=0, wall_seconds=1, duration_p50=1,
+            duration_p90=1, duration_p99=1, calls_per_game=1, retries=0, games_per_second=1,
+            requests_per_second=rps, llm_share=1, requests_per_second_per_game=1,
+        )  # fmt: skip
+
+    assert saturation_point([level(1, 10), level(2, 19), level(4, 38)]) is None
+    assert saturation_point([level(1, 10), level(2, 19), level(4, 25)]) == 4
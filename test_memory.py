@@ -0,0 +1,52 @@
+import datetime as dt
+
+from src.game import Game
+from src.game_types import Message
+from src.llm import FakeBackend, set_backend
+from src.memory import MemoryProfiler, RetentionPolicy, load_spilled
+
+
+def test_retention_bounds_history_and_spills_the_rest(tmp_path):
+    retention = RetentionPolicy(max_items=20, spill_dir=str(tmp_path))
+    game = Game([], [f"Player{i}" for i in range(5)], retention=retention)
+    author = game.players[0]
+    start = dt.datetime.now()
+    for i in range(500):
+        time = start + dt.timedelta(milliseconds=i)
+        game.state.record(Message(time=time, author=author, content=f"Chat {i}"))
+        game.state.record(Message(time=time, author=author, internal=True, content=f"Thought {i}"))
+
+    # Nothing is trimmed mid-round, only once the next round starts:
+    assert len(game.state.public_chat) == 500
+    game.state.start_round()
+    assert len(game.state.public_chat) == 20
+    assert len(author.thoughts) == 20
+    chat = game.state.archived["public_chat"]
+    assert chat.count + len(game.state.public_chat) == 500
+    assert chat.authors == {author.name: chat.count}
+
+    # The newest records stay in memory, the oldest are on disk in order:
+    assert max(m.time for m in game.state.public_chat) == start + dt.timedelta(milliseconds=499)
+    spilled = load_spilled(retention.spill_path(game.game_id))
+    assert len(spilled) == chat.count + game.state.archived[f"thoughts:{author.name}"].count
+    assert [s["content"] for s in spilled if not s["internal"]][:3] == [
+        "Chat 0",
+        "Chat 1",
+        "Chat 2",
+    ]
+
+
+def test_profiler_snapshots_every_round():
+    set_backend(FakeBackend(seed=1))
+    profiler = MemoryProfiler()
+    game = Game([], [f"Player{i}" for i in range(5)], memory_profiler=profiler)
+    try:
+        game.play_game()
+    finally:
+        profiler.stop()
+
+    assert [s.round_num for s in profiler.snapshots] == list(range(1, game.state.round_num + 1))
+    last = profiler.snapshots[-1]
+    assert last.traced_bytes > 0
+    assert last.structures["event_history"] > 0
+    assert set(last.structures) >= {"public_chat", "thoughts", "player_logs", "players"}
@@ -0,0 +1,52 @@
+import json
+
+from src.game import Game
+from src.llm import FakeBackend, set_backend
+from src.metrics import SECONDS_BUCKETS, Histogram, Metrics, get_metrics, set_metrics
+
+
+def test_game_exports_phase_and_llm_metrics(tmp_path):
+    set_backend(FakeBackend(seed=5))
+    set_metrics(Metrics())
+    try:
+        game = Game([], [f"Player{i}" for i in range(6)], metrics_dir=str(tmp_path))
+        game.play_game()
+    finally:
+        set_metrics(Metrics(enabled=False))
+
+    with open(tmp_path / "metrics.json") as file:
+        report = json.load(file)
+
+    phases = {s["labels"]["phase"] for s in report["histograms"]["phase_seconds"]}
+    assert {"nomination", "discussion", "vote"} <= phases
+    methods = {s["labels"]["method"] for s in report["histograms"]["player_call_seconds"]}
+    assert {"nominate_chancellor", "vote_on_government", "discuss"} <= methods
+    llm_calls = sum(s["value"] for s in report["counters"]["llm_calls_total"])
+    assert llm_calls == sum(s["count"] for s in report["histograms"]["llm_seconds"])
+    assert report["counters"]["games_total"][0]["value"] == 1
+
+    prometheus = (tmp_path / "metrics.prom").read_text()
+    assert "# TYPE secret_hitler_phase_seconds histogram" in prometheus
+    assert 'secret_hitler_phase_seconds_bucket{phase="vote",le="+Inf"}' in prometheus
+
+
+def test_disabled_metrics_record_nothing():
+    set_backend(FakeBackend(seed=5))
+    Game([], [f"Player{i}" for i in range(5)]).play_game()
+
+    report = get_metrics().report()
+    assert not any(report["histograms"].values())
+    assert not any(report["counters"].values())
+
+
+def test_empty_histograms_export_null_summaries(tmp_path):
+    metrics = Metrics()
+    metrics.histograms["llm_seconds"][()] = Histogram(SECONDS_BUCKETS)
+    json_path, _ = metrics.export(str(tmp_path))
+
+    with open(json_path) as file:
+        text = file.read()
+    assert "NaN" not in text
+    summary = json.loads(text)["histograms"]["llm_seconds"][0]
+    assert summary["count"] == 0
+    assert summary["mean"] is None and summary["p95"] is None
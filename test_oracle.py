@@ -0,0 +1,59 @@
+import contextlib
+import io
+import time
+
+from src.game import Game
+from src.game_types import Party, Policy, Role
+from src.llm import FakeBackend, set_backend
+from src.oracle import WinOracle, rule_key, state_key, win_curve
+from src.store import EventStore
+
+ROLES = [Role.liberal] * 4 + [Role.fascist] * 2 + [Role.hitler]
+
+
+def key(liberal: int, fascist: int, policy_deck=None, roles=ROLES):
+    enacted = {Policy.liberal: liberal, Policy.fascist: fascist}
+    return rule_key(enacted, 0, roles, 7, policy_deck)
+
+
+def test_exact_solution_matches_rollouts():
+    exact = WinOracle().win_probability(key(3, 4))
+    rollouts = WinOracle(max_states=0, rollouts=4000, seed=1).win_probability(key(3, 4))
+    assert abs(exact - rollouts) < 0.03
+
+    # Only liberal cards left and no way for Hitler to win, so the next government decides it:
+    assert WinOracle(election_rate=1.0).win_probability(key(4, 0, [Policy.liberal] * 3)) == 1.0
+
+
+def test_cached_states_answer_quickly():
+    oracle = WinOracle()
+    oracle.win_probability(key(0, 0))
+    started = time.perf_counter()
+    for _ in range(1000):
+        oracle.win_probability(key(0, 0))
+    assert (time.perf_counter() - started) / 1000 < 1e-4
+
+    # More fascist policies and a dead Hitler move the estimate the way they should:
+    assert oracle.win_probability(key(0, 3)) < oracle.win_probability(key(0, 0))
+    assert oracle.win_probability(key(0, 3, roles=ROLES[:-1])) > oracle.win_probability(key(0, 3))
+
+
+def test_estimates_played_and_recorded_games(tmp_path):
+    set_backend(FakeBackend(seed=2))
+    store = EventStore(str(tmp_path / "games.db"))
+    game = Game([], [f"Player{i}" for i in range(7)], store=store)
+    oracle = WinOracle()
+
+    estimate = oracle.estimate_game(game)
+    assert estimate[Party.liberal] == oracle.win_probability(
+        state_key(game.state, game.policy_deck)
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        party, _ = game.play_game()
+    assert oracle.estimate_game(game)[party] == 1.0
+
+    store.flush()
+    curve = win_curve(store, game.game_id, oracle)
+    store.close()
+    assert all(0.0 <= liberal <= 1.0 for _, liberal in curve)
+    assert curve[-1][1] == float(party == Party.liberal)
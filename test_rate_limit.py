@@ -0,0 +1,51 @@
+import threading
+import time
+
+from src.rate_limit import Priority, RateLimiter, connect_rate_limiter, serve_rate_limiter
+
+
+def test_requests_per_minute_limit():
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=1_000_000)
+    limiter.requests.level = 0
+
+    waited = limiter.acquire(tokens=10)
+    assert waited >= 0.09
+    assert limiter.metrics().granted == 1
+
+
+def test_interactive_served_before_background():
+    limiter = RateLimiter(requests_per_minute=1200, tokens_per_minute=1_000_000)
+    limiter.requests.level = 0
+
+    order = []
+
+    def worker(name: str, priority: Priority) -> None:
+        limiter.acquire(priority=priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=worker, args=(f"bg{i}", Priority.background)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    while limiter.queue_depth() < 3:
+        time.sleep(0.001)
+
+    interactive = threading.Thread(target=worker, args=("human", Priority.interactive))
+    interactive.start()
+    for thread in threads + [interactive]:
+        thread.join()
+
+    assert order.index("human") <= 1
+    metrics = limiter.metrics()
+    assert metrics.granted_by_priority["interactive"] == 1
+    assert metrics.queue_depth == 0
+
+
+def test_coordinator_shares_limiter():
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1_000_000)
+    address = serve_rate_limiter(limiter, address=("127.0.0.1", 0))
+
+    remote = connect_rate_limiter(address)
+    remote.acquire(100, int(Priority.interactive))
+
+    assert limiter.metrics().granted == 1
+    assert remote.metrics().granted == 1
@@ -0,0 +1,58 @@
+import datetime as dt
+
+from src.game import Game
+from src.llm import FakeBackend, LLMRequest, set_backend
+from src.players.gemini import RECENT_MEMORIES, RETRIEVED_MEMORIES
+from src.retrieval import MemoryIndex, MemoryStore, set_memory_store
+
+
+class PromptRecorder(FakeBackend):
+    def __init__(self, seed: int = None) -> None:
+        super().__init__(seed=seed)
+        self.prompts = []
+
+    def generate(self, request: LLMRequest) -> str:
+        self.prompts.append(request.prompt)
+        return super().generate(request)
+
+
+def test_search_ranks_relevant_memories():
+    index = MemoryIndex()
+    start = dt.datetime(2024, 1, 1)
+    for i in range(50):
+        index.add(f"[MESSAGE] Player{i % 5}: I think we should play it safe.", start)
+    target = index.add("[EVENT] Eve enacted a Fascist policy as Chancellor", start)
+
+    assert index.search("Should you vote for Eve as Chancellor?", k=3)[0] == target
+    assert index.search("Eve Chancellor", k=3, exclude={target}) != [target]
+
+
+def test_memories_persist_between_games(tmp_path):
+    store = MemoryStore(str(tmp_path))
+    index = store.load("Alice")
+    index.add("[EVENT] Bob was executed by Alice", dt.datetime(2024, 1, 1))
+    store.save("Alice", index)
+
+    restored = MemoryStore(str(tmp_path)).load("Alice")
+    assert [m.text for m in restored.memories] == ["[EVENT] Bob was executed by Alice"]
+    assert restored.memories[0].session < restored.session
+    assert restored.search("Who executed Bob?", k=1) == [0]
+
+
+def test_retrieval_bounds_prompt_history(tmp_path):
+    names = [f"Player{i}" for i in range(7)]
+    set_memory_store(MemoryStore(str(tmp_path)))
+    try:
+        backend = PromptRecorder(seed=1)
+        set_backend(backend)
+        Game([], list(names)).play_game()
+    finally:
+        set_memory_store(None)
+
+    assert any("## LATEST GAME EVENTS" in p for p in backend.prompts)
+    for prompt in backend.prompts:
+        history = prompt.split("## ")
+        sections = [s for s in history if s.startswith(("RELEVANT", "LATEST"))]
+        memories = sum(s.count("\n[") for s in sections)
+        assert memories <= RECENT_MEMORIES + RETRIEVED_MEMORIES
+    assert len(list(tmp_path.glob("*.json"))) == len(names)
@@ -0,0 +1,45 @@
+import datetime as dt
+
+from src.game_state import GameState
+from src.game_types import Policy
+from src.routing import ROUND_LATENCY_BUDGET, DecisionType, ModelTier, RoutingPolicy
+
+
+def state(fascist: int = 0, elapsed: float = 0.0) -> GameState:
+    game_state = GameState(round_started=dt.datetime.now() - dt.timedelta(seconds=elapsed))
+    game_state.enacted_policies[Policy.fascist] = fascist
+    return game_state
+
+
+def test_decisions_use_their_configured_tier():
+    policy = RoutingPolicy()
+    assert policy.tier(DecisionType.discuss, state()) == ModelTier.fast
+    assert policy.tier(DecisionType.vote_on_government, state()) == ModelTier.standard
+    assert policy.tier(DecisionType.action_special_election, state()) == ModelTier.standard
+    assert policy.tier(DecisionType.action_execution, state()) == ModelTier.strong
+    assert policy.route(DecisionType.discuss, state()) == "gemini-1.5-flash-8b"
+    assert policy.route(DecisionType.enact_policy, state()) == "gemini-1.5-flash"
+
+
+def test_critical_decisions_escalate_once_hitler_can_win():
+    policy = RoutingPolicy()
+    assert policy.tier(DecisionType.vote_on_government, state(fascist=2)) == ModelTier.standard
+    assert policy.tier(DecisionType.vote_on_government, state(fascist=3)) == ModelTier.strong
+    assert policy.route(DecisionType.nominate_chancellor, state(fascist=3)) == "gemini-1.5-pro"
+
+    # Non-critical decisions stay put, and critical ones aren't downgraded for a slow round:
+    assert policy.tier(DecisionType.discuss, state(fascist=3)) == ModelTier.fast
+    slow = state(fascist=3, elapsed=2 * ROUND_LATENCY_BUDGET + 1)
+    assert policy.tier(DecisionType.enact_policy, slow) == ModelTier.strong
+
+
+def test_slow_rounds_drop_a_tier_per_overrun_budget():
+    policy = RoutingPolicy()
+    once = state(elapsed=ROUND_LATENCY_BUDGET + 1)
+    twice = state(elapsed=2 * ROUND_LATENCY_BUDGET + 1)
+    assert policy.tier(DecisionType.vote_on_government, once) == ModelTier.fast
+    assert policy.tier(DecisionType.action_investigate_loyalty, twice) == ModelTier.fast
+    assert policy.tier(DecisionType.action_execution, twice) == ModelTier.strong
+
+    unbounded = RoutingPolicy(round_latency_budget=None)
+    assert unbounded.tier(DecisionType.vote_on_government, twice) == ModelTier.standard
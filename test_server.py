@@ -0,0 +1,203 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.llm import FakeBackend, set_backend, using_backend
+from src.game_state import GameState
+from src.game_types import Party
+from src.oracle import WinOracle
+from src.players import RemotePlayer
+from src.players.remote import RemoteChannel
+from src.server import GameServer
+from src.server.app import Table
+from src.server.websocket import connect
+
+
+async def http(host: str, port: int, method: str, path: str, body: dict = None):
+    reader, writer = await asyncio.open_connection(host, port)
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(payload)}\r\n\r\n".encode()
+        + payload
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status = int(response.split(b" ", 2)[1])
+    return status, json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+
+async def play_remote_seat(host: str, port: int, table_id: str, name: str) -> dict:
+    socket = await connect(host, port, f"/tables/{table_id}/ws?name={name}")
+    welcome = json.loads(await socket.recv())
+    assert welcome["type"] == "welcome"
+
+    while True:
+        message = json.loads(await socket.recv())
+        if message["type"] == "game_over":
+            await socket.close()
+            return message
+        if message["type"] == "choice":
+            await socket.send(json.dumps({"id": message["id"], "choice": 0}))
+        elif message["type"] == "vote":
+            await socket.send(json.dumps({"id": message["id"], "vote": True}))
+        elif message["type"] == "discuss":
+            await socket.send(json.dumps({"id": message["id"], "message": "I'm liberal"}))
+
+
+async def run_tables() -> None:
+    server = GameServer(port=0, turn_timeout=5.0)
+    host, port = await server.start()
+
+    tables = []
+    for i in range(3):
+        status, table = await http(
+            host, port, "POST", "/tables", {"players": [f"Remote{i}"], "ai": ["A", "B", "C", "D"]}
+        )
+        assert status == 201
+        assert table["status"] == "waiting"
+        assert table["win_probability"] is None
+        tables.append(table)
+
+    spectator = await connect(host, port, f"/tables/{tables[0]['id']}/spectate")
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            *[play_remote_seat(host, port, t["id"], t["remote_players"][0]) for t in tables]
+        ),
+        timeout=60,
+    )
+    assert all(result["winner"] is not None for result in results)
+
+    seen = []
+    while not seen or seen[-1].get("winner") is None:
+        seen.append(json.loads(await asyncio.wait_for(spectator.recv(), timeout=5)))
+    assert {"event", "message", "state"} <= {item["kind"] for item in seen}
+    assert not any(item.get("internal") for item in seen)
+    await spectator.close()
+
+    status, listing = await http(host, port, "GET", "/tables")
+    assert status == 200
+    assert {table["status"] for table in listing} == {"finished"}
+    for table in listing:
+        assert table["win_probability"][table["winner"]["party"]] == 1.0
+    await server.stop()
+
+
+def test_server_hosts_concurrent_tables():
+    set_backend(FakeBackend(seed=0))
+    asyncio.run(run_tables())
+
+
+async def reject_bad_requests() -> None:
+    server = GameServer(port=0)
+    host, port = await server.start()
+
+    for body in [
+        {"players": [], "ai": []},
+        {"players": ["A"], "ai": ["B", "C"]},
+        {"ai": [f"P{i}" for i in range(11)]},
+        {"players": ["A"], "ai": ["A", "B", "C", "D"]},
+        {"players": "ABCDE"},
+    ]:
+        status, _ = await http(host, port, "POST", "/tables", body)
+        assert status == 400
+    assert server.tables == {}
+
+    for request in [
+        b"NONSENSE\r\n\r\n",
+        b"POST /tables HTTP/1.1\r\nContent-Length: x\r\n\r\n",
+        b"GET /tables/1/spectate HTTP/1.1\r\nUpgrade: websocket\r\n\r\n",
+    ]:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(request)
+        await writer.drain()
+        assert (await reader.read()).startswith(b"HTTP/1.1 400")
+        writer.close()
+
+    await server.stop()
+
+
+def test_server_rejects_bad_requests():
+    asyncio.run(reject_bad_requests())
+
+
+def test_remote_channels_ignore_malformed_messages():
+    loop = asyncio.new_event_loop()
+    channel = RemoteChannel(loop)
+    future = channel.pending[1] = loop.create_future()
+    for text in ["not json", "[1, 2]", '"text"', '{"id": [1]}', '{"vote": true}']:
+        channel.receive(text)
+    assert not future.done()
+
+    channel.receive('{"id": 1, "vote": true}')
+    assert future.result() == {"id": 1, "vote": True}
+    loop.close()
+
+
+class ScriptedChannel:
+    def __init__(self, responses) -> None:
+        self.responses = iter(responses)
+
+    def ask(self, payload, timeout):
+        return next(self.responses)
+
+
+def test_remote_votes_must_be_booleans():
+    player = RemotePlayer(name="Remote", party="Liberal", role="Liberal", default_vote=False)
+    player.connect(ScriptedChannel([{"vote": "false"}, {"vote": 1}, {}, None, {"vote": True}]))
+    votes = [player.vote_on_government(GameState(), player, player) for _ in range(5)]
+    assert votes == [False, False, False, False, True]
+
+
+async def queue_tables() -> None:
+    server = GameServer(port=0, max_running_tables=1)
+    await server.start()
+
+    first = server.create_table([], [f"A{i}" for i in range(5)])
+    second = server.create_table([], [f"B{i}" for i in range(5)])
+    await asyncio.sleep(0.1)
+    assert first.status == "running"
+    assert second.status == "queued"
+
+    while second.status != "finished":
+        await asyncio.sleep(0.05)
+    assert first.status == "finished"
+    await server.stop()
+
+
+def test_tables_past_the_worker_pool_report_queued():
+    with using_backend(FakeBackend(seed=2, latency=0.01)):
+        asyncio.run(queue_tables())
+
+
+class SlowOracle(WinOracle):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads = []
+
+    def solve(self, key) -> float:
+        self.threads.append(threading.current_thread())
+        time.sleep(0.2)
+        return super().solve(key)
+
+
+def test_tables_estimate_win_probability_off_the_game_thread():
+    oracle = SlowOracle()
+    estimator = ThreadPoolExecutor(max_workers=1)
+    loop = asyncio.new_event_loop()
+    table = Table("1", [], [f"AI{i}" for i in range(5)], loop, 1.0, oracle, estimator)
+
+    started = time.perf_counter()
+    for _ in range(3):
+        table.game.state.start_round()
+    assert time.perf_counter() - started < 0.1
+    assert table.win_probability is None
+
+    estimator.shutdown(wait=True)
+    loop.close()
+    assert threading.current_thread() not in oracle.threads
+    # Rounds queued behind a running solve are superseded by the latest one:
+    assert len(oracle.threads) <= 2
+    assert 0 < table.win_probability[Party.liberal] < 1
@@ -0,0 +1,108 @@
+import threading
+
+from src.events import Event, EventType
+from src.game import Game
+from src.game_types import Message, Policy
+from src.llm import FakeBackend, LLMRequest, set_backend
+from src.metrics import Metrics, set_metrics
+from src.rate_limit import Priority
+from src.routing import DecisionType
+from src.speculation import Speculator
+
+
+class BlockingBackend(FakeBackend):
+    def __init__(self) -> None:
+        super().__init__(seed=0)
+        self.release = threading.Event()
+
+    def generate(self, request: LLMRequest) -> str:
+        self.release.wait()
+        return "{}"
+
+
+def test_only_matching_keys_are_used():
+    backend = BlockingBackend()
+    set_backend(backend)
+    speculator = Speculator(max_workers=1)
+    for name in ["A", "B", "C"]:
+        request = LLMRequest(prompt=name, response_schema=dict, priority=Priority.interactive)
+        speculator.start("vote", name, ("P", "C"), request)
+        assert request.priority == Priority.background
+
+    hits = speculator.collect("vote", {"A": ("P", "C"), "B": ("P", "X")})
+    backend.release.set()
+    assert list(hits) == ["A"]
+    assert hits["A"].result() == "{}"
+
+    speculator.close()
+    assert speculator.report() == {
+        "calls": 3, "hits": 1, "wasted": 0, "cancelled": 2, "hit_rate": 1 / 3
+    }  # fmt: skip
+
+
+def test_speculative_game_uses_precomputed_decisions():
+    set_backend(FakeBackend(seed=2))
+    metrics = Metrics()
+    set_metrics(metrics)
+    try:
+        game = Game([], [f"Player{i}" for i in range(7)], speculate=True)
+        game.play_game()
+    finally:
+        set_metrics(Metrics(enabled=False))
+
+    report = game.speculator.report()
+    assert report["hits"] > 0
+    assert report["calls"] == report["hits"] + report["wasted"] + report["cancelled"]
+    assert metrics.report()["counters"]["speculative_hits_total"]
+
+
+def test_nominations_speculated_before_a_power_are_discarded():
+    set_backend(FakeBackend(seed=3))
+    game = Game([], [f"Player{i}" for i in range(7)], speculate=True)
+    game.speculate_nomination(0)
+    president = game.upcoming_president(0)
+    investigated = next(p for p in game.players if p != president)
+
+    # Investigating after the speculation started gives the president something new to go on:
+    game.state.record(
+        Event(event_type=EventType.loyalty_investigated, actor=president, recipient=investigated)
+    )
+    game.nominate(president, game.valid_chancellors(president, None, None))
+    game.speculator.close()
+
+    report = game.speculator.report()
+    assert report["calls"] == 1 and report["hits"] == 0
+
+
+def test_votes_speculated_before_discussion_are_discarded():
+    set_backend(FakeBackend(seed=4))
+    game = Game([], [f"Player{i}" for i in range(7)], speculate=True)
+    president, chancellor = game.players[:2]
+    game.speculate_votes(president, chancellor)
+
+    # Something said after the speculation started could change every vote:
+    game.state.record(Message(author=president, content="Trust me, they're liberal."))
+    game.collect_votes(game.valid_voters(president, chancellor), president, chancellor)
+    game.speculator.close()
+
+    report = game.speculator.report()
+    assert report["calls"] == 5 and report["hits"] == 0
+
+
+def test_nominations_are_speculated_after_executive_powers(monkeypatch):
+    take_action = Game.take_action
+    powers_used = []
+
+    def checked_take_action(self, player):
+        if self.state.enacted_policies[Policy.fascist] in self.powers:
+            powers_used.append(self.powers[self.state.enacted_policies[Policy.fascist]])
+            assert DecisionType.nominate_chancellor not in self.speculator.pending
+        take_action(self, player)
+
+    monkeypatch.setattr(Game, "take_action", checked_take_action)
+    for seed in range(5):
+        set_backend(FakeBackend(seed=seed))
+        game = Game([], [f"Player{i}" for i in range(7)], speculate=True)
+        game.play_game()
+
+    assert powers_used
@@ -0,0 +1,60 @@
+import pytest
+
+from src.game import Game
+from src.llm import FakeBackend, set_backend
+from src.store import EventStore, replay
+
+
+def test_replay_rebuilds_game_state(tmp_path):
+    set_backend(FakeBackend(seed=3))
+    store = EventStore(str(tmp_path / "games.db"))
+
+    game = Game([], [f"Player{i}" for i in range(6)], store=store)
+    game.play_game()
+    store.flush()
+
+    state = replay(store, game.game_id)
+    original = game.state
+
+    assert store.games() == [game.game_id]
+    assert state.enacted_policies == original.enacted_policies
+    assert state.failed_elections == original.failed_elections
+    assert state.round_num == original.round_num
+    # A chaos policy at the end of the game leaves no government, so compare by name:
+    assert getattr(state.president, "name", None) == getattr(original.president, "name", None)
+    assert getattr(state.chancellor, "name", None) == getattr(original.chancellor, "name", None)
+    assert len(state.event_history) == len(original.event_history)
+    assert {m.content for m in state.public_chat} == {m.content for m in original.public_chat}
+
+    replayed_players = {p.name: p for p in state.players}
+    for player in original.players:
+        assert replayed_players[player.name].alive == player.alive
+        assert replayed_players[player.name].role == player.role
+        assert len(replayed_players[player.name].thoughts) == len(player.thoughts)
+
+    store.close()
+
+
+def test_reopened_store_appends_to_existing_games(tmp_path):
+    path = str(tmp_path / "games.db")
+    store = EventStore(path)
+    store.append("game", {"players": [], "failed_elections": 0})
+    store.close()
+
+    store = EventStore(path)
+    store.append("game", {"players": [], "failed_elections": 1})
+    store.flush()
+    assert [data["failed_elections"] for _, data in store.load("game")] == [0, 1]
+
+    # A batch that can't be written is reported by flush, later ones still go through:
+    store.append("game", object())
+    with pytest.raises(RuntimeError):
+        store.flush()
+    store.append("game", {"players": [], "failed_elections": 2})
+    store.flush()
+    assert len(list(store.load("game"))) == 3
+    store.close()
+
+    # A writer that has stopped makes flush fail instead of waiting forever:
+    with pytest.raises(RuntimeError):
+        store.flush()
@@ -0,0 +1,69 @@
+import json
+from typing import List, Tuple
+
+import pytest
+
+from src.game import Game
+from src.llm import FakeBackend, using_backend
+from src.streaming import ChatStreamListener, JsonFieldStream
+
+
+class RecordingStream(ChatStreamListener):
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, str, str]] = []
+
+    def start(self, author) -> None:
+        self.calls.append(("start", author.name, ""))
+
+    def chunk(self, author, text: str) -> None:
+        self.calls.append(("chunk", author.name, text))
+
+    def end(self, author) -> None:
+        self.calls.append(("end", author.name, ""))
+
+
+def test_json_field_stream_handles_split_escapes():
+    content = 'He said "hi"\nthen left é'
+    text = json.dumps({"internal_thoughts": "public_chat", "public_chat": content, "n": {"a": 1}})
+
+    parser = JsonFieldStream("public_chat")
+    streamed = "".join(parser.feed(text[i : i + 3]) for i in range(0, len(text), 3))
+
+    assert streamed == content
+    assert parser.done
+
+
+def test_json_field_stream_combines_escaped_surrogate_pairs():
+    content = "hi 😀 and 🎉, lone \ud83d!"
+    text = json.dumps({"public_chat": content})
+    assert "\\ud83d\\ude00" in text
+
+    # Every split point, including between the two halves of a pair:
+    for size in range(1, 8):
+        parser = JsonFieldStream("public_chat")
+        streamed = "".join(parser.feed(text[i : i + size]) for i in range(0, len(text), size))
+        assert streamed == "hi 😀 and 🎉, lone \ufffd!"
+        assert parser.done
+        streamed.encode("utf-8")
+
+
+@pytest.fixture
+def backend():
+    with using_backend(FakeBackend(chunk_size=4, seed=1)) as backend:
+        yield backend
+
+
+def test_discussion_streams_to_listeners(backend):
+    game = Game([], [f"Player{i}" for i in range(5)])
+    listener = RecordingStream()
+    game.state.chat_streams.append(listener)
+
+    speaker = game.players[0]
+    speaker.discuss(game.state, "Any thoughts?")
+
+    streamed = "".join(text for kind, _, text in listener.calls if kind == "chunk")
+    message = next(iter(game.state.public_chat))
+    assert listener.calls[0] == ("start", speaker.name, "")
+    assert listener.calls[-1] == ("end", speaker.name, "")
+    assert streamed == message.content
+    assert len(listener.calls) > 3
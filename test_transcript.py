@@ -0,0 +1,58 @@
+import contextlib
+import io
+
+from src.game import Game
+from src.llm import FakeBackend, set_backend
+from src.transcript import TranscriptArchive, TranscriptReader
+
+
+def play(archive: TranscriptArchive, seed: int) -> Game:
+    set_backend(FakeBackend(seed=seed))
+    game = Game([], [f"Player{i}" for i in range(7)], transcripts=archive)
+    with contextlib.redirect_stdout(io.StringIO()):
+        game.play_game()
+    return game
+
+
+def test_transcript_seeks_to_a_round(tmp_path):
+    archive = TranscriptArchive(str(tmp_path), thoughts=True, chunk_bytes=2048)
+    game = play(archive, seed=4)
+    reader = archive.open(game.game_id)
+
+    assert archive.games() == [game.game_id]
+    assert reader.header["game_id"] == game.game_id
+    assert reader.size()["compressed"] < reader.size()["raw"] / 2
+
+    records = list(reader.records())
+    events = [r for r in records if r["kind"] == "event"]
+    assert len(events) == len(game.state.event_history)
+    thoughts = sum(len(p.thoughts) for p in game.players)
+    assert sum(r["kind"] == "message" and r["internal"] for r in records) == thoughts
+
+    # Seeking decompresses only the chunks that hold the round:
+    last = reader.rounds()[-1]
+    reader.chunks_read = 0
+    assert reader.round(last) == [r for r in records if r["round"] == last]
+    assert reader.chunks_read < len(reader.chunks)
+
+
+def test_unfinished_transcript_is_readable(tmp_path):
+    archive = TranscriptArchive(str(tmp_path), chunk_bytes=1024)
+    game = play(archive, seed=6)
+    complete = list(archive.open(game.game_id).records())
+    assert not any(r["kind"] == "message" and r["internal"] for r in complete)
+
+    # A game that crashed before closing its transcript loses only the unflushed tail:
+    path = archive.path(game.game_id)
+    with open(path, "rb") as file:
+        data = file.read()
+    reader = archive.open(game.game_id)
+    end = reader.chunks[-1].offset
+    with open(path, "wb") as file:
+        file.write(data[: end + 10])
+
+    truncated = TranscriptReader(path)
+    assert len(truncated.chunks) == len(reader.chunks) - 1
+    recovered = list(truncated.records())
+    assert recovered == complete[: len(recovered)]
+    assert len(recovered) == sum(chunk.records for chunk in truncated.chunks)